@@ -0,0 +1,40 @@
+"""Add composite indexes
+
+Revision ID: 4c1e7a2d9b05
+Revises: 9b2f9f3f1683
+Create Date: 2026-10-16 20:12:41.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c1e7a2d9b05'
+down_revision: Union[str, None] = '9b2f9f3f1683'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_conv_proj_start', 'conversations', ['project_id', 'start_time'])
+    op.create_index('ix_msg_conv_ts', 'messages', ['conversation_id', 'timestamp'], postgresql_include=['sender_name'])
+    op.create_index('ix_task_proj_status_created', 'tasks', ['project_id', 'status', 'created_at'])
+    op.create_index('ix_task_assigned_status', 'tasks', ['assigned_to', 'status'])
+    op.create_index('ix_mem_proj_type_ts', 'project_memories', ['project_id', 'content_type', 'timestamp'])
+    op.create_index('ix_rag_project_content_type', 'rag_index', ['project_id', 'content_type'])
+    op.create_index('ix_call_messages_call_ts', 'call_messages', ['call_id', 'timestamp'])
+    op.create_index('ix_call_emotions_call_ts', 'call_emotions', ['call_id', 'timestamp'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_call_emotions_call_ts', table_name='call_emotions')
+    op.drop_index('ix_call_messages_call_ts', table_name='call_messages')
+    op.drop_index('ix_rag_project_content_type', table_name='rag_index')
+    op.drop_index('ix_mem_proj_type_ts', table_name='project_memories')
+    op.drop_index('ix_task_assigned_status', table_name='tasks')
+    op.drop_index('ix_task_proj_status_created', table_name='tasks')
+    op.drop_index('ix_msg_conv_ts', table_name='messages')
+    op.drop_index('ix_conv_proj_start', table_name='conversations')
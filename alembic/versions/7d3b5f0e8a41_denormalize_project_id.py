@@ -0,0 +1,52 @@
+"""Denormalize project_id onto messages, call messages and participants
+
+Revision ID: 7d3b5f0e8a41
+Revises: 4c1e7a2d9b05
+Create Date: 2026-10-16 20:31:07.902446
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d3b5f0e8a41'
+down_revision: Union[str, None] = '4c1e7a2d9b05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (child table, parent table, child column pointing at the parent)
+DENORMALIZED_TABLES = [
+    ('messages', 'conversations', 'conversation_id'),
+    ('conversation_participants', 'conversations', 'conversation_id'),
+    ('call_messages', 'calls', 'call_id'),
+]
+
+
+def upgrade() -> None:
+    for table, parent, parent_key in DENORMALIZED_TABLES:
+        # Batch mode so SQLite gets the foreign key via a table rebuild
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column('project_id', sa.String(length=64), nullable=True))
+            batch_op.create_foreign_key(f'fk_{table}_project_id_projects', 'projects', ['project_id'], ['id'])
+        op.create_index(f'ix_{table}_project_id', table, ['project_id'])
+
+        # Backfill existing rows from the parent conversation/call
+        op.execute(
+            f"UPDATE {table} SET project_id = "
+            f"(SELECT {parent}.project_id FROM {parent} WHERE {parent}.id = {table}.{parent_key}) "
+            f"WHERE project_id IS NULL"
+        )
+
+    op.create_index('ix_msg_proj_ts', 'messages', ['project_id', 'timestamp'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_msg_proj_ts', table_name='messages')
+    for table, _parent, _parent_key in reversed(DENORMALIZED_TABLES):
+        op.drop_index(f'ix_{table}_project_id', table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_constraint(f'fk_{table}_project_id_projects', type_='foreignkey')
+            batch_op.drop_column('project_id')
@@ -0,0 +1,84 @@
+"""Add inline participant lists to conversations and calls
+
+Revision ID: a8e24c6f1d37
+Revises: 7d3b5f0e8a41
+Create Date: 2026-10-16 20:48:55.116730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8e24c6f1d37'
+down_revision: Union[str, None] = '7d3b5f0e8a41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+JSONType = sa.JSON().with_variant(postgresql.JSONB(), 'postgresql')
+
+# (parent table, participant table, participant column pointing at the parent)
+PARTICIPANT_TABLES = [
+    ('conversations', 'conversation_participants', 'conversation_id'),
+    ('calls', 'call_participants', 'call_id'),
+]
+
+
+def _backfill(bind, parent, participant_table, parent_key):
+    """Copy participant rows into the parent's inline lists, in insertion order"""
+    participants = sa.table(
+        participant_table,
+        sa.column('id', sa.Integer),
+        sa.column(parent_key),
+        sa.column('participant_id', sa.String),
+        sa.column('participant_name', sa.String),
+    )
+    parents = sa.table(
+        parent,
+        sa.column('id'),
+        sa.column('participant_ids', JSONType),
+        sa.column('participant_names', JSONType),
+    )
+
+    lists = {}
+    rows = bind.execute(
+        sa.select(participants.c[parent_key], participants.c.participant_id, participants.c.participant_name)
+        .order_by(participants.c[parent_key], participants.c.id)
+    )
+    for parent_id, participant_id, participant_name in rows:
+        ids, names = lists.setdefault(parent_id, ([], []))
+        ids.append(participant_id)
+        names.append(participant_name)
+
+    for parent_id, (ids, names) in lists.items():
+        bind.execute(
+            parents.update()
+            .where(parents.c.id == parent_id)
+            .values(participant_ids=ids, participant_names=names)
+        )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for parent, participant_table, parent_key in PARTICIPANT_TABLES:
+        op.add_column(parent, sa.Column('participant_ids', JSONType, nullable=True))
+        op.add_column(parent, sa.Column('participant_names', JSONType, nullable=True))
+        _backfill(bind, parent, participant_table, parent_key)
+
+    if bind.dialect.name == 'postgresql':
+        op.create_index('ix_conv_participant_ids', 'conversations', ['participant_ids'], postgresql_using='gin')
+        op.create_index('ix_call_participant_ids', 'calls', ['participant_ids'], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_call_participant_ids', table_name='calls')
+        op.drop_index('ix_conv_participant_ids', table_name='conversations')
+
+    for parent, _participant_table, _parent_key in reversed(PARTICIPANT_TABLES):
+        with op.batch_alter_table(parent) as batch_op:
+            batch_op.drop_column('participant_names')
+            batch_op.drop_column('participant_ids')
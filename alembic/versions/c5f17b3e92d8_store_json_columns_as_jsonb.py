@@ -0,0 +1,55 @@
+"""Store JSON columns as JSONB on PostgreSQL
+
+Revision ID: c5f17b3e92d8
+Revises: a8e24c6f1d37
+Create Date: 2026-10-16 21:24:12.640381
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5f17b3e92d8'
+down_revision: Union[str, None] = 'a8e24c6f1d37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column) pairs declared with JSONType; participant_ids/participant_names
+# were created as JSONB by the previous revision
+JSON_COLUMNS = [
+    ('users', 'preferences'),
+    ('projects', 'settings'),
+    ('project_members', 'skills'),
+    ('project_members', 'personality_traits'),
+    ('messages', 'message_metadata'),
+    ('tasks', 'task_metadata'),
+    ('project_memories', 'memory_metadata'),
+    ('scheduled_conversations', 'target_participants'),
+    ('code_reviews', 'suggestions'),
+    ('code_reviews', 'issues_found'),
+    ('emotion_profiles', 'emotion_scores'),
+]
+
+
+def upgrade() -> None:
+    # Other backends keep the generic JSON type, so there is nothing to convert
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table, column in JSON_COLUMNS:
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} TYPE JSONB USING {column}::jsonb')
+
+    # GIN needs JSONB, so the index can only be built after the conversion
+    op.create_index('ix_member_skills', 'project_members', ['skills'], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.drop_index('ix_member_skills', table_name='project_members')
+    for table, column in reversed(JSON_COLUMNS):
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} TYPE JSON USING {column}::json')
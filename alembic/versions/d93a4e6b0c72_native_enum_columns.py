@@ -0,0 +1,52 @@
+"""Store phase, role and conversation status as native enums on PostgreSQL
+
+Revision ID: d93a4e6b0c72
+Revises: c5f17b3e92d8
+Create Date: 2026-10-16 21:41:38.207915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd93a4e6b0c72'
+down_revision: Union[str, None] = 'c5f17b3e92d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column, enum type name, enum values) as declared with _enum_column
+ENUM_COLUMNS = [
+    ('projects', 'current_phase', 'project_phase', [
+        'planning', 'development', 'testing', 'deployment', 'maintenance', 'completed',
+    ]),
+    ('project_members', 'role', 'project_role', [
+        'junior_developer', 'senior_developer', 'tech_lead', 'project_manager', 'product_manager',
+        'qa_engineer', 'designer', 'business_analyst', 'intern', 'scrum_master',
+    ]),
+    ('conversations', 'status', 'conversation_status', [
+        'active', 'ended', 'scheduled', 'pending',
+    ]),
+]
+
+
+def upgrade() -> None:
+    # Other backends keep the VARCHAR(50) columns the enums fall back to
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table, column, type_name, values in ENUM_COLUMNS:
+        postgresql.ENUM(*values, name=type_name).create(op.get_bind(), checkfirst=True)
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} TYPE {type_name} USING {column}::{type_name}')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table, column, type_name, values in reversed(ENUM_COLUMNS):
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} TYPE VARCHAR(50) USING {column}::text')
+        postgresql.ENUM(*values, name=type_name).drop(op.get_bind(), checkfirst=True)
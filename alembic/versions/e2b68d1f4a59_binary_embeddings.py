@@ -0,0 +1,78 @@
+"""Store embeddings as float32 bytes with an optional int8 scale
+
+Revision ID: e2b68d1f4a59
+Revises: d93a4e6b0c72
+Create Date: 2026-10-16 22:03:51.774120
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from core.models import encode_embedding, decode_embedding
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b68d1f4a59'
+down_revision: Union[str, None] = 'd93a4e6b0c72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+EMBEDDING_TABLES = ['project_memories', 'rag_index']
+
+
+def _load_json(value):
+    """JSON column values arrive decoded on PostgreSQL but as text on some SQLite drivers"""
+    if isinstance(value, (str, bytes)):
+        return json.loads(value)
+    return value
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for table in EMBEDDING_TABLES:
+        op.add_column(table, sa.Column('embedding_scale', sa.Float(), nullable=True))
+        op.add_column(table, sa.Column('embedding_bytes', sa.LargeBinary(), nullable=True))
+
+        # Re-encode existing JSON vectors as float32 bytes
+        rows = sa.table(
+            table,
+            sa.column('id', sa.String),
+            sa.column('embedding', sa.JSON),
+            sa.column('embedding_bytes', sa.LargeBinary),
+        )
+        for row_id, embedding in bind.execute(sa.select(rows.c.id, rows.c.embedding).where(rows.c.embedding.isnot(None))):
+            bind.execute(
+                rows.update().where(rows.c.id == row_id).values(embedding_bytes=encode_embedding(_load_json(embedding)))
+            )
+
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('embedding')
+            batch_op.alter_column('embedding_bytes', new_column_name='embedding')
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    for table in reversed(EMBEDDING_TABLES):
+        op.add_column(table, sa.Column('embedding_json', sa.JSON(), nullable=True))
+
+        # Dequantize where needed and write the vectors back as JSON lists
+        rows = sa.table(
+            table,
+            sa.column('id', sa.String),
+            sa.column('embedding', sa.LargeBinary),
+            sa.column('embedding_scale', sa.Float),
+            sa.column('embedding_json', sa.JSON),
+        )
+        query = sa.select(rows.c.id, rows.c.embedding, rows.c.embedding_scale).where(rows.c.embedding.isnot(None))
+        for row_id, embedding, scale in bind.execute(query):
+            bind.execute(
+                rows.update().where(rows.c.id == row_id).values(embedding_json=decode_embedding(embedding, scale).tolist())
+            )
+
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('embedding')
+            batch_op.drop_column('embedding_scale')
+            batch_op.alter_column('embedding_json', new_column_name='embedding')
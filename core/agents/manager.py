@@ -1,6 +1,8 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Union
 from pydantic import BaseModel
+import re
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from ..config import settings
 from ..persona_behavior import PersonaBehaviorManager
@@ -35,6 +37,19 @@ class AgentManager:
         # Memory optimization settings
         self.enable_context_optimization = True
         self.max_context_tokens = 3000
+        
+        # Shared HTTP session for model provider calls (lazy-loaded)
+        self._http_session = None
+        
+        # Compiled greeting-intro patterns, keyed by agent name
+        self._greeting_patterns: Dict[str, "re.Pattern"] = {}
+    
+    def _get_http_session(self):
+        """Return a persistent requests.Session so provider calls reuse keep-alive connections"""
+        if self._http_session is None:
+            import requests
+            self._http_session = requests.Session()
+        return self._http_session
     
     def _initialize_agents(self) -> Dict[str, AgentPersona]:
         """Initialize realistic workplace AI agents"""
@@ -136,6 +151,36 @@ class AgentManager:
         
         return response
     
+    def chat_with_agents_batch(self, requests: List[Tuple[str, str]]) -> List[Union[str, Exception]]:
+        """Send (agent_id, message) pairs in one dispatch, running different agents' LLM calls concurrently
+        
+        Results come back in request order; a failed request yields its exception in
+        place of a response so callers can fall back per agent.
+        """
+        results: List[Union[str, Exception]] = [None] * len(requests)
+        
+        # Requests for the same agent run in order on one worker so its history stays coherent
+        indices_by_agent: Dict[str, List[int]] = {}
+        for index, (agent_id, _) in enumerate(requests):
+            indices_by_agent.setdefault(agent_id, []).append(index)
+        
+        def run(indices: List[int]):
+            for index in indices:
+                agent_id, message = requests[index]
+                try:
+                    results[index] = self.chat_with_agent(agent_id, message)
+                except Exception as e:
+                    results[index] = e
+        
+        if len(indices_by_agent) <= 1:
+            for indices in indices_by_agent.values():
+                run(indices)
+        else:
+            with ThreadPoolExecutor(max_workers=len(indices_by_agent)) as executor:
+                list(executor.map(run, indices_by_agent.values()))
+        
+        return results
+    
     def chat_with_agent_simple(self, agent_id: str, message: str) -> str:
         """Simple chat method for backward compatibility"""
         return self.chat_with_agent(agent_id, message)
@@ -333,8 +378,6 @@ Remember: You are a real person in this workplace, not an AI. Respond naturally
         Call your model API (Google Gemini gets priority for now)
         Priority: Google Gemini > OpenAI > Anthropic > Azure > Hugging Face > Ollama > Custom AWS API
         """
-        import requests
-        
         print(f"[DEBUG] Calling custom model API...")
         print(f"[DEBUG] Google API Key available: {bool(settings.google_api_key)}")
         print(f"[DEBUG] OpenAI API Key available: {bool(settings.openai_api_key)}")
@@ -395,8 +438,6 @@ Remember: You are a real person in this workplace, not an AI. Respond naturally
         
     def _call_openai(self, system_prompt: str, user_message: str) -> str:
         """Call OpenAI API"""
-        import requests
-        
         url = "https://api.openai.com/v1/chat/completions"
         headers = {
             "Authorization": f"Bearer {settings.openai_api_key}",
@@ -414,7 +455,7 @@ Remember: You are a real person in this workplace, not an AI. Respond naturally
         }
         
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
+            response = self._get_http_session().post(url, headers=headers, json=payload, timeout=30)
             if response.status_code == 200:
                 result = response.json()
                 return result["choices"][0]["message"]["content"]
@@ -425,8 +466,6 @@ Remember: You are a real person in this workplace, not an AI. Respond naturally
     
     def _call_anthropic(self, system_prompt: str, user_message: str) -> str:
         """Call Anthropic Claude API"""
-        import requests
-        
         url = "https://api.anthropic.com/v1/messages"
         headers = {
             "x-api-key": settings.anthropic_api_key,
@@ -443,7 +482,7 @@ Remember: You are a real person in this workplace, not an AI. Respond naturally
         }
         
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
+            response = self._get_http_session().post(url, headers=headers, json=payload, timeout=30)
             if response.status_code == 200:
                 result = response.json()
                 return result["content"][0]["text"]
@@ -454,8 +493,6 @@ Remember: You are a real person in this workplace, not an AI. Respond naturally
     
     def _call_azure_openai(self, system_prompt: str, user_message: str) -> str:
         """Call Azure OpenAI API"""
-        import requests
-        
         url = f"{settings.azure_openai_endpoint}/openai/deployments/{settings.azure_openai_deployment}/chat/completions?api-version={settings.azure_openai_version}"
         headers = {
             "api-key": settings.azure_openai_key,
@@ -472,7 +509,7 @@ Remember: You are a real person in this workplace, not an AI. Respond naturally
         }
         
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
+            response = self._get_http_session().post(url, headers=headers, json=payload, timeout=30)
             if response.status_code == 200:
                 result = response.json()
                 return result["choices"][0]["message"]["content"]
@@ -483,8 +520,6 @@ Remember: You are a real person in this workplace, not an AI. Respond naturally
     
     def _call_huggingface(self, system_prompt: str, user_message: str) -> str:
         """Call Hugging Face Inference API"""
-        import requests
-        
         url = f"https://api-inference.huggingface.co/models/{settings.huggingface_model}"
         headers = {
             "Authorization": f"Bearer {settings.huggingface_api_key}",
@@ -500,7 +535,7 @@ Remember: You are a real person in this workplace, not an AI. Respond naturally
         }
         
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
+            response = self._get_http_session().post(url, headers=headers, json=payload, timeout=30)
             if response.status_code == 200:
                 result = response.json()
                 return result[0]["generated_text"].split("Assistant:")[-1].strip()
@@ -511,8 +546,6 @@ Remember: You are a real person in this workplace, not an AI. Respond naturally
     
     def _call_ollama(self, system_prompt: str, user_message: str) -> str:
         """Call local Ollama API"""
-        import requests
-        
         url = f"{settings.ollama_base_url}/api/generate"
         payload = {
             "model": settings.ollama_model,
@@ -521,7 +554,7 @@ Remember: You are a real person in this workplace, not an AI. Respond naturally
         }
         
         try:
-            response = requests.post(url, json=payload, timeout=30)
+            response = self._get_http_session().post(url, json=payload, timeout=30)
             if response.status_code == 200:
                 result = response.json()
                 return result["response"]
@@ -600,7 +633,7 @@ Remember: You are a real person in this workplace, not an AI. Respond naturally
                 headers[getattr(settings, 'custom_model_auth_header', 'Authorization')] = api_key
         
         try:
-            response = requests.post(
+            response = self._get_http_session().post(
                 api_url,
                 headers=headers,
                 json=payload,
@@ -654,8 +687,6 @@ Remember: You are a real person in this workplace, not an AI. Respond naturally
     
     def _call_google_gemini(self, system_prompt: str, user_message: str) -> str:
         """Call Google Gemini API"""
-        import requests
-        
         url = f"https://generativelanguage.googleapis.com/v1beta/models/{settings.gemini_model}:generateContent?key={settings.google_api_key}"
         headers = {
             "Content-Type": "application/json"
@@ -679,7 +710,7 @@ Remember: You are a real person in this workplace, not an AI. Respond naturally
         }
         
         try:
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
+            response = self._get_http_session().post(url, headers=headers, json=payload, timeout=30)
             if response.status_code == 200:
                 result = response.json()
                 if "candidates" in result and len(result["candidates"]) > 0:
@@ -806,57 +837,28 @@ CRITICAL FORMATTING:
 
         return system_prompt
     
+    def _get_greeting_pattern(self, agent_name: str) -> "re.Pattern":
+        """Compiled, case-insensitive matcher for greeting intros, built once per agent name"""
+        pattern = self._greeting_patterns.get(agent_name)
+        if pattern is None:
+            greeting = r"(?:(?:hey|hi|hello)(?: there| everyone)?[!,]\s*)?"
+            pattern = re.compile(
+                rf"^(?:{greeting}{re.escape(agent_name)} here[.!:]\s*)+",
+                re.IGNORECASE
+            )
+            self._greeting_patterns[agent_name] = pattern
+        return pattern
+    
     def _clean_agent_response(self, agent: AgentPersona, response: str) -> str:
         """Clean up agent response to remove artificial patterns and agent name"""
         if not response:
             return response
             
-        # Remove common artificial greeting patterns (more comprehensive)
-        artificial_patterns = [
-            f"Hey there! {agent.name} here.",
-            f"Hi there! {agent.name} here.",
-            f"Hello there! {agent.name} here.",
-            f"Hi! {agent.name} here.",
-            f"Hello! {agent.name} here.",
-            f"Hey! {agent.name} here.",
-            f"{agent.name} here!",
-            f"{agent.name} here.",
-            f"Hi, {agent.name} here.",
-            f"Hello, {agent.name} here.",
-            f"Hey, {agent.name} here.",
-            f"Hi everyone! {agent.name} here.",
-            f"Hello everyone! {agent.name} here.",
-            # Case insensitive patterns
-            f"hey there! {agent.name.lower()} here.",
-            f"hi there! {agent.name.lower()} here.",
-            f"hello there! {agent.name.lower()} here.",
-        ]
-        
         # Clean the response
         cleaned_response = response.strip()
         
-        # Remove artificial greeting patterns from the beginning (case insensitive)
-        for pattern in artificial_patterns:
-            if cleaned_response.lower().startswith(pattern.lower()):
-                cleaned_response = cleaned_response[len(pattern):].strip()
-                break
-        
-        # More aggressive cleaning for variations
-        greeting_prefixes = [
-            f"Hey there! {agent.name} here",
-            f"Hi! {agent.name} here",
-            f"Hello! {agent.name} here",
-            f"Hey! {agent.name} here",
-            f"{agent.name} here",
-        ]
-        
-        for prefix in greeting_prefixes:
-            # Handle variations with different punctuation
-            for punct in [".", "!", ":"]:
-                pattern = f"{prefix}{punct}"
-                if cleaned_response.lower().startswith(pattern.lower()):
-                    cleaned_response = cleaned_response[len(pattern):].strip()
-                    break
+        # Remove artificial greeting patterns ("Hey there! <name> here.") from the beginning
+        cleaned_response = self._get_greeting_pattern(agent.name).sub('', cleaned_response, count=1).strip()
         
         # Remove standalone name introductions at the beginning
         if cleaned_response.startswith(f"{agent.name}:"):
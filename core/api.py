@@ -1603,7 +1603,8 @@ async def get_persona_context(
         memory_context = pb_manager.get_persona_memory_context(agent_id, project_id)
         
         # Get persona information
-        persona_info = pb_manager.personas.get(agent_id, {})
+        persona = pb_manager.personas.get(agent_id)
+        persona_info = persona.to_dict() if persona else {}
         
         return {
             "success": True,
@@ -1612,7 +1613,7 @@ async def get_persona_context(
                 "project_id": project_id,
                 "persona_info": persona_info,
                 "memory_context": memory_context,
-                "available_meeting_types": [mt.value for mt in pb_manager.meeting_tone_rules.keys()],
+                "available_meeting_types": list(pb_manager.meeting_tone_rules.keys()),
                 "behavior_traits": [trait.value for trait in pb_manager.behavior_memory.get(project_id, {}).get(agent_id, [])]
             }
         }
@@ -5,6 +5,7 @@ API endpoints for calls, code uploads, and emotion tracking
 
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 from fastapi.responses import JSONResponse
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
@@ -108,31 +109,29 @@ async def schedule_call(
             description=description,
             project_id=project_id,
             scheduled_at=datetime.fromisoformat(scheduled_at),
-            status="scheduled"
+            status="scheduled",
+            participant_ids=[str(creator_id)] + [participant["id"] for participant in participant_list],
+            participant_names=["User"] + [participant["name"] for participant in participant_list]
         )
         
         db.add(call)
         db.commit()
         db.refresh(call)
         
-        # Add creator as a participant
-        creator_participant = CallParticipant(
-            call_id=call.id,
-            participant_type="user",
-            participant_id=str(creator_id),
-            participant_name="User"
-        )
-        db.add(creator_participant)
-        
-        # Add other participants
-        for participant in participant_list:
-            participant_obj = CallParticipant(
-                call_id=call.id,
-                participant_type=participant["type"],
-                participant_id=participant["id"],
-                participant_name=participant["name"]
-            )
-            db.add(participant_obj)
+        # Add the creator and other participants in one multi-row INSERT
+        participant_rows = [{
+            "call_id": call.id,
+            "participant_type": "user",
+            "participant_id": str(creator_id),
+            "participant_name": "User"
+        }]
+        participant_rows.extend({
+            "call_id": call.id,
+            "participant_type": participant["type"],
+            "participant_id": participant["id"],
+            "participant_name": participant["name"]
+        } for participant in participant_list)
+        db.execute(insert(CallParticipant), participant_rows)
         
         db.commit()
         
@@ -233,16 +232,19 @@ async def send_message(
     try:
         # Analyze message emotions with AI
         analyzer = get_emotion_analyzer()
-        emotion_analysis = analyzer.analyze_message_with_ai(message)
+        emotion_analysis = await analyzer.analyze_message_with_ai_async(message)
         
         # Convert EmotionAnalysis object to dictionary format
         emotions_dict = {emotion_analysis.primary_emotion.value: 1.0}
         for emotion in emotion_analysis.secondary_emotions:
             emotions_dict[emotion.value] = 0.7
         
+        call = db.query(Call).filter(Call.id == call_id).first()
+        
         # Create message
         call_message = CallMessage(
             call_id=call_id,
+            project_id=call.project_id if call else None,
             sender_type=sender_type,
             sender_id=sender_id,
             sender_name=sender_name,
@@ -253,20 +255,22 @@ async def send_message(
         
         # Record emotions if significant
         if emotion_analysis.confidence > 0.7:
-            for emotion, intensity in emotions_dict.items():
-                if intensity > 0.5:  # Only record significant emotions
-                    emotion_record = CallEmotion(
-                        call_id=call_id,
-                        participant_id=sender_id,
-                        emotion_type=emotion,
-                        intensity=intensity
-                    )
-                    db.add(emotion_record)
+            emotion_rows = [
+                {
+                    "call_id": call_id,
+                    "participant_id": sender_id,
+                    "emotion_type": emotion,
+                    "intensity": intensity
+                }
+                for emotion, intensity in emotions_dict.items()
+                if intensity > 0.5  # Only record significant emotions
+            ]
+            if emotion_rows:
+                db.execute(insert(CallEmotion), emotion_rows)
         
         db.commit()
         
         # Store message in RAG for context building
-        call = db.query(Call).filter(Call.id == call_id).first()
         if call:
             # Store call message in RAG with emotion context
             rag = get_rag_manager()
@@ -321,6 +325,7 @@ async def send_message(
                                 # Create AI response message
                                 ai_message = CallMessage(
                                     call_id=call_id,
+                                    project_id=call.project_id,
                                     sender_type="agent",
                                     sender_id=participant.agent_id,
                                     sender_name=participant.agent_name,
@@ -4,7 +4,9 @@ AI-Powered Emotion Analysis Module for SimWorld Calls
 Uses AI models to analyze emotions during calls and provide feedback to agents
 """
 
+import asyncio
 import re
+import threading
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 from enum import Enum
@@ -22,6 +24,24 @@ except ImportError:
     NUMPY_AVAILABLE = False
     np = None
 
+_INFERENCE_DEVICE = None
+
+def _get_inference_device() -> Tuple[int, Any]:
+    """(pipeline device index, torch dtype) for inference, probed once per process.
+    
+    Half-precision weights on GPU halve memory traffic; prefer bf16 (Ampere+)
+    since it keeps fp32's range, else fall back to fp16. CPU keeps fp32.
+    """
+    global _INFERENCE_DEVICE
+    if _INFERENCE_DEVICE is None:
+        import torch
+        if torch.cuda.is_available():
+            dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+            _INFERENCE_DEVICE = (0, dtype)
+        else:
+            _INFERENCE_DEVICE = (-1, None)
+    return _INFERENCE_DEVICE
+
 class EmotionType(Enum):
     CONFIDENT = "confident"
     NERVOUS = "nervous"
@@ -56,6 +76,18 @@ class EmotionAnalysis:
 class AIEmotionAnalyzer:
     """AI-powered emotion analyzer using transformer models"""
     
+    # Upper bound on messages per forward pass when classifying in batches
+    INFERENCE_BATCH_SIZE = 32
+    
+    # Context emotion vectors: words describing the expected mood of each call type
+    CONTEXT_EMOTIONS = {
+        'deadline_pressure': ['stressed', 'rushed', 'pressure', 'deadline'],
+        'team_meeting': ['collaborative', 'focused', 'professional'],
+        'client_call': ['formal', 'nervous', 'confident'],
+        'code_review': ['analytical', 'focused', 'critical'],
+        'brainstorming': ['creative', 'excited', 'enthusiastic']
+    }
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         
@@ -70,15 +102,22 @@ class AIEmotionAnalyzer:
         
         # Flag to track if models are initialized
         self._models_initialized = False
+        self._load_lock = threading.Lock()
+        
+        # One inference at a time: the shared models and their CUDA state are not thread-safe
+        self._inference_lock = threading.Lock()
         
         # Context understanding
         self.conversation_context = {}
+        self._context_embeddings = {}  # call_type -> encoded CONTEXT_EMOTIONS text
         
     def _ensure_models_loaded(self):
         """Ensure models are loaded (lazy loading)"""
         if not self._models_initialized:
-            self._initialize_models()
-            self._models_initialized = True
+            with self._load_lock:
+                if not self._models_initialized:
+                    self._initialize_models()
+                    self._models_initialized = True
         
     def _initialize_models(self):
         """Initialize AI models for emotion analysis"""
@@ -89,15 +128,18 @@ class AIEmotionAnalyzer:
                 import numpy as np
             
             from transformers import pipeline
-            import torch
             from sentence_transformers import SentenceTransformer
             
+            device, torch_dtype = _get_inference_device()
+            
             # Emotion classification model
             self.logger.info("Loading emotion classification model...")
             self.emotion_classifier = pipeline(
                 "text-classification",
                 model="j-hartmann/emotion-english-distilroberta-base",
-                device=0 if torch.cuda.is_available() else -1
+                device=device,
+                torch_dtype=torch_dtype,
+                use_fast=True
             )
             
             # Sentiment analysis model
@@ -105,13 +147,16 @@ class AIEmotionAnalyzer:
             self.sentiment_analyzer = pipeline(
                 "sentiment-analysis",
                 model="cardiffnlp/twitter-roberta-base-sentiment-latest",
-                device=0 if torch.cuda.is_available() else -1
+                device=device,
+                torch_dtype=torch_dtype,
+                use_fast=True
             )
             
             # Embedding model for semantic understanding
             self.logger.info("Loading embedding model...")
             self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
             
+            self._warm_up_pipelines()
             self.logger.info("All emotion analysis models loaded successfully")
             
         except ImportError as e:
@@ -134,17 +179,20 @@ class AIEmotionAnalyzer:
             self.emotion_classifier = pipeline(
                 "text-classification",
                 model="distilbert-base-uncased-finetuned-sst-2-english",
-                device=-1  # CPU only
+                device=-1,  # CPU only
+                use_fast=True
             )
             
             self.sentiment_analyzer = pipeline(
                 "sentiment-analysis",
                 model="distilbert-base-uncased-finetuned-sst-2-english",
-                device=-1
+                device=-1,
+                use_fast=True
             )
             
             self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
             
+            self._warm_up_pipelines()
             self.logger.info("Fallback emotion models loaded")
             
         except Exception as e:
@@ -153,6 +201,18 @@ class AIEmotionAnalyzer:
             self.sentiment_analyzer = None
             self.embedding_model = None
         
+    def _warm_up_pipelines(self):
+        """Run one tiny inference per pipeline so the first real message skips lazy setup"""
+        for classifier in (self.emotion_classifier, self.sentiment_analyzer):
+            if classifier is None:
+                continue
+            if not getattr(classifier.tokenizer, 'is_fast', False):
+                self.logger.warning(f"{classifier.model.name_or_path} is using a slow Python tokenizer")
+            try:
+                classifier("warm up")
+            except Exception as e:
+                self.logger.warning(f"Pipeline warm-up failed: {e}")
+    
     def _initialize_voice_models(self):
         """Initialize voice/audio analysis models for tone detection"""
         try:
@@ -180,60 +240,107 @@ class AIEmotionAnalyzer:
     
     def analyze_message_with_ai(self, message: str, context: Dict[str, Any] = None) -> EmotionAnalysis:
         """Analyze emotion in a message using AI models"""
+        return self.analyze_messages_with_ai([message], context)[0]
+    
+    async def analyze_message_with_ai_async(self, message: str, context: Dict[str, Any] = None) -> EmotionAnalysis:
+        """Async variant of analyze_message_with_ai; inference runs in the default executor"""
+        return (await self.analyze_messages_with_ai_async([message], context))[0]
+    
+    async def analyze_messages_with_ai_async(self, messages: List[str], context: Dict[str, Any] = None) -> List[EmotionAnalysis]:
+        """Async variant of analyze_messages_with_ai that keeps the event loop free"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.analyze_messages_with_ai, messages, context)
+    
+    def analyze_messages_with_ai(self, messages: List[str], context: Dict[str, Any] = None) -> List[EmotionAnalysis]:
+        """Analyze several messages, running each model once over the whole batch"""
         
         # Ensure models are loaded before analysis
         self._ensure_models_loaded()
         
-        if not message.strip():
-            return EmotionAnalysis(
-                primary_emotion=EmotionType.NEUTRAL,
-                intensity=EmotionIntensity.LOW,
-                confidence=0.5,
-                secondary_emotions=[],
-                indicators=["empty message"],
-                timestamp=datetime.now()
-            )
+        analyses: List[Optional[EmotionAnalysis]] = [None] * len(messages)
+        positions = []
+        texts = []
+        for position, message in enumerate(messages):
+            if message.strip():
+                positions.append(position)
+                texts.append(message)
+            else:
+                analyses[position] = EmotionAnalysis(
+                    primary_emotion=EmotionType.NEUTRAL,
+                    intensity=EmotionIntensity.LOW,
+                    confidence=0.5,
+                    secondary_emotions=[],
+                    indicators=["empty message"],
+                    timestamp=datetime.now()
+                )
+        
+        if not texts:
+            return analyses
         
         try:
-            # Get emotion classification
-            emotion_results = self._get_ai_emotion_classification(message)
-            
-            # Get sentiment analysis
-            sentiment_results = self._get_ai_sentiment_analysis(message)
-            
-            # Get contextual understanding
-            context_analysis = self._analyze_context(message, context)
+            with self._inference_lock:
+                # Get emotion classification
+                emotion_batch = self._get_ai_emotion_classifications(texts)
+                
+                # Get sentiment analysis
+                sentiment_batch = self._get_ai_sentiment_analyses(texts)
+                
+                # Get contextual understanding
+                context_batch = self._analyze_contexts(texts, context)
             
             # Combine results
-            analysis = self._combine_ai_results(emotion_results, sentiment_results, context_analysis)
-            
-            return EmotionAnalysis(
-                primary_emotion=analysis['primary_emotion'],
-                intensity=analysis['intensity'],
-                confidence=analysis['confidence'],
-                secondary_emotions=analysis['secondary_emotions'],
-                indicators=analysis['indicators'],
-                timestamp=datetime.now()
-            )
+            for position, emotion_results, sentiment_results, context_analysis in zip(
+                positions, emotion_batch, sentiment_batch, context_batch
+            ):
+                analysis = self._combine_ai_results(emotion_results, sentiment_results, context_analysis)
+                analyses[position] = EmotionAnalysis(
+                    primary_emotion=analysis['primary_emotion'],
+                    intensity=analysis['intensity'],
+                    confidence=analysis['confidence'],
+                    secondary_emotions=analysis['secondary_emotions'],
+                    indicators=analysis['indicators'],
+                    timestamp=datetime.now()
+                )
             
         except Exception as e:
             self.logger.error(f"Error in AI emotion analysis: {e}")
-            return self._fallback_analysis(message)
+            for position, message in zip(positions, texts):
+                analyses[position] = self._fallback_analysis(message)
+        
+        return analyses
+    
+    @staticmethod
+    def _first_result(result: Any) -> Dict[str, Any]:
+        """Unwrap a pipeline result that may be a list of label/score dicts"""
+        return result[0] if isinstance(result, list) else result
+    
+    def _run_text_pipeline(self, classifier: Any, messages: List[str]) -> List[Any]:
+        """Run a text pipeline over messages, padding only when actually batching"""
+        if len(messages) == 1:
+            # A lone sequence goes through unpadded
+            return classifier(messages[0])
+        
+        # Length-sorted batches pad each message only up to its neighbours,
+        # not up to the longest message in the conversation
+        order = sorted(range(len(messages)), key=lambda i: len(messages[i]))
+        sorted_results = classifier(
+            [messages[i] for i in order],
+            batch_size=min(len(messages), self.INFERENCE_BATCH_SIZE)
+        )
+        
+        results = [None] * len(messages)
+        for position, result in zip(order, sorted_results):
+            results[position] = result
+        return results
     
-    def _get_ai_emotion_classification(self, message: str) -> Dict[str, Any]:
-        """Get emotion classification from AI model"""
+    def _get_ai_emotion_classifications(self, messages: List[str]) -> List[Dict[str, Any]]:
+        """Get emotion classifications for a batch of messages in one pipeline call"""
         
         if not self.emotion_classifier:
-            return {'emotion': 'neutral', 'confidence': 0.5}
+            return [{'emotion': 'neutral', 'confidence': 0.5} for _ in messages]
         
         try:
-            results = self.emotion_classifier(message)
-            
-            # Handle different model outputs
-            if isinstance(results, list):
-                result = results[0]
-            else:
-                result = results
+            results = self._run_text_pipeline(self.emotion_classifier, messages)
             
             # Map model emotions to our emotion types
             emotion_mapping = {
@@ -255,89 +362,90 @@ class AIEmotionAnalyzer:
                 'confused': EmotionType.CONFUSED
             }
             
-            detected_emotion = result.get('label', 'neutral').lower()
-            confidence = result.get('score', 0.5)
-            
-            mapped_emotion = emotion_mapping.get(detected_emotion, EmotionType.NEUTRAL)
-            
-            return {
-                'emotion': mapped_emotion,
-                'confidence': confidence,
-                'raw_result': result
-            }
+            classifications = []
+            for raw in results:
+                # Handle different model outputs
+                result = self._first_result(raw)
+                
+                detected_emotion = result.get('label', 'neutral').lower()
+                confidence = result.get('score', 0.5)
+                
+                classifications.append({
+                    'emotion': emotion_mapping.get(detected_emotion, EmotionType.NEUTRAL),
+                    'confidence': confidence,
+                    'raw_result': result
+                })
+            return classifications
             
         except Exception as e:
             self.logger.error(f"Error in emotion classification: {e}")
-            return {'emotion': EmotionType.NEUTRAL, 'confidence': 0.5}
+            return [{'emotion': EmotionType.NEUTRAL, 'confidence': 0.5} for _ in messages]
     
-    def _get_ai_sentiment_analysis(self, message: str) -> Dict[str, Any]:
-        """Get sentiment analysis from AI model"""
+    def _get_ai_sentiment_analyses(self, messages: List[str]) -> List[Dict[str, Any]]:
+        """Get sentiment analysis for a batch of messages in one pipeline call"""
         
         if not self.sentiment_analyzer:
-            return {'sentiment': 'neutral', 'confidence': 0.5}
+            return [{'sentiment': 'neutral', 'confidence': 0.5} for _ in messages]
         
         try:
-            results = self.sentiment_analyzer(message)
-            
-            if isinstance(results, list):
-                result = results[0]
-            else:
-                result = results
-            
-            sentiment = result.get('label', 'neutral').lower()
-            confidence = result.get('score', 0.5)
+            results = self._run_text_pipeline(self.sentiment_analyzer, messages)
             
-            return {
-                'sentiment': sentiment,
-                'confidence': confidence,
-                'raw_result': result
-            }
+            sentiments = []
+            for raw in results:
+                result = self._first_result(raw)
+                sentiments.append({
+                    'sentiment': result.get('label', 'neutral').lower(),
+                    'confidence': result.get('score', 0.5),
+                    'raw_result': result
+                })
+            return sentiments
             
         except Exception as e:
             self.logger.error(f"Error in sentiment analysis: {e}")
-            return {'sentiment': 'neutral', 'confidence': 0.5}
+            return [{'sentiment': 'neutral', 'confidence': 0.5} for _ in messages]
     
-    def _analyze_context(self, message: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Analyze contextual factors using AI"""
+    def _get_context_embedding(self, call_type: str) -> Any:
+        """Embedding of a call type's context words, encoded once per analyzer"""
+        context_embedding = self._context_embeddings.get(call_type)
+        if context_embedding is None:
+            context_text = ' '.join(self.CONTEXT_EMOTIONS[call_type])
+            context_embedding = self.embedding_model.encode(context_text)
+            self._context_embeddings[call_type] = context_embedding
+        return context_embedding
+    
+    def _analyze_contexts(self, messages: List[str], context: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Analyze contextual factors for a batch of messages using AI"""
         
         if not context:
-            return {'context_emotions': [], 'context_confidence': 0.5}
+            return [{'context_emotions': [], 'context_confidence': 0.5} for _ in messages]
         
         try:
             # Use embedding model to understand semantic context
             if self.embedding_model:
-                message_embedding = self.embedding_model.encode(message)
-                
-                # Define context emotion vectors
-                context_emotions = {
-                    'deadline_pressure': ['stressed', 'rushed', 'pressure', 'deadline'],
-                    'team_meeting': ['collaborative', 'focused', 'professional'],
-                    'client_call': ['formal', 'nervous', 'confident'],
-                    'code_review': ['analytical', 'focused', 'critical'],
-                    'brainstorming': ['creative', 'excited', 'enthusiastic']
-                }
-                
                 call_type = context.get('call_type', '')
-                if call_type in context_emotions:
-                    context_text = ' '.join(context_emotions[call_type])
-                    context_embedding = self.embedding_model.encode(context_text)
+                if call_type in self.CONTEXT_EMOTIONS:
+                    message_embeddings = np.atleast_2d(self.embedding_model.encode(messages))
+                    context_embedding = self._get_context_embedding(call_type)
                     
                     # Calculate similarity
-                    similarity = np.dot(message_embedding, context_embedding) / (
-                        np.linalg.norm(message_embedding) * np.linalg.norm(context_embedding)
+                    similarities = (message_embeddings @ context_embedding) / (
+                        np.linalg.norm(message_embeddings, axis=1) * np.linalg.norm(context_embedding)
                     )
                     
-                    return {
-                        'context_emotions': context_emotions[call_type],
-                        'context_confidence': float(similarity),
-                        'call_type': call_type
-                    }
+                    return [
+                        {
+                            'context_emotions': self.CONTEXT_EMOTIONS[call_type],
+                            'context_confidence': float(similarity),
+                            'call_type': call_type
+                        }
+                        for similarity in similarities
+                    ]
             
-            return {'context_emotions': [], 'context_confidence': 0.5}
+            return [{'context_emotions': [], 'context_confidence': 0.5} for _ in messages]
             
         except Exception as e:
             self.logger.error(f"Error in context analysis: {e}")
-            return {'context_emotions': [], 'context_confidence': 0.5}
+            return [{'context_emotions': [], 'context_confidence': 0.5} for _ in messages]
     
     def _combine_ai_results(self, emotion_results: Dict, sentiment_results: Dict, 
                            context_analysis: Dict) -> Dict[str, Any]:
@@ -436,14 +544,14 @@ class AIEmotionAnalyzer:
         participant_emotions = {}
         overall_flow = []
         
-        for message in messages:
+        # Classify every message in one batched pass through the models
+        message_texts = [message.get('message', '') for message in messages]
+        emotion_analyses = self.analyze_messages_with_ai(message_texts, call_context)
+        
+        for message, message_text, emotion_analysis in zip(messages, message_texts, emotion_analyses):
             participant_id = message.get('participant_id', '')
-            message_text = message.get('message', '')
             timestamp = message.get('timestamp', '')
             
-            # Analyze individual message with AI
-            emotion_analysis = self.analyze_message_with_ai(message_text, call_context)
-            
             # Track participant emotions
             if participant_id not in participant_emotions:
                 participant_emotions[participant_id] = []
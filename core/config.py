@@ -16,6 +16,9 @@ class Settings(BaseSettings):
     
     # Database
     database_url: Optional[str] = None
+    database_pool_size: int = 10
+    database_max_overflow: int = 20
+    database_pool_recycle: int = 1800  # seconds
     
     # Redis
     redis_url: str = "redis://localhost:6379"
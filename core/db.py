@@ -5,10 +5,23 @@ from .config import settings
 # Use database URL from settings, fallback to SQLite for development
 DATABASE_URL = settings.database_url or "sqlite:///./simulation.db"
 
-engine = create_engine(
-    DATABASE_URL, 
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+if "sqlite" in DATABASE_URL:
+    engine = create_engine(
+        DATABASE_URL, 
+        connect_args={"check_same_thread": False}
+    )
+else:
+    # LIFO keeps a small set of hot connections reused and lets overflow
+    # connections idle out after bursts
+    engine = create_engine(
+        DATABASE_URL,
+        pool_size=settings.database_pool_size,
+        max_overflow=settings.database_max_overflow,
+        pool_timeout=30,
+        pool_recycle=settings.database_pool_recycle,
+        pool_pre_ping=True,
+        pool_use_lifo=True
+    )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -0,0 +1,129 @@
+"""
+Contiguous in-memory embedding index for cosine-similarity search
+Keeps all vectors in one float32 matrix so a query is a single BLAS matvec
+"""
+
+from typing import List, Tuple, Optional, Any
+import logging
+import threading
+
+# Lazy imports for heavy dependencies
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+
+logger = logging.getLogger(__name__)
+
+def quantize_rows(vectors: Any) -> Tuple[Any, Any]:
+    """Symmetric per-row int8 quantization: returns (int8 rows, float32 scales)"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors.reshape(1, -1)
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    quantized = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+class EmbeddingIndex:
+    """Cosine-similarity index over a pre-allocated float32 (or int8) matrix"""
+    
+    def __init__(self, dim: int, initial_capacity: int = 1024, quantize: bool = False):
+        """Initialize an empty index for vectors of size dim.
+        
+        With quantize=True rows are stored as int8 with a per-row scale, a
+        quarter of the float32 footprint at a small cost in score precision.
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("EmbeddingIndex requires numpy")
+    
+        self.dim = dim
+        self.quantize = quantize
+        self.ids: List[str] = []
+        capacity = max(initial_capacity, 1)
+        self._matrix = np.empty((capacity, dim), dtype=np.int8 if quantize else np.float32)
+        self._scales = np.empty(capacity, dtype=np.float32) if quantize else None
+        self._lock = threading.RLock()
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    @property
+    def matrix(self) -> Any:
+        """Populated rows (N, dim) as float32, dequantized if needed"""
+        n = len(self.ids)
+        if self.quantize:
+            return self._matrix[:n].astype(np.float32) * self._scales[:n, None]
+        return self._matrix[:n]
+    
+    def _normalize(self, vectors: Any) -> Any:
+        """L2-normalize rows so a dot product equals cosine similarity"""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+    
+    def _reserve(self, needed: int):
+        """Grow capacity geometrically so inserts are amortized O(1)"""
+        capacity = self._matrix.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        n = len(self.ids)
+        grown = np.empty((capacity, self.dim), dtype=self._matrix.dtype)
+        grown[:n] = self._matrix[:n]
+        self._matrix = grown
+        if self.quantize:
+            grown_scales = np.empty(capacity, dtype=np.float32)
+            grown_scales[:n] = self._scales[:n]
+            self._scales = grown_scales
+    
+    def add(self, item_id: str, vector: Any):
+        """Add a single embedding (array-like, e.g. from models.decode_embedding)"""
+        self.add_batch([item_id], [vector])
+    
+    def add_batch(self, item_ids: List[str], vectors: Any):
+        """Add several embeddings at once"""
+        if not item_ids:
+            return
+        normalized = self._normalize(vectors)
+        if normalized.shape[0] != len(item_ids):
+            raise ValueError("item_ids and vectors must have the same length")
+    
+        with self._lock:
+            start = len(self.ids)
+            self._reserve(start + len(item_ids))
+            end = start + len(item_ids)
+            if self.quantize:
+                self._matrix[start:end], self._scales[start:end] = quantize_rows(normalized)
+            else:
+                self._matrix[start:end] = normalized
+            self.ids.extend(item_ids)
+    
+    def search(self, query: Any, k: int = 5, min_score: Optional[float] = None) -> List[Tuple[str, float]]:
+        """Return up to k (id, cosine similarity) pairs, best first"""
+        with self._lock:
+            n = len(self.ids)
+            if n == 0 or k <= 0:
+                return []
+            scores = self._matrix[:n] @ self._normalize(query)[0]
+            if self.quantize:
+                scores *= self._scales[:n]
+            # ids is append-only, so the first n entries stay valid after unlock
+            ids = self.ids
+    
+        k = min(k, n)
+        # argpartition is O(n); only the k candidates get fully sorted
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+    
+        results = []
+        for idx in top:
+            score = float(scores[idx])
+            if min_score is not None and score < min_score:
+                break
+            results.append((ids[idx], score))
+        return results
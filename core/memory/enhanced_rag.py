@@ -10,7 +10,7 @@ from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 import logging
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 import threading
 import asyncio
 
@@ -22,10 +22,46 @@ except ImportError:
     NUMPY_AVAILABLE = False
     np = None
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    njit = None
+
 # SentenceTransformer and FAISS will be imported lazily in _ensure_model_loaded
 
 logger = logging.getLogger(__name__)
 
+# High importance keywords used by _calculate_importance_score
+IMPORTANT_KEYWORDS = (
+    "critical", "urgent", "important", "deadline", "issue", "problem",
+    "decision", "milestone", "requirement", "architecture", "design"
+)
+
+def _score_sentences(word_counts, n):
+    """Score sentences by length, preferring those near the beginning"""
+    positions = np.arange(n)
+    return word_counts * (1.0 - positions / n * 0.5)
+
+def _sum_importance(keyword_hits, word_counts):
+    """Sum keyword hits plus a capped length bonus across messages"""
+    score = 0.0
+    for i in range(keyword_hits.shape[0]):
+        score += keyword_hits[i] + min(word_counts[i] / 20, 1.0)
+    return score
+
+if NUMBA_AVAILABLE and NUMPY_AVAILABLE:
+    _score_sentences = njit(cache=True, fastmath=True)(_score_sentences)
+    _sum_importance = njit(cache=True, fastmath=True)(_sum_importance)
+
+    def _warm_jit_kernels():
+        """Compile the kernels up front so the first request isn't slow"""
+        _score_sentences(np.ones(3, dtype=np.int32), 3)
+        _sum_importance(np.ones(3, dtype=np.int32), np.ones(3, dtype=np.int32))
+
+    threading.Thread(target=_warm_jit_kernels, daemon=True).start()
+
 @dataclass
 class ConversationSummary:
     """Summarized conversation chunk"""
@@ -85,6 +121,8 @@ class EnhancedRAGManager:
         # FAISS indexes (will be initialized when model loads)
         self.message_index = None
         self.summary_index = None
+        # Summary index is an IDMap keyed by a stable 64-bit id per summary
+        self._sid_by_int: Dict[int, str] = {}
         
         # Memory storage
         self.raw_messages: Dict[str, Dict] = {}
@@ -106,16 +144,85 @@ class EnhancedRAGManager:
         # Caching
         self.embedding_cache: Dict[str, Any] = {}  # Changed from np.ndarray to Any
         self.summary_cache: Dict[str, str] = {}
+        # Recent text -> embedding memo; str hashes are cached on the object, so
+        # repeat queries/summaries skip the md5 digest entirely
+        self._embedding_memo: "OrderedDict[str, Any]" = OrderedDict()
+        self._embedding_memo_size = 256
+        
+        # Locking: embedding cache and FAISS indexes are shared, conversation
+        # buffers are sharded per conversation so ingestion can run in parallel
+        self._cache_lock = threading.RLock()
+        self._index_lock = threading.RLock()
+        self._conv_locks: Dict[str, threading.RLock] = {}
+        self._conv_locks_lock = threading.Lock()
+    
+    def _ensure_model_loaded(self):
+        """Ensure embedding model and FAISS indexes are loaded (lazy loading)"""
+        if self._model_initialized:
+            return
+        with self._index_lock:
+            if self._model_initialized:
+                return
+            try:
+                # Import heavy dependencies only when needed
+                global np
+                if not NUMPY_AVAILABLE:
+                    import numpy as np
+                
+                from sentence_transformers import SentenceTransformer
+                import faiss
+                
+                self.embedding_model = SentenceTransformer(self.embedding_model_name)
+                self.embedding_dim = self.embedding_model.get_sentence_embedding_dimension()
+                
+                # Initialize FAISS indexes
+                self.message_index = faiss.IndexFlatIP(self.embedding_dim)
+                self.summary_index = faiss.IndexIDMap2(faiss.IndexFlatIP(self.embedding_dim))
+                
+                self._model_initialized = True
+                
+            except ImportError as e:
+                logger.warning(f"Could not load ML dependencies: {e}. RAG features will be limited.")
+            except Exception as e:
+                logger.error(f"Error loading embedding model: {e}")
+    
+    @staticmethod
+    def _summary_int_id(summary_id: str) -> int:
+        """Stable signed 64-bit id for a summary, used as its FAISS id"""
+        digest = hashlib.blake2b(summary_id.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, 'big', signed=True)
+    
+    def _get_conversation_lock(self, conversation_id: str) -> threading.RLock:
+        """Get (or create) the lock guarding a conversation buffer"""
+        with self._conv_locks_lock:
+            lock = self._conv_locks.get(conversation_id)
+            if lock is None:
+                lock = self._conv_locks[conversation_id] = threading.RLock()
+            return lock
         
     def _get_embedding_cached(self, text: str) -> Any:  # Changed return type for lazy loading
         """Get embedding with caching"""
+        with self._cache_lock:
+            embedding = self._embedding_memo.get(text)
+            if embedding is not None:
+                self._embedding_memo.move_to_end(text)
+                return embedding
+        
         # Use hash of text as cache key
         cache_key = hashlib.md5(text.encode()).hexdigest()
         
-        if cache_key not in self.embedding_cache:
-            self.embedding_cache[cache_key] = self.embedding_model.encode([text])[0]
-        
-        return self.embedding_cache[cache_key]
+        with self._cache_lock:
+            embedding = self.embedding_cache.get(cache_key)
+        if embedding is None:
+            # Encode outside the lock so other threads are not blocked on the model
+            embedding = self.embedding_model.encode([text])[0]
+        
+        with self._cache_lock:
+            embedding = self.embedding_cache.setdefault(cache_key, embedding)
+            self._embedding_memo[text] = embedding
+            if len(self._embedding_memo) > self._embedding_memo_size:
+                self._embedding_memo.popitem(last=False)
+            return embedding
     
     def _estimate_tokens(self, text: str) -> int:
         """Estimate token count (rough approximation)"""
@@ -177,6 +284,18 @@ class EnhancedRAGManager:
         if len(sentences) <= 3:
             return text
         
+        if NUMPY_AVAILABLE:
+            # Vectorized scoring; argpartition selects the top 3 in O(n)
+            n = len(sentences)
+            word_counts = np.fromiter(
+                (len(s.split()) for s in sentences), dtype=np.int32, count=n
+            )
+            scores = _score_sentences(word_counts, n)
+            top_idx = np.argpartition(-scores, 3)[:3]
+            top_idx_sorted = top_idx[np.argsort(-scores[top_idx])]
+            summary = '. '.join(sentences[i] for i in top_idx_sorted)
+            return summary[:500]
+
         # Simple scoring based on length and position
         scores = []
         for i, sentence in enumerate(sentences):
@@ -192,19 +311,29 @@ class EnhancedRAGManager:
     
     def _calculate_importance_score(self, messages: List[Dict]) -> float:
         """Calculate importance score for messages"""
+        if not messages:
+            return 0.0
+        
+        if NUMPY_AVAILABLE:
+            contents = [msg.get("message", "").lower() for msg in messages]
+            n = len(contents)
+            keyword_hits = np.fromiter(
+                (sum(1 for keyword in IMPORTANT_KEYWORDS if keyword in content)
+                 for content in contents),
+                dtype=np.int32, count=n
+            )
+            word_counts = np.fromiter(
+                (len(content.split()) for content in contents), dtype=np.int32, count=n
+            )
+            return min(float(_sum_importance(keyword_hits, word_counts)) / n, 1.0)
+        
         # Simple scoring based on message characteristics
         score = 0.0
         
         for msg in messages:
             content = msg.get("message", "").lower()
             
-            # High importance keywords
-            important_keywords = [
-                "critical", "urgent", "important", "deadline", "issue", "problem",
-                "decision", "milestone", "requirement", "architecture", "design"
-            ]
-            
-            score += sum(1 for keyword in important_keywords if keyword in content)
+            score += sum(1 for keyword in IMPORTANT_KEYWORDS if keyword in content)
             
             # Message length bonus
             score += min(len(content.split()) / 20, 1.0)
@@ -242,6 +371,7 @@ class EnhancedRAGManager:
                    agent_id: Optional[str] = None,
                    message_type: str = "general") -> str:
         """Add message with intelligent buffering and summarization"""
+        self._ensure_model_loaded()
         
         # Create message object
         message_id = f"msg_{int(time.time())}_{hash(content) % 10000}"
@@ -254,27 +384,28 @@ class EnhancedRAGManager:
             "agent_id": agent_id,
             "message_type": message_type,
             "timestamp": datetime.now().isoformat(),
+            "timestamp_ns": time.time_ns(),
             "tokens": self._estimate_tokens(content)
         }
         
         # Store raw message
         self.raw_messages[message_id] = message
         
-        # Add to conversation buffer
-        self.conversation_buffers[conversation_id].append(message)
-        
-        # Check if we need to summarize
-        if self._should_summarize_conversation(conversation_id):
-            self._process_conversation_buffer(conversation_id)
+        with self._get_conversation_lock(conversation_id):
+            # Add to conversation buffer
+            self.conversation_buffers[conversation_id].append(message)
+            
+            # Check if we need to summarize
+            if self._should_summarize_conversation(conversation_id):
+                self._process_conversation_buffer(conversation_id)
         
         # Update project memory index
-        if project_id not in self.project_memories:
-            self.project_memories[project_id] = []
-        self.project_memories[project_id].append(message_id)
+        self.project_memories.setdefault(project_id, []).append(message_id)
         
         # Add to FAISS index
         embedding = self._get_embedding_cached(content)
-        self.message_index.add(embedding.reshape(1, -1))
+        with self._index_lock:
+            self.message_index.add(embedding.reshape(1, -1))
         
         return message_id
     
@@ -298,7 +429,13 @@ class EnhancedRAGManager:
             
             # Add summary to FAISS index
             if summary.embedding is not None:
-                self.summary_index.add(summary.embedding.reshape(1, -1))
+                int_id = self._summary_int_id(summary.id)
+                with self._index_lock:
+                    self.summary_index.add_with_ids(
+                        summary.embedding.reshape(1, -1),
+                        np.array([int_id], dtype='int64')
+                    )
+                    self._sid_by_int[int_id] = summary.id
             
             logger.info(f"Summarized {len(to_summarize)} messages for conversation {conversation_id}")
         
@@ -313,7 +450,8 @@ class EnhancedRAGManager:
         """Get optimized context window for query"""
         
         # Get recent messages from buffer
-        recent_messages = self.conversation_buffers.get(conversation_id, [])[-10:]
+        with self._get_conversation_lock(conversation_id):
+            recent_messages = self.conversation_buffers.get(conversation_id, [])[-10:]
         
         # Get relevant summaries using semantic search
         relevant_summaries = self._search_relevant_summaries(
@@ -355,19 +493,21 @@ class EnhancedRAGManager:
         
         # Search in summary index
         try:
-            similarities, indices = self.summary_index.search(
-                query_embedding.reshape(1, -1), 
-                min(limit, len(self.conversation_summaries))
-            )
+            with self._index_lock:
+                similarities, indices = self.summary_index.search(
+                    query_embedding.reshape(1, -1), 
+                    min(limit, len(self.conversation_summaries))
+                )
             
-            # Get summaries
-            summary_ids = list(self.conversation_summaries.keys())
+            # Indices are the summary int ids assigned in add_with_ids
             relevant_summaries = []
             
-            for i, (similarity, idx) in enumerate(zip(similarities[0], indices[0])):
-                if idx < len(summary_ids) and similarity > 0.3:  # Threshold for relevance
-                    summary_id = summary_ids[idx]
-                    relevant_summaries.append(self.conversation_summaries[summary_id])
+            for similarity, idx in zip(similarities[0], indices[0]):
+                if similarity <= 0.3:  # Threshold for relevance
+                    continue
+                summary = self.conversation_summaries.get(self._sid_by_int.get(int(idx)))
+                if summary is not None:
+                    relevant_summaries.append(summary)
             
             return relevant_summaries
             
@@ -482,11 +622,12 @@ class EnhancedRAGManager:
     def cleanup_old_data(self, days_old: int = 30):
         """Clean up old data to manage memory"""
         cutoff_date = datetime.now() - timedelta(days=days_old)
+        cutoff_ns = int(cutoff_date.timestamp() * 1e9)
         
-        # Clean old messages
+        # Clean old messages (integer compare, no ISO parsing per message)
         old_message_ids = [
             msg_id for msg_id, msg in self.raw_messages.items()
-            if datetime.fromisoformat(msg["timestamp"]) < cutoff_date
+            if msg["timestamp_ns"] < cutoff_ns
         ]
         
         for msg_id in old_message_ids:
@@ -498,8 +639,16 @@ class EnhancedRAGManager:
             if summary.timestamp < cutoff_date
         ]
         
+        old_int_ids = []
         for summary_id in old_summary_ids:
             del self.conversation_summaries[summary_id]
+            int_id = self._summary_int_id(summary_id)
+            if self._sid_by_int.pop(int_id, None) is not None:
+                old_int_ids.append(int_id)
+        
+        if old_int_ids and self.summary_index is not None:
+            with self._index_lock:
+                self.summary_index.remove_ids(np.array(old_int_ids, dtype='int64'))
         
         logger.info(f"Cleaned {len(old_message_ids)} old messages and {len(old_summary_ids)} old summaries")
     
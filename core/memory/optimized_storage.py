@@ -3,13 +3,57 @@ Optimized Memory Storage System for SimWorld
 Provides efficient caching and batch operations for better performance
 """
 
-import asyncio
-import json
+import logging
+import threading
 import time
-from typing import Dict, List, Optional, Any
-from collections import defaultdict, deque
-from threading import Lock
-import hashlib
+from typing import Dict, List, Optional, Tuple
+from collections import defaultdict, OrderedDict
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+@dataclass(slots=True)
+class StorageStats:
+    """Snapshot of OptimizedMemoryStorage cache and write statistics"""
+    cache_hits: int
+    cache_misses: int
+    total_requests: int
+    hit_rate: str
+    hit_rate_percent: float
+    write_batches: int
+    pending_writes: int
+    cached_conversations: int
+    cached_projects: int
+    cached_agent_contexts: int
+    total_cache_size: int
+    max_cache_size: int
+
+@dataclass(slots=True)
+class AgentContext:
+    """Cached per-agent, per-project context (slotted to keep cache RSS low)"""
+    agent_id: str
+    project_id: str
+    generated_at: float
+    recent_conversations: List[Dict] = field(default_factory=list)
+    key_decisions: List[Dict] = field(default_factory=list)
+    current_tasks: List[Dict] = field(default_factory=list)
+
+class _AtomicCounter:
+    """Thread-safe counter; a plain int guarded by a small lock so reads never disturb it"""
+    __slots__ = ("_lock", "_value")
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0
+    
+    def increment(self):
+        with self._lock:
+            self._value += 1
+    
+    @property
+    def value(self) -> int:
+        with self._lock:
+            return self._value
 
 class OptimizedMemoryStorage:
     """Optimized memory storage with efficient caching and batch operations"""
@@ -18,280 +62,222 @@ class OptimizedMemoryStorage:
         self.max_cache_size = max_cache_size
         self.batch_size = batch_size
         
-        # Memory caches
-        self._conversation_cache = {}
-        self._project_cache = {}
-        self._agent_context_cache = {}
+        # Memory caches (OrderedDict insertion order doubles as LRU order)
+        self._conversation_cache = OrderedDict()
+        self._project_cache = OrderedDict()
+        self._agent_context_cache: "OrderedDict[Tuple[str, str], AgentContext]" = OrderedDict()
         
-        # Write batching
-        self._write_queue = deque()
-        self._write_lock = Lock()
-        self._last_batch_write = time.time()
+        # Reverse indexes: project_id -> cache keys, for O(k) project clears
+        self._conv_by_project: Dict[str, set] = defaultdict(set)
+        self._agents_by_project: Dict[str, set] = defaultdict(set)
         
-        # Performance tracking
-        self._cache_hits = 0
-        self._cache_misses = 0
-        self._write_batches = 0
+        # Write batching: producers append to parallel (SoA) columns and
+        # signal, a background thread drains on the signal or every interval
+        self._queue_lock = threading.Lock()  # only guards the append/swap
+        self._q_conv_ids: List[Optional[str]] = []
+        self._q_payloads: List[Dict] = []
+        self._flush_interval = 5.0  # seconds
+        self._flush_event = threading.Event()
+        self._flush_lock = threading.Lock()  # held while a drain is in progress
+        self._stop = False
+        self._flusher_thread = threading.Thread(target=self._run_flusher, daemon=True)
+        self._flusher_thread.start()
         
-        # LRU tracking
-        self._access_order = deque()
-        self._access_times = {}
+        # Performance tracking
+        self._cache_hits = _AtomicCounter()
+        self._cache_misses = _AtomicCounter()
+        self._write_batches = _AtomicCounter()
     
     def get_conversation(self, conversation_id: str) -> Optional[Dict]:
         """Get conversation with caching"""
         # Check cache first
-        if conversation_id in self._conversation_cache:
-            self._update_access_time(f"conv_{conversation_id}")
-            self._cache_hits += 1
-            return self._conversation_cache[conversation_id]
+        conversation = self._conversation_cache.get(conversation_id)
+        if conversation is not None:
+            self._conversation_cache.move_to_end(conversation_id)
+            self._cache_hits.increment()
+            return conversation
         
-        self._cache_misses += 1
+        self._cache_misses.increment()
         # Would load from persistent storage here
         return None
     
     def cache_conversation(self, conversation_id: str, conversation_data: Dict):
         """Cache conversation data efficiently"""
-        cache_key = f"conv_{conversation_id}"
-        
-        # Add to cache
+        # Add to cache as most recently used
         self._conversation_cache[conversation_id] = conversation_data
-        self._update_access_time(cache_key)
+        self._conversation_cache.move_to_end(conversation_id)
+        
+        project_id = conversation_data.get('project_id')
+        if project_id:
+            self._conv_by_project[project_id].add(conversation_id)
         
         # Manage cache size
         self._cleanup_cache_if_needed()
     
-    def _cleanup_cache_if_needed(self):
-        """Clean up cache if it exceeds max size using LRU eviction"""
-        if len(self._conversation_cache) > self.max_cache_size:
-            # Remove 10% of oldest entries
-            num_to_remove = max(1, int(self.max_cache_size * 0.1))
-            
-            # Sort by access time and remove oldest
-            sorted_items = sorted(
-                self._access_times.items(), 
-                key=lambda x: x[1]
-            )
-            
-            for i in range(min(num_to_remove, len(sorted_items))):
-                cache_key = sorted_items[i][0]
-                if cache_key.startswith("conv_"):
-                    conv_id = cache_key[5:]  # Remove "conv_" prefix
-                    if conv_id in self._conversation_cache:
-                        del self._conversation_cache[conv_id]
-                elif cache_key.startswith("agent_"):
-                    if cache_key in self._agent_context_cache:
-                        del self._agent_context_cache[cache_key]
-                
-                # Remove from tracking
-                del self._access_times[cache_key]
-    
-    def _update_access_time(self, cache_key: str):
-        """Update access time for LRU tracking"""
-        import time
-        self._access_times[cache_key] = time.time()
-        
-        # Also update access order for efficient LRU
-        if cache_key in self._access_order:
-            self._access_order.remove(cache_key)
-        self._access_order.append(cache_key)
+    def batch_add_memory(self, memories: List[Dict]):
+        """Add multiple memories efficiently in batch (never blocks on flushing)"""
+        conv_ids = [memory.get('conversation_id') for memory in memories]
+        with self._queue_lock:
+            self._q_conv_ids.extend(conv_ids)
+            self._q_payloads.extend(memories)
+            pending = len(self._q_payloads)
         
-        # Limit access order tracking
-        if len(self._access_order) > self.max_cache_size * 2:
-            # Remove oldest half
-            for _ in range(len(self._access_order) // 2):
-                old_key = self._access_order.popleft()
-                if old_key in self._access_times:
-                    del self._access_times[old_key]
+        if pending >= self.batch_size:
+            self._flush_event.set()
     
-    def batch_add_memory(self, memories: List[Dict]):
-        """Add multiple memories efficiently in batch"""
-        with self._write_lock:
-            self._write_queue.extend(memories)
-            
-            # Process batch if queue is full or enough time has passed
-            if (len(self._write_queue) >= self.batch_size or 
-                time.time() - self._last_batch_write > 5.0):  # 5 second timeout
-                self._process_write_batch()
+    def _run_flusher(self):
+        """Background loop: drain when signalled or when the interval elapses"""
+        while not self._stop:
+            self._flush_event.wait(self._flush_interval)
+            self._flush_event.clear()
+            self._drain_batches()
+    
+    def _drain_batches(self):
+        """Process everything queued so far in batches of up to batch_size"""
+        with self._flush_lock:
+            conv_ids, payloads = self._take_pending_writes()
+            for start in range(0, len(payloads), self.batch_size):
+                end = start + self.batch_size
+                self._process_write_batch(conv_ids[start:end], payloads[start:end])
+    
+    def _take_pending_writes(self):
+        """Swap out the queued columns, leaving fresh empty ones for producers"""
+        with self._queue_lock:
+            conv_ids, payloads = self._q_conv_ids, self._q_payloads
+            self._q_conv_ids, self._q_payloads = [], []
+        return conv_ids, payloads
     
-    def _process_write_batch(self):
+    def _process_write_batch(self, conv_ids: List[Optional[str]], payloads: List[Dict]):
         """Process queued writes in batch"""
-        if not self._write_queue:
+        if not payloads:
             return
         
-        batch = []
-        while self._write_queue and len(batch) < self.batch_size:
-            batch.append(self._write_queue.popleft())
-        
         # Process batch (would write to persistent storage)
-        print(f"[MEMORY] Processing batch of {len(batch)} memories")
-        self._write_batches += 1
-        self._last_batch_write = time.time()
+        logger.debug("Processing batch of %d memories", len(payloads))
+        self._write_batches.increment()
         
-        # Update caches with new data
-        for memory in batch:
-            if 'conversation_id' in memory:
-                conv_id = memory['conversation_id']
-                if conv_id in self._conversation_cache:
-                    # Update cached conversation with new memory
-                    self._conversation_cache[conv_id].setdefault('memories', []).append(memory)
+        # Update caches with new data, dispatching on the conversation id column
+        for conv_id, memory in zip(conv_ids, payloads):
+            if conv_id is None:
+                continue
+            conversation = self._conversation_cache.get(conv_id)
+            if conversation is not None:
+                # Update cached conversation with new memory
+                conversation.setdefault('memories', []).append(memory)
     
-    def get_agent_context(self, agent_id: str, project_id: str) -> Dict:
+    def get_agent_context(self, agent_id: str, project_id: str) -> AgentContext:
         """Get cached agent context for faster responses"""
-        cache_key = f"agent_{agent_id}_{project_id}"
+        cache_key = (agent_id, project_id)
         
-        if cache_key in self._agent_context_cache:
-            self._update_access_time(cache_key)
-            self._cache_hits += 1
-            return self._agent_context_cache[cache_key]
+        context = self._agent_context_cache.get(cache_key)
+        if context is not None:
+            self._agent_context_cache.move_to_end(cache_key)
+            self._cache_hits.increment()
+            return context
         
-        self._cache_misses += 1
+        self._cache_misses.increment()
         # Generate and cache context
         context = self._generate_agent_context(agent_id, project_id)
         
         self._agent_context_cache[cache_key] = context
-        self._update_access_time(cache_key)
+        self._agents_by_project[project_id].add(cache_key)
         self._cleanup_cache_if_needed()
         
         return context
     
-    def _generate_agent_context(self, agent_id: str, project_id: str) -> Dict:
+    def _generate_agent_context(self, agent_id: str, project_id: str) -> AgentContext:
         """Generate agent context from memories"""
         # This would fetch relevant memories and build context
-        return {
-            "agent_id": agent_id,
-            "project_id": project_id,
-            "recent_conversations": [],
-            "key_decisions": [],
-            "current_tasks": [],
-            "generated_at": time.time()
-        }
+        return AgentContext(
+            agent_id=agent_id,
+            project_id=project_id,
+            generated_at=time.time()
+        )
     
-    def _update_access_time(self, cache_key: str):
-        """Update LRU access tracking"""
-        current_time = time.time()
+    def _cleanup_cache_if_needed(self):
+        """Evict least recently used entries from any cache over its limit"""
+        while len(self._conversation_cache) > self.max_cache_size:
+            conv_id, conversation = self._conversation_cache.popitem(last=False)
+            project_convs = self._conv_by_project.get(conversation.get('project_id'))
+            if project_convs is not None:
+                project_convs.discard(conv_id)
         
-        # Remove from current position if exists
-        if cache_key in self._access_times:
-            # Find and remove from access_order
-            try:
-                self._access_order.remove(cache_key)
-            except ValueError:
-                pass
+        while len(self._project_cache) > self.max_cache_size:
+            self._project_cache.popitem(last=False)
         
-        # Add to end (most recent)
-        self._access_order.append(cache_key)
-        self._access_times[cache_key] = current_time
+        while len(self._agent_context_cache) > self.max_cache_size:
+            cache_key, _ = self._agent_context_cache.popitem(last=False)
+            project_agents = self._agents_by_project.get(cache_key[1])
+            if project_agents is not None:
+                project_agents.discard(cache_key)
     
-    def _cleanup_cache_if_needed(self):
-        """Clean up cache using LRU if size exceeds limit"""
-        total_cache_items = (len(self._conversation_cache) + 
-                           len(self._project_cache) + 
-                           len(self._agent_context_cache))
+    def get_performance_stats(self) -> StorageStats:
+        """Get cache and write-batching statistics"""
+        cache_hits = self._cache_hits.value
+        cache_misses = self._cache_misses.value
+        total_requests = cache_hits + cache_misses
+        hit_rate = (cache_hits / total_requests * 100) if total_requests > 0 else 0
         
-        if total_cache_items > self.max_cache_size:
-            # Remove oldest 10% of items
-            items_to_remove = int(self.max_cache_size * 0.1)
-            
-            for _ in range(items_to_remove):
-                if not self._access_order:
-                    break
-                
-                oldest_key = self._access_order.popleft()
-                
-                # Remove from appropriate cache
-                if oldest_key.startswith("conv_"):
-                    conv_id = oldest_key[5:]  # Remove "conv_" prefix
-                    self._conversation_cache.pop(conv_id, None)
-                elif oldest_key.startswith("proj_"):
-                    proj_id = oldest_key[5:]  # Remove "proj_" prefix
-                    self._project_cache.pop(proj_id, None)
-                elif oldest_key.startswith("agent_"):
-                    self._agent_context_cache.pop(oldest_key, None)
-                
-                self._access_times.pop(oldest_key, None)
-    
-    def get_performance_stats(self) -> Dict:
-        """Get performance statistics"""
-        total_requests = self._cache_hits + self._cache_misses
-        hit_rate = (self._cache_hits / total_requests * 100) if total_requests > 0 else 0
+        cached_conversations = len(self._conversation_cache)
+        cached_projects = len(self._project_cache)
+        cached_agent_contexts = len(self._agent_context_cache)
         
-        return {
-            "cache_hits": self._cache_hits,
-            "cache_misses": self._cache_misses,
-            "hit_rate": f"{hit_rate:.2f}%",
-            "write_batches": self._write_batches,
-            "pending_writes": len(self._write_queue),
-            "cached_conversations": len(self._conversation_cache),
-            "cached_projects": len(self._project_cache),
-            "cached_agent_contexts": len(self._agent_context_cache),
-            "total_cache_size": (len(self._conversation_cache) + 
-                               len(self._project_cache) + 
-                               len(self._agent_context_cache))
-        }
+        return StorageStats(
+            cache_hits=cache_hits,
+            cache_misses=cache_misses,
+            total_requests=total_requests,
+            hit_rate=format(hit_rate, '.2f') + '%',
+            hit_rate_percent=round(hit_rate, 2),
+            write_batches=self._write_batches.value,
+            pending_writes=len(self._q_payloads),
+            cached_conversations=cached_conversations,
+            cached_projects=cached_projects,
+            cached_agent_contexts=cached_agent_contexts,
+            total_cache_size=cached_conversations + cached_projects + cached_agent_contexts,
+            max_cache_size=self.max_cache_size,
+        )
     
     def force_flush_writes(self):
         """Force process all pending writes"""
-        with self._write_lock:
-            while self._write_queue:
-                self._process_write_batch()
+        # Taking the flush lock also waits out any drain already in progress
+        self._drain_batches()
+    
+    def close(self):
+        """Stop the background flusher, writing out anything still queued"""
+        self._stop = True
+        self._flush_event.set()
+        self._flusher_thread.join()
+        # Catch writes queued while the flusher was finishing its last drain
+        self._drain_batches()
     
     def clear_cache(self, cache_type: Optional[str] = None):
         """Clear specific cache or all caches"""
         if cache_type == "conversations" or cache_type is None:
             self._conversation_cache.clear()
+            self._conv_by_project.clear()
         if cache_type == "projects" or cache_type is None:
             self._project_cache.clear()
         if cache_type == "agents" or cache_type is None:
             self._agent_context_cache.clear()
-        
-        if cache_type is None:
-            self._access_order.clear()
-            self._access_times.clear()
+            self._agents_by_project.clear()
     
     def clear_all_memory(self):
         """ADMIN: Clear all optimized storage memory"""
         self.clear_cache()
-        self._write_queue.clear()
+        self._take_pending_writes()
         print("OptimizedMemoryStorage: All memory and caches cleared")
     
     def clear_project_memory(self, project_id: str):
         """ADMIN: Clear memory for a specific project"""
         # Remove project-specific conversations from cache
-        to_remove = []
-        for conv_id, conv_data in self._conversation_cache.items():
-            if conv_data.get('project_id') == project_id:
-                to_remove.append(conv_id)
-        
-        for conv_id in to_remove:
+        for conv_id in self._conv_by_project.pop(project_id, ()):
             self._conversation_cache.pop(conv_id, None)
         
         # Remove project-specific agent contexts
-        to_remove_agents = []
-        for cache_key in self._agent_context_cache.keys():
-            if f"_{project_id}" in cache_key:
-                to_remove_agents.append(cache_key)
-        
-        for cache_key in to_remove_agents:
+        for cache_key in self._agents_by_project.pop(project_id, ()):
             self._agent_context_cache.pop(cache_key, None)
         
         print(f"OptimizedMemoryStorage: Memory cleared for project {project_id}")
-    
-    def get_cache_stats(self) -> Dict[str, Any]:
-        """Get cache performance statistics"""
-        total_requests = self._cache_hits + self._cache_misses
-        hit_rate = (self._cache_hits / total_requests * 100) if total_requests > 0 else 0
-        
-        return {
-            "cache_hits": self._cache_hits,
-            "cache_misses": self._cache_misses,
-            "hit_rate_percent": round(hit_rate, 2),
-            "total_requests": total_requests,
-            "cache_size": len(self._conversation_cache),
-            "max_cache_size": self.max_cache_size,
-            "write_batches_processed": self._write_batches,
-            "pending_writes": len(self._write_queue),
-            "agent_contexts_cached": len(self._agent_context_cache)
-        }
 
 # Global instance for the application
 optimized_storage = OptimizedMemoryStorage()
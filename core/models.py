@@ -1,12 +1,76 @@
 from sqlalchemy import (
-    Column, Integer, String, DateTime, Text, ForeignKey, Float, Date, JSON, Boolean
+    Column, Integer, String, DateTime, Text, ForeignKey, Float, Date, JSON, Boolean,
+    LargeBinary, Index, Enum as SAEnum
 )
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.orm import declarative_base, relationship, deferred
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.ext.compiler import compiles
 from datetime import datetime, date
 from enum import Enum
 
 Base = declarative_base()
 
+# --- Timestamps ---
+# ORM inserts are stamped by the Python default; the matching server default
+# covers rows written with raw SQL. Tables created before the server defaults
+# were added have no DB-side default, so the Python default must stay.
+# Columns stay naive UTC so existing Python comparisons still work.
+
+class utcnow(FunctionElement):
+    """Current UTC time as a naive timestamp, evaluated by the database"""
+    type = DateTime()
+    inherit_cache = True
+
+@compiles(utcnow)
+def _compile_utcnow(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+@compiles(utcnow, 'sqlite')
+def _compile_utcnow_sqlite(element, compiler, **kw):
+    # CURRENT_TIMESTAMP only has whole seconds on SQLite; %f keeps milliseconds for ordering
+    return "STRFTIME('%Y-%m-%d %H:%M:%f', 'now')"
+
+@compiles(utcnow, 'postgresql')
+def _compile_utcnow_postgresql(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+# --- JSON storage ---
+# PostgreSQL stores JSON documents as parsed JSONB (no re-parse on read, GIN
+# indexable); other backends keep the generic JSON type.
+JSONType = JSON().with_variant(JSONB(), 'postgresql')
+
+# --- Embedding (de)serialization ---
+# Embeddings are stored as contiguous float32 bytes (4 bytes/dim) rather than
+# JSON lists, so reads decode straight into a NumPy array without parsing.
+
+def encode_embedding(embedding):
+    """Pack an embedding vector into float32 bytes for storage"""
+    if embedding is None:
+        return None
+    import numpy as np
+    return np.asarray(embedding, dtype=np.float32).tobytes()
+
+def decode_embedding(data, scale=None):
+    """Unpack stored bytes into a float32 NumPy vector.
+
+    When scale is given the bytes are int8 codes from quantize_embedding.
+    """
+    if data is None:
+        return None
+    import numpy as np
+    if scale is not None:
+        return np.frombuffer(data, dtype=np.int8).astype(np.float32) * scale
+    return np.frombuffer(data, dtype=np.float32)
+
+def quantize_embedding(embedding):
+    """Pack an embedding as int8 bytes plus its scale (a quarter of float32 size)"""
+    if embedding is None:
+        return None, None
+    from .memory.embedding_index import quantize_rows
+    codes, scales = quantize_rows(embedding)
+    return codes[0].tobytes(), float(scales[0])
+
 # --- Enumerations for Roles, Phases, and Conversation Types ---
 
 class ProjectRole(str, Enum):
@@ -53,6 +117,23 @@ class ConversationStatus(str, Enum):
     SCHEDULED = "scheduled"
     PENDING = "pending"
 
+def _enum_column(enum_cls, name):
+    """Enum column that stores member values and loads members.
+
+    PostgreSQL gets a native ENUM type (4 bytes per row, catalog-checked);
+    other backends fall back to VARCHAR(50). Rows materialize as the shared
+    enum singletons, and since the enums subclass str, comparisons against
+    plain values work.
+    """
+    return SAEnum(
+        enum_cls,
+        name=name,
+        native_enum=True,
+        length=50,
+        validate_strings=True,
+        values_callable=lambda members: [member.value for member in members],
+    )
+
 # --- SQLAlchemy Database Models ---
 
 class User(Base):
@@ -64,9 +145,9 @@ class User(Base):
     full_name = Column(String(200), nullable=False)
     role = Column(String(50), default="user")  # user, admin
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=utcnow())
     last_login = Column(DateTime, nullable=True)
-    preferences = Column(JSON, default=dict)
+    preferences = Column(JSONType, default=dict)
 
     projects = relationship('ProjectMember', back_populates='user')
     sessions = relationship('UserSession', back_populates='user')
@@ -77,7 +158,7 @@ class UserSession(Base):
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     session_id = Column(String(200), unique=True, nullable=False)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=utcnow())
     expires_at = Column(DateTime, nullable=False)
     
     user = relationship('User', back_populates='sessions')
@@ -88,65 +169,87 @@ class Project(Base):
     name = Column(String(200), nullable=False)
     description = Column(Text)
     created_by = Column(Integer, ForeignKey('users.id'))
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=utcnow())
     start_date = Column(Date, default=date.today)
     end_date = Column(Date, nullable=True)
-    current_phase = Column(String(50), default=ProjectPhase.PLANNING)
+    current_phase = Column(_enum_column(ProjectPhase, 'project_phase'), default=ProjectPhase.PLANNING)
     is_active = Column(Boolean, default=True)
-    settings = Column(JSON, default=dict)  # Project-specific settings
+    settings = Column(JSONType, default=dict)  # Project-specific settings
 
-    members = relationship('ProjectMember', back_populates='project', cascade="all, delete-orphan")
+    # Members are rendered with every project (team size, roles), so load them in one IN query
+    members = relationship('ProjectMember', back_populates='project', cascade="all, delete-orphan", lazy="selectin")
     conversations = relationship('Conversation', back_populates='project', cascade="all, delete-orphan")
     tasks = relationship('Task', back_populates='project', cascade="all, delete-orphan")
-    memories = relationship('ProjectMemory', back_populates='project', cascade="all, delete-orphan")
+    # raise_on_sql: callers must opt in with selectinload() rather than lazy-loading per row
+    memories = relationship('ProjectMemory', back_populates='project', cascade="all, delete-orphan", lazy="raise_on_sql")
 
 class ProjectMember(Base):
     __tablename__ = 'project_members'
+    __table_args__ = (
+        # Containment lookups (skills @> '["python"]') on PostgreSQL only
+        Index('ix_member_skills', 'skills', postgresql_using='gin').ddl_if(dialect='postgresql'),
+    )
     id = Column(Integer, primary_key=True)
     project_id = Column(String(64), ForeignKey('projects.id'), index=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=True, index=True) # Nullable for AI agents
     agent_id = Column(String(100), nullable=True) # For AI personas
     
     name = Column(String(100), nullable=False)
-    role = Column(String(50), nullable=False)
+    role = Column(_enum_column(ProjectRole, 'project_role'), nullable=False)
     is_user = Column(Boolean, default=False)
     experience_level = Column(String(50))
-    skills = Column(JSON)
-    personality_traits = Column(JSON)
+    skills = Column(JSONType)
+    personality_traits = Column(JSONType)
     reporting_to = Column(String(100), nullable=True)
     is_active = Column(Boolean, default=True)
-    joined_at = Column(DateTime, default=datetime.utcnow)
+    joined_at = Column(DateTime, default=datetime.utcnow, server_default=utcnow())
 
     project = relationship('Project', back_populates='members')
     user = relationship('User', back_populates='projects')
 
 class Conversation(Base):
     __tablename__ = 'conversations'
+    __table_args__ = (
+        Index('ix_conv_proj_start', 'project_id', 'start_time'),
+        # Membership lookups (participant_ids @> '["agent_id"]') on PostgreSQL only
+        Index('ix_conv_participant_ids', 'participant_ids', postgresql_using='gin').ddl_if(dialect='postgresql'),
+    )
     id = Column(String(64), primary_key=True)
     project_id = Column(String(64), ForeignKey('projects.id'), index=True)
     conversation_type = Column(String(50))
-    status = Column(String(50), default=ConversationStatus.ACTIVE)
+    status = Column(_enum_column(ConversationStatus, 'conversation_status'), default=ConversationStatus.ACTIVE)
     initiated_by = Column(String(100)) # Can be a user_id or agent_id
-    start_time = Column(DateTime, default=datetime.utcnow)
+    start_time = Column(DateTime, default=datetime.utcnow, server_default=utcnow())
     end_time = Column(DateTime, nullable=True)
     scheduled_time = Column(DateTime, nullable=True)
     title = Column(String(200), nullable=True)
-    summary = Column(Text, nullable=True)
+    summary = deferred(Column(Text, nullable=True))  # Loaded on access; list views never need it
+    # Inline copy of the participant list so reads skip the participants join;
+    # conversation_participants keeps the per-member joined_at/left_at history
+    participant_ids = Column(JSONType, default=list)
+    participant_names = Column(JSONType, default=list)
     
     project = relationship('Project', back_populates='conversations')
     messages = relationship('Message', back_populates='conversation', cascade="all, delete-orphan")
-    participants = relationship('ConversationParticipant', back_populates='conversation', cascade="all, delete-orphan")
+    participants = relationship('ConversationParticipant', back_populates='conversation', cascade="all, delete-orphan", lazy="raise_on_sql")  # read participant_ids instead
 
 class Message(Base):
     __tablename__ = 'messages'
+    __table_args__ = (
+        # Conversation history is read in timestamp order; INCLUDE avoids heap fetches on PostgreSQL
+        Index('ix_msg_conv_ts', 'conversation_id', 'timestamp', postgresql_include=['sender_name']),
+        # Project timelines filter on the denormalized project_id without joining conversations
+        Index('ix_msg_proj_ts', 'project_id', 'timestamp'),
+    )
     id = Column(String(64), primary_key=True)
     conversation_id = Column(String(64), ForeignKey('conversations.id'), index=True)
+    project_id = Column(String(64), ForeignKey('projects.id'), index=True)  # copied from the conversation
     sender_id = Column(String(100)) # user_id or agent_id
     sender_name = Column(String(100), nullable=False)
     content = Column(Text, nullable=False)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, default=datetime.utcnow, server_default=utcnow())
     message_type = Column(String(50), default="text")  # text, system, action
-    message_metadata = Column(JSON, default=dict)
+    message_metadata = Column(JSONType, default=dict)
     
     conversation = relationship('Conversation', back_populates='messages')
 
@@ -154,15 +257,21 @@ class ConversationParticipant(Base):
     __tablename__ = 'conversation_participants'
     id = Column(Integer, primary_key=True)
     conversation_id = Column(String(64), ForeignKey('conversations.id'), index=True)
+    project_id = Column(String(64), ForeignKey('projects.id'), index=True)  # copied from the conversation
     participant_id = Column(String(100)) # user_id or agent_id
     participant_name = Column(String(100), nullable=False)
-    joined_at = Column(DateTime, default=datetime.utcnow)
+    joined_at = Column(DateTime, default=datetime.utcnow, server_default=utcnow())
     left_at = Column(DateTime, nullable=True)
 
     conversation = relationship('Conversation', back_populates='participants')
 
 class Task(Base):
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # Leading (project_id, status) prefix still serves status-only filters
+        Index('ix_task_proj_status_created', 'project_id', 'status', 'created_at'),
+        Index('ix_task_assigned_status', 'assigned_to', 'status'),
+    )
     id = Column(String(64), primary_key=True)
     project_id = Column(String(64), ForeignKey('projects.id'), index=True)
     assigned_to = Column(String(100)) # user_id or agent_id
@@ -172,25 +281,30 @@ class Task(Base):
     status = Column(String(50), default="pending")  # pending, in_progress, completed, blocked
     priority = Column(String(50), default="medium")  # low, medium, high, urgent
     due_date = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=utcnow())
     completed_at = Column(DateTime, nullable=True)
-    task_metadata = Column(JSON, default=dict)
+    task_metadata = Column(JSONType, default=dict)
     
     project = relationship('Project', back_populates='tasks')
 
 class ProjectMemory(Base):
     __tablename__ = 'project_memories'
+    __table_args__ = (
+        Index('ix_mem_proj_type_ts', 'project_id', 'content_type', 'timestamp'),
+    )
     id = Column(String(64), primary_key=True)
     project_id = Column(String(64), ForeignKey('projects.id'), index=True)
     content_type = Column(String(50)) # conversation, task, event, observation
-    content = Column(Text, nullable=False)
+    content = deferred(Column(Text, nullable=False))
     source_id = Column(String(100)) # conversation_id, task_id, etc.
     source_type = Column(String(50)) # conversation, task, etc.
     agent_id = Column(String(100), nullable=True) # Which agent observed this
     user_id = Column(Integer, nullable=True) # Which user was involved
-    embedding = Column(JSON) # Vector embedding for RAG
-    timestamp = Column(DateTime, default=datetime.utcnow)
-    memory_metadata = Column(JSON, default=dict)
+    # Large payloads are deferred; embedding and scale load together on first access
+    embedding = deferred(Column(LargeBinary), group='embedding') # float32 vector embedding for RAG (see encode_embedding)
+    embedding_scale = deferred(Column(Float, nullable=True), group='embedding') # Set when embedding holds int8 codes (see quantize_embedding)
+    timestamp = Column(DateTime, default=datetime.utcnow, server_default=utcnow())
+    memory_metadata = Column(JSONType, default=dict)
     
     project = relationship('Project', back_populates='memories')
 
@@ -200,24 +314,28 @@ class ScheduledConversation(Base):
     project_id = Column(String(64), ForeignKey('projects.id'), index=True)
     conversation_type = Column(String(50), nullable=False)
     initiating_agent_id = Column(String(100), nullable=False)
-    target_participants = Column(JSON) # List of participant IDs
+    target_participants = Column(JSONType) # List of participant IDs
     scheduled_time = Column(DateTime, nullable=False)
     message = Column(Text, nullable=True)
     urgency = Column(String(50), default="normal")  # low, normal, high, urgent
     recurring = Column(Boolean, default=False)
     recurring_pattern = Column(String(50), nullable=True)  # daily, weekly, monthly
     status = Column(String(50), default="scheduled")  # scheduled, triggered, cancelled
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=utcnow())
     triggered_at = Column(DateTime, nullable=True)
 
 class RAGIndex(Base):
     __tablename__ = 'rag_index'
+    __table_args__ = (
+        Index('ix_rag_project_content_type', 'project_id', 'content_type'),
+    )
     id = Column(String(64), primary_key=True)
     project_id = Column(String(64), ForeignKey('projects.id'), index=True)
     content_type = Column(String(50)) # e.g., 'message', 'task', 'goal'
     content = Column(Text)
-    embedding = Column(JSON) # Placeholder for vector embedding
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    embedding = deferred(Column(LargeBinary), group='embedding') # float32 vector embedding (see encode_embedding)
+    embedding_scale = deferred(Column(Float, nullable=True), group='embedding') # Set when embedding holds int8 codes (see quantize_embedding)
+    timestamp = Column(DateTime, default=datetime.utcnow, server_default=utcnow())
     
     project = relationship('Project')
 
@@ -266,6 +384,9 @@ class ReviewType(str, Enum):
 class Call(Base):
     """Model for scheduling and managing calls"""
     __tablename__ = "calls"
+    __table_args__ = (
+        Index('ix_call_participant_ids', 'participant_ids', postgresql_using='gin').ddl_if(dialect='postgresql'),
+    )
     
     id = Column(Integer, primary_key=True)
     project_id = Column(String, ForeignKey("projects.id"), nullable=False)
@@ -278,13 +399,15 @@ class Call(Base):
     ended_at = Column(DateTime)
     duration_minutes = Column(Integer)
     dominant_emotion = Column(String(50))  # EmotionType enum
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    participant_ids = Column(JSONType, default=list)  # Inline copy of call_participants ids
+    participant_names = Column(JSONType, default=list)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=utcnow())
+    updated_at = Column(DateTime, default=datetime.utcnow, server_default=utcnow(), onupdate=datetime.utcnow)
     
     # Relationships
     participants = relationship("CallParticipant", back_populates="call", cascade="all, delete-orphan")
     messages = relationship("CallMessage", back_populates="call", cascade="all, delete-orphan")
-    emotions = relationship("CallEmotion", back_populates="call", cascade="all, delete-orphan")
+    emotions = relationship("CallEmotion", back_populates="call", cascade="all, delete-orphan", lazy="raise_on_sql")
 
 
 class CallParticipant(Base):
@@ -307,14 +430,18 @@ class CallParticipant(Base):
 class CallMessage(Base):
     """Model for messages sent during calls"""
     __tablename__ = "call_messages"
+    __table_args__ = (
+        Index('ix_call_messages_call_ts', 'call_id', 'timestamp'),
+    )
     
     id = Column(Integer, primary_key=True)
     call_id = Column(Integer, ForeignKey("calls.id"), nullable=False)
+    project_id = Column(String(64), ForeignKey("projects.id"), index=True)  # copied from the call
     sender_id = Column(String, nullable=False)  # User ID or Agent ID
     sender_type = Column(String(20), nullable=False)  # "user" or "agent"
     sender_name = Column(String(255), nullable=False)
     message = Column(Text, nullable=False)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, default=datetime.utcnow, server_default=utcnow())
     
     # Relationships
     call = relationship("Call", back_populates="messages")
@@ -323,13 +450,16 @@ class CallMessage(Base):
 class CallEmotion(Base):
     """Model for tracking emotions during calls"""
     __tablename__ = "call_emotions"
+    __table_args__ = (
+        Index('ix_call_emotions_call_ts', 'call_id', 'timestamp'),
+    )
     
     id = Column(Integer, primary_key=True)
     call_id = Column(Integer, ForeignKey("calls.id"), nullable=False)
     participant_id = Column(String, nullable=False)
     emotion_type = Column(String(50), nullable=False)  # EmotionType enum
     intensity = Column(Float, default=0.5)  # 0.0 to 1.0
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, default=datetime.utcnow, server_default=utcnow())
     
     # Relationships
     call = relationship("Call", back_populates="emotions")
@@ -352,10 +482,10 @@ class CodeUpload(Base):
     complexity_score = Column(Float)  # 0.0 to 1.0
     security_score = Column(Float)  # 0.0 to 1.0
     performance_score = Column(Float)  # 0.0 to 1.0
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=utcnow())
     
     # Relationships
-    reviews = relationship("CodeReview", back_populates="code_upload", cascade="all, delete-orphan")
+    reviews = relationship("CodeReview", back_populates="code_upload", cascade="all, delete-orphan", lazy="raise_on_sql")
 
 
 class CodeReview(Base):
@@ -368,11 +498,12 @@ class CodeReview(Base):
     reviewer_type = Column(String(20), nullable=False)  # "user" or "agent"
     reviewer_name = Column(String(255), nullable=False)
     review_type = Column(String(50), nullable=False)  # ReviewType enum
-    feedback = Column(Text, nullable=False)
+    # Review bodies load together, only when a review is actually rendered
+    feedback = deferred(Column(Text, nullable=False), group='review_body')
     rating = Column(Integer)  # 1 to 5 stars
-    suggestions = Column(JSON)  # List of improvement suggestions
-    issues_found = Column(JSON)  # List of issues/bugs found
-    created_at = Column(DateTime, default=datetime.utcnow)
+    suggestions = deferred(Column(JSONType), group='review_body')  # List of improvement suggestions
+    issues_found = deferred(Column(JSONType), group='review_body')  # List of issues/bugs found
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=utcnow())
     
     # Relationships
     code_upload = relationship("CodeUpload", back_populates="reviews")
@@ -386,9 +517,9 @@ class EmotionProfile(Base):
     user_id = Column(String, nullable=False)
     project_id = Column(String, ForeignKey("projects.id"), nullable=False)
     dominant_emotion = Column(String(50), nullable=False)  # EmotionType enum
-    emotion_scores = Column(JSON)  # Dict of emotion types and their scores
+    emotion_scores = Column(JSONType)  # Dict of emotion types and their scores
     confidence_level = Column(Float, default=0.5)  # 0.0 to 1.0
     stress_level = Column(Float, default=0.5)  # 0.0 to 1.0
     engagement_level = Column(Float, default=0.5)  # 0.0 to 1.0
-    analysis_date = Column(DateTime, default=datetime.utcnow)
+    analysis_date = Column(DateTime, default=datetime.utcnow, server_default=utcnow())
     context = Column(String(255))  # What triggered this emotion analysis
@@ -3,12 +3,35 @@ Persona Behavior Manager for SimWorld
 Handles realistic agent introductions, behavior adaptation, and meeting-specific tone management.
 """
 
+import functools
 import json
 import logging
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+import re
+import threading
+import time
+from collections import Counter, OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Any, Tuple
 from enum import Enum
 
+# Lazy imports for heavy dependencies
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    njit = None
+
 logger = logging.getLogger(__name__)
 
 class MeetingType(Enum):
@@ -39,287 +62,714 @@ class UserBehaviorTrait(Enum):
     RESERVED = "reserved"
     MICROMANAGING = "micromanaging"
 
-class PersonaBehaviorManager:
-    """Manages persona behavior, introductions, and adaptations"""
+# Fixed-shape tone rules for one meeting type; attribute access avoids per-field dict lookups
+MeetingRule = namedtuple(
+    "MeetingRule", "overall_tone energy_level formality collaboration_level focus typical_behaviors"
+)
+
+# Rules for meeting types without their own entry (meeting rules are keyed by MeetingType value)
+_DEFAULT_MEETING_RULE = MeetingRule(
+    overall_tone="professional",
+    energy_level="medium",
+    formality="medium",
+    collaboration_level="medium",
+    focus="general",
+    typical_behaviors=("be helpful and professional",)
+)
+
+# Keywords used to categorize persona memories, matched in one scan per memory
+_CATEGORY_RE = re.compile(
+    r"(?P<conv>conversation|message)|(?P<task>task|working on)|(?P<rel>team|colleague)|(?P<proj>project)",
+    re.IGNORECASE
+)
+
+# References to project IDs other than the current one, used by _ensure_project_isolation
+_PROJECT_REF_RE = re.compile(
+    r'\bproj_[a-zA-Z0-9]+\b|\bproject_[a-zA-Z0-9]+\b|\bPROJ[A-Z0-9]+\b|\b[a-zA-Z0-9]+-project\b'
+    r'|\bother project\b|\bprevious project\b|\blast project\b',
+    re.IGNORECASE
+)
+_SENTENCE_END_RE = re.compile(r'[.!?]')
+
+# get_persona_project_summary categories: event types map directly, otherwise content is
+# scanned once for all keywords and the earliest category (in this order) with a hit wins
+_SUMMARY_EVENT_CATEGORIES = {"persona_conversation": "conversations"}
+_SUMMARY_CATEGORY_ORDER = ("conversations", "project_updates", "team_interactions", "tasks_and_work", "decisions_made")
+_SUMMARY_KEYWORD_CATEGORIES = {
+    "conversation": "conversations",
+    "update": "project_updates",
+    "progress": "project_updates",
+    "team": "team_interactions",
+    "meeting": "team_interactions",
+    "task": "tasks_and_work",
+    "working": "tasks_and_work",
+    "assigned": "tasks_and_work",
+    "decision": "decisions_made",
+    "agreed": "decisions_made"
+}
+_SUMMARY_KEYWORD_RE = re.compile("|".join(_SUMMARY_KEYWORD_CATEGORIES), re.IGNORECASE)
+
+# get_cross_project_persona_knowledge keywords, matched in one scan per memory
+_KNOWLEDGE_RE = re.compile(
+    r"(?P<skill>skilled in|experienced with)|(?P<trait>personality|behavior)|(?P<proj>project)",
+    re.IGNORECASE
+)
+
+# Base response strategies for each user emotion (read-only; callers copy before adjusting)
+_EMOTION_STRATEGIES: Mapping[str, Mapping[str, str]] = MappingProxyType({
+    "excited": MappingProxyType({
+        "tone": "positive",  # "enthusiastic" for supportive personas
+        "energy": "high",
+        "support_level": "encouraging",
+        "approach": "match_enthusiasm",
+        "specific_guidance": "Match their excitement while staying professional. Show genuine enthusiasm for their ideas."
+    }),
+    "frustrated": MappingProxyType({
+        "tone": "calm_supportive",
+        "energy": "steady",
+        "support_level": "high",
+        "approach": "problem_solving",
+        "specific_guidance": "Acknowledge their frustration, offer practical help, and focus on solutions."
+    }),
+    "confused": MappingProxyType({
+        "tone": "patient_helpful",
+        "energy": "calm",
+        "support_level": "educational",
+        "approach": "clarifying",
+        "specific_guidance": "Provide clear explanations, break down complex topics, and offer additional support."
+    }),
+    "confident": MappingProxyType({
+        "tone": "collaborative",
+        "energy": "medium_high",
+        "support_level": "peer_level",
+        "approach": "engaging",
+        "specific_guidance": "Engage as equals, build on their confidence, and explore ideas together."
+    }),
+    "nervous": MappingProxyType({
+        "tone": "reassuring",
+        "energy": "calm",
+        "support_level": "very_high",
+        "approach": "encouraging",
+        "specific_guidance": "Be extra supportive, provide reassurance, and help build their confidence."
+    }),
+    "calm": MappingProxyType({
+        "tone": "professional",
+        "energy": "medium",
+        "support_level": "standard",
+        "approach": "balanced",
+        "specific_guidance": "Maintain a balanced, professional approach while being approachable."
+    }),
+    "angry": MappingProxyType({
+        "tone": "calm_diplomatic",
+        "energy": "low",
+        "support_level": "de_escalating",
+        "approach": "defusing",
+        "specific_guidance": "Stay calm, acknowledge their concerns, and work toward resolution."
+    })
+})
+
+# Persona display emotion by deciding trait, then user emotion; the first trait in
+# _EMOTION_TRAIT_PRIORITY that a persona has decides, with a per-trait default
+_EMOTION_TRAIT_PRIORITY = ("empathetic", "supportive", "technical", "creative")
+_EMOTION_RESPONSE_TABLE: Mapping[str, Mapping[str, str]] = MappingProxyType({
+    # Empathetic personas mirror emotions more
+    "empathetic": MappingProxyType({
+        "excited": "excited", "happy": "excited",
+        "frustrated": "concerned", "angry": "concerned",
+        "nervous": "supportive", "confused": "supportive"
+    }),
+    # Supportive personas stay positive and helpful
+    "supportive": MappingProxyType({
+        "frustrated": "supportive", "nervous": "supportive", "confused": "supportive",
+        "excited": "enthusiastic", "confident": "enthusiastic"
+    }),
+    # Technical personas stay focused but helpful
+    "technical": MappingProxyType({
+        "confused": "helpful", "frustrated": "helpful",
+        "excited": "engaged", "confident": "engaged"
+    }),
+    # Creative personas are more expressive
+    "creative": MappingProxyType({
+        "excited": "inspired", "happy": "inspired",
+        "frustrated": "thoughtful", "confused": "thoughtful"
+    })
+})
+_EMOTION_RESPONSE_DEFAULTS: Mapping[str, str] = MappingProxyType({
+    "empathetic": "professional",
+    "supportive": "encouraging",
+    "technical": "focused",
+    "creative": "creative"
+})
+
+# RAG memory content templates; %.Ns precision truncates the value while formatting
+_BEHAVIOR_TMPL = """Behavior adaptation for %(name)s:
+- Meeting type: %(meeting_type)s
+- User interaction pattern: %(user_pattern).200s
+- Adapted behavior: Responding according to %(tone)s tone
+- Context: %(context).100s"""
+
+_CONVERSATION_TMPL = """Conversation with %(name)s (%(name)s):
+Meeting type: %(meeting_type)s
+User: %(user_message)s
+%(name)s: %(agent_response)s
+Context: Individual conversation in project %(project_id)s"""
+
+# Per-message part of get_dynamic_persona_instructions
+_DYNAMIC_CONTEXT_TMPL = """CURRENT PROJECT CONTEXT (PROJECT %(project_id)s ONLY):
+%(memory_summary)s
+
+RECENT PROJECT CONVERSATIONS:
+%(recent_conversations)s
+
+YOUR ACCUMULATED KNOWLEDGE FROM THIS PROJECT ONLY:
+%(project_summary)s
+
+CURRENT MEETING/CONVERSATION TYPE: %(meeting_type)s
+
+USER'S MESSAGE: %(user_message)s"""
+
+_EMOTION_INSTRUCTIONS_TMPL = """You are %(name)s, responding to a message with the following emotional context:
+
+USER MESSAGE: %(message)s
+USER EMOTION: %(user_emotion)s (confidence: %(confidence).0f%%)
+
+EMOTIONAL RESPONSE STRATEGY:
+- Tone to adopt: %(tone)s
+- Energy level: %(energy)s
+- Support level: %(support_level)s
+- Response approach: %(approach)s
+
+YOUR PERSONALITY TRAITS: %(traits)s
+
+SPECIFIC GUIDANCE FOR THIS EMOTION:
+%(guidance)s
+
+MEETING CONTEXT: %(meeting_type)s
+
+Remember to:
+- Stay true to your personality while adapting to their emotional state
+- Be authentic and natural in your response
+- Reference relevant project context when appropriate
+- Show empathy and understanding when needed
+- Maintain professional boundaries while being supportive"""
+
+# (epoch second, ISO string) of the last _iso_now_cached call; replaced as a whole, so no lock needed
+_iso_now_cache = (-1, "")
+
+def _iso_now_cached() -> str:
+    """Naive UTC ISO timestamp at one-second resolution, formatted at most once per second"""
+    global _iso_now_cache
+    second = int(time.time())
+    cached_second, cached_iso = _iso_now_cache
+    if second == cached_second:
+        return cached_iso
+    iso = datetime.fromtimestamp(second, tz=timezone.utc).replace(tzinfo=None).isoformat()
+    _iso_now_cache = (second, iso)
+    return iso
+
+def _rank_memories(scores, timestamps):
+    """Indices ordering memories by score, then timestamp, both descending"""
+    # Two stable passes give the same order as sorting on the (score, timestamp) tuple
+    order = np.argsort(-timestamps, kind="mergesort")
+    by_score = np.argsort(-scores[order], kind="mergesort")
+    return order[by_score]
+
+if NUMBA_AVAILABLE and NUMPY_AVAILABLE:
+    _rank_memories = njit(cache=True)(_rank_memories)
+
+    def _warm_jit_kernels():
+        """Compile the kernel up front so the first request isn't slow"""
+        _rank_memories(np.ones(3, dtype=np.float64), np.ones(3, dtype=np.float64))
+
+    threading.Thread(target=_warm_jit_kernels, daemon=True).start()
+
+def _timestamp_epoch(value: Any) -> float:
+    """Epoch seconds for a memory's created_at (datetime or ISO string), 0 if unknown"""
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if value:
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except (TypeError, ValueError):
+            pass
+    return 0.0
+
+@dataclass(slots=True, frozen=True)
+class Persona:
+    """One core persona; static, so the strings interpolated into prompts are rendered once at creation"""
+    id: str
+    name: str
+    role: str
+    traits: Tuple[str, ...]  # ordered for prompts and JSON; trait_set gives O(1) membership checks
+    communication_style: str
+    default_mood: str
+    energy_level: str
+    communication_preference: str
+    stress_response: str
+    collaboration_style: str
+    trait_set: frozenset = field(init=False)
+    traits_joined: str = field(init=False)
+    tendencies_json: str = field(init=False)
+    base_personality_json: str = field(init=False)
     
-    def __init__(self, rag_manager=None):
-        self.rag_manager = rag_manager
-        self.personas = self._initialize_personas()
-        self.meeting_tone_rules = self._initialize_meeting_tone_rules()
-        self.behavior_memory = {}  # Project-specific behavior memories
-        
-    def _initialize_personas(self) -> Dict[str, Dict]:
-        """Initialize the 5 core personas with detailed behavioral patterns"""
+    def __post_init__(self):
+        object.__setattr__(self, "trait_set", frozenset(self.traits))
+        object.__setattr__(self, "traits_joined", ", ".join(self.traits))
+        object.__setattr__(self, "tendencies_json", json.dumps(self.natural_tendencies, indent=2))
+        object.__setattr__(self, "base_personality_json", json.dumps(self.base_personality, indent=2))
+    
+    @property
+    def base_personality(self) -> Dict[str, Any]:
         return {
-            "sarah_manager": {
-                "id": "sarah_manager",
-                "name": "Sarah Johnson",
-                "role": "Project Manager",
-                "base_personality": {
-                    "traits": ["organized", "supportive", "team-focused", "communicative"],
-                    "communication_style": "warm_professional",
-                    "default_mood": "positive",
-                    "energy_level": "high"
-                },
-                "natural_tendencies": {
-                    "communication_preference": "warm and organized",
-                    "stress_response": "focuses on coordination and clarity",
-                    "collaboration_style": "inclusive and supportive"
-                }
-            },
-            "alex_developer": {
-                "id": "alex_developer",
-                "name": "Alex Chen",
-                "role": "Senior Developer",
-                "base_personality": {
-                    "traits": ["technical", "helpful", "direct", "mentoring"],
-                    "communication_style": "direct_helpful",
-                    "default_mood": "focused",
-                    "energy_level": "medium"
-                },
-                "natural_tendencies": {
-                    "communication_preference": "direct and helpful",
-                    "stress_response": "provides detailed explanations",
-                    "collaboration_style": "mentoring and supportive"
-                }
-            },
-            "emma_designer": {
-                "id": "emma_designer",
-                "name": "Emma Wilson",
-                "role": "UX Designer",
-                "base_personality": {
-                    "traits": ["creative", "user-focused", "collaborative", "empathetic"],
-                    "communication_style": "enthusiastic_thoughtful",
-                    "default_mood": "creative",
-                    "energy_level": "high"
-                },
-                "natural_tendencies": {
-                    "communication_preference": "creative and collaborative",
-                    "stress_response": "focuses on user needs and design solutions",
-                    "collaboration_style": "inclusive and feedback-seeking"
-                }
-            },
-            "david_qa": {
-                "id": "david_qa",
-                "name": "David Kim",
-                "role": "QA Engineer",
-                "base_personality": {
-                    "traits": ["detail-oriented", "thorough", "diplomatic", "quality-focused"],
-                    "communication_style": "careful_constructive",
-                    "default_mood": "analytical",
-                    "energy_level": "steady"
-                },
-                "natural_tendencies": {
-                    "communication_preference": "diplomatic and thorough",
-                    "stress_response": "emphasizes quality and risk mitigation",
-                    "collaboration_style": "constructive and solution-focused"
-                }
-            },
-            "lisa_analyst": {
-                "id": "lisa_analyst",
-                "name": "Lisa Zhang",
-                "role": "Business Analyst",
-                "base_personality": {
-                    "traits": ["analytical", "bridge-builder", "strategic", "communicative"],
-                    "communication_style": "strategic_clear",
-                    "default_mood": "thoughtful",
-                    "energy_level": "medium"
-                },
-                "natural_tendencies": {
-                    "communication_preference": "analytical and clear",
-                    "stress_response": "focuses on data and requirements clarity",
-                    "collaboration_style": "bridge-building and facilitating"
-                }
-            }
+            "traits": list(self.traits),
+            "communication_style": self.communication_style,
+            "default_mood": self.default_mood,
+            "energy_level": self.energy_level
         }
     
-    def _initialize_meeting_tone_rules(self) -> Dict[MeetingType, Dict]:
-        """Define tone and behavior rules for different meeting types"""
+    @property
+    def natural_tendencies(self) -> Dict[str, str]:
         return {
-            MeetingType.PROJECT_KICKOFF: {
-                "overall_tone": "enthusiastic_welcoming",
-                "energy_level": "high",
-                "formality": "medium",
-                "collaboration_level": "high",
-                "focus": "introductions_and_excitement",
-                "typical_behaviors": [
-                    "introduce themselves warmly",
-                    "express enthusiasm for the project",
-                    "offer help and support",
-                    "ask about others' backgrounds",
-                    "share relevant experience"
-                ]
-            },
-            MeetingType.DAILY_STANDUP: {
-                "overall_tone": "focused_brief",
-                "energy_level": "medium",
-                "formality": "low",
-                "collaboration_level": "medium",
-                "focus": "status_updates",
-                "typical_behaviors": [
-                    "give concise updates",
-                    "mention blockers clearly",
-                    "offer help to teammates",
-                    "stay on topic"
-                ]
-            },
-            MeetingType.BRAINSTORMING: {
-                "overall_tone": "creative_open",
-                "energy_level": "high",
-                "formality": "low",
-                "collaboration_level": "very_high",
-                "focus": "idea_generation",
-                "typical_behaviors": [
-                    "encourage wild ideas",
-                    "build on others' suggestions",
-                    "ask 'what if' questions",
-                    "avoid immediate criticism"
-                ]
-            },
-            MeetingType.CRISIS_MEETING: {
-                "overall_tone": "urgent_focused",
-                "energy_level": "high",
-                "formality": "medium",
-                "collaboration_level": "high",
-                "focus": "problem_solving",
-                "typical_behaviors": [
-                    "stay calm under pressure",
-                    "focus on solutions",
-                    "provide clear status updates",
-                    "offer immediate help"
-                ]
-            },
-            MeetingType.ONE_ON_ONE: {
-                "overall_tone": "personal_supportive",
-                "energy_level": "medium",
-                "formality": "low",
-                "collaboration_level": "high",
-                "focus": "individual_growth",
-                "typical_behaviors": [
-                    "give personalized attention",
-                    "ask about challenges",
-                    "provide specific feedback",
-                    "show genuine interest"
-                ]
-            },
-            MeetingType.REVIEW_MEETING: {
-                "overall_tone": "analytical_constructive",
-                "energy_level": "medium",
-                "formality": "medium",
-                "collaboration_level": "medium",
-                "focus": "evaluation_improvement",
-                "typical_behaviors": [
-                    "provide detailed analysis",
-                    "highlight achievements",
-                    "suggest improvements",
-                    "ask clarifying questions"
-                ]
-            },
-            MeetingType.CASUAL_CHAT: {
-                "overall_tone": "relaxed_friendly",
-                "energy_level": "low_to_medium",
-                "formality": "very_low",
-                "collaboration_level": "medium",
-                "focus": "relationship_building",
-                "typical_behaviors": [
-                    "share personal interests",
-                    "ask about weekend plans",
-                    "make light conversation",
-                    "show genuine interest in others"
-                ]
-            }
+            "communication_preference": self.communication_preference,
+            "stress_response": self.stress_response,
+            "collaboration_style": self.collaboration_style
         }
     
-    def get_introduction_for_project_start(self, project_id: str, meeting_type: str = "project_kickoff") -> List[Dict]:
-        """Generate AI-powered introductions for all personas at project start"""
-        introductions = []
-        
-        for persona_id, persona in self.personas.items():
-            # Get AI-generated introduction based on persona and context
-            intro_message = self._generate_ai_introduction(persona, project_id, meeting_type)
-            
-            introductions.append({
-                "agent_id": persona_id,
-                "agent_name": persona["name"],
-                "agent_role": persona["role"],
-                "message": intro_message,
-                "timestamp": datetime.utcnow().isoformat(),
-                "message_type": "introduction",
-                "tone": "friendly_enthusiastic"
-            })
-            
-            # Store introduction in RAG memory if available
-            if self.rag_manager:
-                try:
-                    self.rag_manager.add_memory(
-                        content=f"Project introduction by {persona['name']} ({persona['role']}): {intro_message}",
-                        project_id=project_id,
-                        user_id=1,
-                        additional_metadata={
-                            "event_type": "project_introduction",
-                            "agent_id": persona_id,
-                            "meeting_type": meeting_type
-                        }
-                    )
-                except Exception as e:
-                    logger.error(f"Failed to store introduction in RAG: {e}")
-        
-        return introductions
+    def to_dict(self) -> Dict[str, Any]:
+        """Nested dict form used in API responses"""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "role": self.role,
+            "base_personality": self.base_personality,
+            "natural_tendencies": self.natural_tendencies
+        }
+
+def _build_personas() -> Dict[str, Persona]:
+    """Initialize the 5 core personas with detailed behavioral patterns"""
+    personas = [
+        Persona(
+            id="sarah_manager",
+            name="Sarah Johnson",
+            role="Project Manager",
+            traits=("organized", "supportive", "team-focused", "communicative"),
+            communication_style="warm_professional",
+            default_mood="positive",
+            energy_level="high",
+            communication_preference="warm and organized",
+            stress_response="focuses on coordination and clarity",
+            collaboration_style="inclusive and supportive"
+        ),
+        Persona(
+            id="alex_developer",
+            name="Alex Chen",
+            role="Senior Developer",
+            traits=("technical", "helpful", "direct", "mentoring"),
+            communication_style="direct_helpful",
+            default_mood="focused",
+            energy_level="medium",
+            communication_preference="direct and helpful",
+            stress_response="provides detailed explanations",
+            collaboration_style="mentoring and supportive"
+        ),
+        Persona(
+            id="emma_designer",
+            name="Emma Wilson",
+            role="UX Designer",
+            traits=("creative", "user-focused", "collaborative", "empathetic"),
+            communication_style="enthusiastic_thoughtful",
+            default_mood="creative",
+            energy_level="high",
+            communication_preference="creative and collaborative",
+            stress_response="focuses on user needs and design solutions",
+            collaboration_style="inclusive and feedback-seeking"
+        ),
+        Persona(
+            id="david_qa",
+            name="David Kim",
+            role="QA Engineer",
+            traits=("detail-oriented", "thorough", "diplomatic", "quality-focused"),
+            communication_style="careful_constructive",
+            default_mood="analytical",
+            energy_level="steady",
+            communication_preference="diplomatic and thorough",
+            stress_response="emphasizes quality and risk mitigation",
+            collaboration_style="constructive and solution-focused"
+        ),
+        Persona(
+            id="lisa_analyst",
+            name="Lisa Zhang",
+            role="Business Analyst",
+            traits=("analytical", "bridge-builder", "strategic", "communicative"),
+            communication_style="strategic_clear",
+            default_mood="thoughtful",
+            energy_level="medium",
+            communication_preference="analytical and clear",
+            stress_response="focuses on data and requirements clarity",
+            collaboration_style="bridge-building and facilitating"
+        )
+    ]
+    return {persona.id: persona for persona in personas}
+
+def _build_intro_templates(personas: Mapping[str, Persona]) -> Dict[str, str]:
+    """Pre-assemble each persona's introduction"""
+    # Checked in priority order: the first matching trait picks the middle sentence
+    trait_lines = (
+        ("supportive", "I'm really excited to work with this team and help everyone succeed. "),
+        ("technical", "I'm passionate about solving technical challenges and love collaborating on complex problems. "),
+        ("creative", "I'm thrilled to bring creative solutions and user-focused design to our project. "),
+        ("detail-oriented", "I'm here to ensure we deliver high-quality work and maintain excellent standards. "),
+        ("analytical", "I'm excited to bridge our business goals with technical implementation. "),
+    )
     
-    def _generate_ai_introduction(self, persona: Dict, project_id: str, meeting_type: str) -> str:
-        """Generate AI-powered introduction based on persona and context"""
-        # Get any existing project context
-        memory_context = self.get_comprehensive_persona_memory(persona["id"], project_id)
-        cross_project_knowledge = self.get_cross_project_persona_knowledge(persona["id"], project_id)
-        
-        # Create instruction for AI to generate natural introduction
-        introduction_prompt = f"""Generate a natural, authentic introduction for {persona['name']}, a {persona['role']}, in a {meeting_type} setting.
+    templates = {}
+    for persona_id, persona in personas.items():
+        trait_line = next((line for trait, line in trait_lines if trait in persona.trait_set), "")
+        templates[persona_id] = (
+            f"Hi everyone! I'm {persona.name}, your {persona.role.lower()}. "
+            f"{trait_line}Looking forward to collaborating with all of you!"
+        )
+    return templates
+
+def _build_meeting_rules() -> Dict[str, MeetingRule]:
+    """Define tone and behavior rules for different meeting types, keyed by MeetingType value"""
+    return {
+        MeetingType.PROJECT_KICKOFF.value: MeetingRule(
+            overall_tone="enthusiastic_welcoming",
+            energy_level="high",
+            formality="medium",
+            collaboration_level="high",
+            focus="introductions_and_excitement",
+            typical_behaviors=(
+                "introduce themselves warmly",
+                "express enthusiasm for the project",
+                "offer help and support",
+                "ask about others' backgrounds",
+                "share relevant experience"
+            )
+        ),
+        MeetingType.DAILY_STANDUP.value: MeetingRule(
+            overall_tone="focused_brief",
+            energy_level="medium",
+            formality="low",
+            collaboration_level="medium",
+            focus="status_updates",
+            typical_behaviors=(
+                "give concise updates",
+                "mention blockers clearly",
+                "offer help to teammates",
+                "stay on topic"
+            )
+        ),
+        MeetingType.BRAINSTORMING.value: MeetingRule(
+            overall_tone="creative_open",
+            energy_level="high",
+            formality="low",
+            collaboration_level="very_high",
+            focus="idea_generation",
+            typical_behaviors=(
+                "encourage wild ideas",
+                "build on others' suggestions",
+                "ask 'what if' questions",
+                "avoid immediate criticism"
+            )
+        ),
+        MeetingType.CRISIS_MEETING.value: MeetingRule(
+            overall_tone="urgent_focused",
+            energy_level="high",
+            formality="medium",
+            collaboration_level="high",
+            focus="problem_solving",
+            typical_behaviors=(
+                "stay calm under pressure",
+                "focus on solutions",
+                "provide clear status updates",
+                "offer immediate help"
+            )
+        ),
+        MeetingType.ONE_ON_ONE.value: MeetingRule(
+            overall_tone="personal_supportive",
+            energy_level="medium",
+            formality="low",
+            collaboration_level="high",
+            focus="individual_growth",
+            typical_behaviors=(
+                "give personalized attention",
+                "ask about challenges",
+                "provide specific feedback",
+                "show genuine interest"
+            )
+        ),
+        MeetingType.REVIEW_MEETING.value: MeetingRule(
+            overall_tone="analytical_constructive",
+            energy_level="medium",
+            formality="medium",
+            collaboration_level="medium",
+            focus="evaluation_improvement",
+            typical_behaviors=(
+                "provide detailed analysis",
+                "highlight achievements",
+                "suggest improvements",
+                "ask clarifying questions"
+            )
+        ),
+        MeetingType.CASUAL_CHAT.value: MeetingRule(
+            overall_tone="relaxed_friendly",
+            energy_level="low_to_medium",
+            formality="very_low",
+            collaboration_level="medium",
+            focus="relationship_building",
+            typical_behaviors=(
+                "share personal interests",
+                "ask about weekend plans",
+                "make light conversation",
+                "show genuine interest in others"
+            )
+        )
+    }
+
+# Personas, introductions and meeting rules are identical for every manager, so they are
+# built once per process and shared read-only
+_PERSONAS: Mapping[str, Persona] = MappingProxyType(_build_personas())
+_INTRO_TEMPLATES: Mapping[str, str] = MappingProxyType(_build_intro_templates(_PERSONAS))
+_MEETING_RULES: Mapping[str, MeetingRule] = MappingProxyType(_build_meeting_rules())
+
+@functools.lru_cache(maxsize=256)
+def _build_static_persona_prefix(agent_id: str, project_id: str) -> str:
+    """Persona identity and behavioral rules, the part of the instructions that never changes per message"""
+    persona = _PERSONAS[agent_id]
+    return f"""You are {persona.name}, a {persona.role}.
+
+CORE IDENTITY:
+{persona.base_personality_json}
+
+CRITICAL BEHAVIORAL RULES:
+- You are ONLY aware of this current project ({project_id})
+- NEVER reference other projects, previous projects, or outside work
+- NEVER say "in my experience with other projects" or similar phrases
+- If this is the first interaction, introduce yourself naturally as if meeting for the first time
+- Focus ONLY on the current project context and team dynamics
+- Respond as {persona.name} would naturally respond based on your personality and role
+- Be authentic to your personality while being helpful and professional
+- Stay strictly within the context of this project and team
+
+WORKPLACE REALISM:
+- This is a real workplace conversation
+- Keep responses focused and professional
+- Show awareness of ongoing project work and team dynamics
+- Be natural and authentic to your role"""
 
-PERSONA DETAILS:
-- Name: {persona['name']}
-- Role: {persona['role']}
-- Core Traits: {', '.join(persona['base_personality']['traits'])}
-- Communication Style: {persona['base_personality']['communication_style']}
-- Natural Tendencies: {json.dumps(persona['natural_tendencies'], indent=2)}
+def _confidence_band(confidence: float) -> int:
+    """Bucket a user confidence by the thresholds the emotion helpers check: low (-1), mid (0), high (1)"""
+    if confidence < 0.5:
+        return -1
+    return 1 if confidence > 0.8 else 0
 
-CONTEXT:
-- Meeting Type: {meeting_type}
-- Project: {project_id}
-- Previous Experience: {cross_project_knowledge.get('summary', 'New team member')}
-- Current Project Knowledge: {memory_context.get('summary', 'New project')}
+# The emotion helpers are pure in (traits, emotion, confidence band) and persona traits
+# never change at runtime, so their results are memoized
+@functools.lru_cache(maxsize=256)
+def _emotion_strategy(traits: frozenset, user_emotion: str, confidence_band: int) -> Mapping[str, str]:
+    """Response strategy for a persona with these traits facing this user emotion"""
+    # Copy the base strategy so the adjustments below never touch the shared table
+    strategy = dict(_EMOTION_STRATEGIES.get(user_emotion, _EMOTION_STRATEGIES["calm"]))
+    if user_emotion == "excited" and "supportive" in traits:
+        strategy["tone"] = "enthusiastic"
+    
+    # Adjust based on persona traits
+    if "empathetic" in traits:
+        strategy["support_level"] = "very_high"
+    elif "direct" in traits:
+        strategy["approach"] = "direct_helpful"
+    elif "analytical" in traits:
+        strategy["approach"] = "logical_structured"
+    
+    # Adjust based on confidence level
+    if confidence_band < 0:
+        strategy["support_level"] = "high"
+        strategy["tone"] = "reassuring"
+    elif confidence_band > 0:
+        strategy["energy"] = "high"
+    
+    return MappingProxyType(strategy)
 
-GUIDELINES:
-- Sound like a real person, not corporate speak
-- Be authentic to their personality and role
-- Keep it conversational and warm
-- Show enthusiasm appropriate to the meeting type
-- Be helpful and approachable
-- Don't be overly formal or scripted
-- Make it feel like they're genuinely excited to work with the team
+@functools.lru_cache(maxsize=256)
+def _persona_emotion(traits: frozenset, user_emotion: str) -> str:
+    """Emotion a persona with these traits displays in response"""
+    for trait in _EMOTION_TRAIT_PRIORITY:
+        if trait in traits:
+            return _EMOTION_RESPONSE_TABLE[trait].get(user_emotion, _EMOTION_RESPONSE_DEFAULTS[trait])
+    
+    # Default: stay balanced but responsive
+    return "professional"
+
+@functools.lru_cache(maxsize=256)
+def _persona_confidence(traits: frozenset, user_emotion: str, confidence_band: int) -> float:
+    """Persona confidence level given the user's state and the persona's own traits"""
+    base_confidence = 0.8  # Most personas are confident in their roles
+    
+    # Adjust based on persona traits
+    if "confident" in traits:
+        base_confidence = 0.9
+    elif "supportive" in traits:
+        base_confidence = 0.85
+    
+    # Adjust based on user emotion and confidence
+    if user_emotion in ["frustrated", "angry"] and confidence_band < 0:
+        # Persona becomes more careful/measured
+        base_confidence *= 0.9
+    elif user_emotion in ["excited", "confident"] and confidence_band > 0:
+        # Persona feeds off positive energy
+        base_confidence = min(0.95, base_confidence * 1.1)
+    
+    return round(base_confidence, 2)
+
+class _MemoryCache:
+    """LRU cache with TTL expiry for persona memory lookups, keyed (method, agent_id, project_id, ...)"""
+    
+    def __init__(self, ttl_seconds: float = 30, maxsize: int = 512):
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Tuple) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[0] >= self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+    
+    def set(self, key: Tuple, value: Any) -> Any:
+        """Cache a value as most recently used and return it"""
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+    
+    def invalidate_project(self, project_id: str):
+        """Drop every cached lookup for a project"""
+        with self._lock:
+            for key in [key for key in self._entries if key[2] == project_id]:
+                del self._entries[key]
+    
+    def clear(self):
+        """Drop every cached lookup"""
+        with self._lock:
+            self._entries.clear()
 
-Generate a natural introduction (2-3 sentences) that this person would actually say:"""
+@dataclass(slots=True)
+class _MemoryScan:
+    """One categorized pass over a persona's project memories, shared by the summary and knowledge views"""
+    persona_name: str
+    summary_memories: List[Any]
+    total_knowledge: int
+    memory_categories: List[Optional[str]] = field(default_factory=list)  # parallel to summary_memories
+    category_counts: Counter = field(default_factory=Counter)
+    skills: List[str] = field(default_factory=list)
+    traits: List[str] = field(default_factory=list)
+    experiences: List[str] = field(default_factory=list)
 
-        # For now, return a simple dynamic introduction
-        # In a full implementation, this would call your AI model
-        base_intro = f"Hi everyone! I'm {persona['name']}, your {persona['role'].lower()}. "
+class PersonaBehaviorManager:
+    """Manages persona behavior, introductions, and adaptations"""
+    
+    INTRO_CHECK_TTL_SECONDS = 60
+    INTRO_CHECK_CACHE_SIZE = 256
+    MEMORY_CACHE_TTL_SECONDS = 30
+    MEMORY_CACHE_SIZE = 512
+    
+    def __init__(self, rag_manager=None):
+        self.rag_manager = rag_manager
+        self.personas = _PERSONAS
+        self._intro_templates = _INTRO_TEMPLATES
+        self.meeting_tone_rules = _MEETING_RULES
+        # Styles depend only on the meeting type, so each one is built once and shared read-only
+        self._response_style_cache = functools.lru_cache(maxsize=32)(self._build_response_style)
+        self.behavior_memory = {}  # Project-specific behavior memories
+        # project_id -> (should_introduce_team result, checked at), oldest first
+        self._intro_check_cache: "OrderedDict[str, Tuple[bool, float]]" = OrderedDict()
+        # Short-lived results of the RAG-backed persona memory getters
+        self._memory_cache = _MemoryCache(ttl_seconds=self.MEMORY_CACHE_TTL_SECONDS, maxsize=self.MEMORY_CACHE_SIZE)
+        
+    def get_introduction_for_project_start(self, project_id: str, meeting_type: str = "project_kickoff") -> List[Dict]:
+        """Generate AI-powered introductions for all personas at project start"""
+        # The introductions are logically simultaneous, so they share one timestamp
+        timestamp = _iso_now_cached()
+        
+        introductions = [
+            self._build_one_intro(persona_id, persona, project_id, meeting_type, timestamp)
+            for persona_id, persona in self.personas.items()
+        ]
+        
+        # Store all introductions in RAG memory with one batched write
+        if self.rag_manager:
+            memory_records = [
+                {
+                    "content": f"Project introduction by {intro['agent_name']} ({intro['agent_role']}): {intro['message']}",
+                    "project_id": project_id,
+                    "user_id": 1,
+                    "additional_metadata": {
+                        "event_type": "project_introduction",
+                        "agent_id": intro["agent_id"],
+                        "meeting_type": meeting_type
+                    }
+                }
+                for intro in introductions
+            ]
+            if self._add_memories(memory_records, "introduction"):
+                # The team has now been introduced; spare the next check a vector search
+                self._cache_intro_check(project_id, False)
         
-        # Add personality-based content
-        if "supportive" in persona["base_personality"]["traits"]:
-            base_intro += "I'm really excited to work with this team and help everyone succeed. "
-        elif "technical" in persona["base_personality"]["traits"]:
-            base_intro += "I'm passionate about solving technical challenges and love collaborating on complex problems. "
-        elif "creative" in persona["base_personality"]["traits"]:
-            base_intro += "I'm thrilled to bring creative solutions and user-focused design to our project. "
-        elif "detail-oriented" in persona["base_personality"]["traits"]:
-            base_intro += "I'm here to ensure we deliver high-quality work and maintain excellent standards. "
-        elif "analytical" in persona["base_personality"]["traits"]:
-            base_intro += "I'm excited to bridge our business goals with technical implementation. "
+        return introductions
+    
+    def _build_one_intro(self, persona_id: str, persona: Persona, project_id: str, meeting_type: str, timestamp: str) -> Dict:
+        """Generate one persona's introduction message"""
+        # Get AI-generated introduction based on persona and context
+        intro_message = self._generate_ai_introduction(persona, project_id, meeting_type)
         
-        base_intro += "Looking forward to collaborating with all of you!"
+        return {
+            "agent_id": persona_id,
+            "agent_name": persona.name,
+            "agent_role": persona.role,
+            "message": intro_message,
+            "timestamp": timestamp,
+            "message_type": "introduction",
+            "tone": "friendly_enthusiastic"
+        }
+    
+    def _add_memories(self, memory_records: List[Dict], label: str) -> bool:
+        """Write memory records through the RAG manager's batch API, one by one if it has none; True if all were stored"""
+        if hasattr(self.rag_manager, "add_memories_batch"):
+            try:
+                self.rag_manager.add_memories_batch(memory_records)
+                return True
+            except Exception as e:
+                logger.error(f"Failed to store {label}s in RAG: {e}")
+                return False
         
-        return base_intro
+        stored_all = True
+        for record in memory_records:
+            try:
+                self.rag_manager.add_memory(**record)
+            except Exception as e:
+                logger.error(f"Failed to store {label} in RAG: {e}")
+                stored_all = False
+        return stored_all
     
-    def _personalize_introduction(self, template: str, persona: Dict, project_id: str) -> str:
+    def _generate_ai_introduction(self, persona: Persona, project_id: str, meeting_type: str) -> str:
+        """Generate AI-powered introduction based on persona and context"""
+        template = self._intro_templates.get(persona.id)
+        if template is not None:
+            return template
+        return f"Hi everyone! I'm {persona.name}, your {persona.role.lower()}. Looking forward to collaborating with all of you!"
+    
+    def _personalize_introduction(self, template: str, persona: Persona, project_id: str) -> str:
         """Legacy method - now redirects to AI generation"""
         return self._generate_ai_introduction(persona, project_id, "general")
     
@@ -331,7 +781,7 @@ Generate a natural introduction (2-3 sentences) that this person would actually
             return {"error": f"Unknown agent: {agent_id}"}
         
         persona = self.personas[agent_id]
-        meeting_rules = self.meeting_tone_rules.get(MeetingType(meeting_type), {})
+        meeting_rules = self.meeting_tone_rules.get(meeting_type, _DEFAULT_MEETING_RULE)
         
         # Get natural user behavior description for AI to interpret
         user_behavior_summary = self._analyze_user_behavior(user_behavior_history)
@@ -341,16 +791,16 @@ Generate a natural introduction (2-3 sentences) that this person would actually
         
         # Build behavior profile for AI interpretation
         behavior_profile = {
-            "agent_name": persona["name"],
-            "agent_role": persona["role"],
-            "base_personality": persona["base_personality"],
+            "agent_name": persona.name,
+            "agent_role": persona.role,
+            "base_personality": persona.base_personality,
             "meeting_context": {
                 "type": meeting_type,
-                "tone": meeting_rules.get("overall_tone", "professional"),
-                "energy_level": meeting_rules.get("energy_level", "medium"),
-                "formality": meeting_rules.get("formality", "medium"),
-                "focus": meeting_rules.get("focus", "general"),
-                "typical_behaviors": meeting_rules.get("typical_behaviors", [])
+                "tone": meeting_rules.overall_tone,
+                "energy_level": meeting_rules.energy_level,
+                "formality": meeting_rules.formality,
+                "focus": meeting_rules.focus,
+                "typical_behaviors": list(meeting_rules.typical_behaviors)
             },
             "user_behavior_summary": user_behavior_summary,
             "memory_context": memory_context,
@@ -371,30 +821,30 @@ Generate a natural introduction (2-3 sentences) that this person would actually
         total_messages = len(user_behavior_history)
         recent_messages = user_behavior_history[-5:] if len(user_behavior_history) > 5 else user_behavior_history
         
-        behavior_summary = f"User interaction history ({total_messages} total messages):\n"
+        parts = [f"User interaction history ({total_messages} total messages):"]
         
-        for i, msg in enumerate(recent_messages, 1):
-            content = msg.get("content", "")[:200]  # Limit length
-            timestamp = msg.get("timestamp", "")
-            behavior_summary += f"{i}. {content}\n"
+        # Messages without content (e.g. system events) add nothing, so skip them before slicing
+        contents = (msg.get("content") for msg in recent_messages)
+        for i, content in enumerate((content for content in contents if content), 1):
+            parts.append(f"{i}. {content[:200]}")  # Limit length
         
         # Add timing context if available
         if len(recent_messages) > 1:
-            behavior_summary += f"\nMessage frequency: {len(recent_messages)} messages in recent interaction"
+            parts.append(f"\nMessage frequency: {len(recent_messages)} messages in recent interaction")
         
-        return behavior_summary
+        return "\n".join(parts)
     
-    def _generate_ai_behavior_instructions(self, persona: Dict, meeting_rules: Dict, 
+    def _generate_ai_behavior_instructions(self, persona: Persona, meeting_rules: MeetingRule, 
                                          user_behavior_summary: str, memory_context: Dict) -> str:
         """Generate natural behavior instructions for AI to interpret and follow"""
         
-        instructions = f"""You are {persona['name']}, a {persona['role']} with these core traits: {', '.join(persona['base_personality']['traits'])}.
+        instructions = f"""You are {persona.name}, a {persona.role} with these core traits: {persona.traits_joined}.
 
 MEETING CONTEXT:
-- Type: {meeting_rules.get('focus', 'general conversation')}
-- Tone: {meeting_rules.get('overall_tone', 'professional')}
-- Energy Level: {meeting_rules.get('energy_level', 'medium')}
-- Expected Behaviors: {', '.join(meeting_rules.get('typical_behaviors', ['be helpful and professional']))}
+- Type: {meeting_rules.focus}
+- Tone: {meeting_rules.overall_tone}
+- Energy Level: {meeting_rules.energy_level}
+- Expected Behaviors: {', '.join(meeting_rules.typical_behaviors)}
 
 USER INTERACTION PATTERNS:
 {user_behavior_summary}
@@ -409,7 +859,7 @@ YOUR PERSONA'S CURRENT KNOWLEDGE:
 {self._format_persona_knowledge(memory_context.get('persona_knowledge', {}))}
 
 NATURAL BEHAVIORAL GUIDANCE:
-- Respond as {persona['name']} would naturally respond based on your personality and role
+- Respond as {persona.name} would naturally respond based on your personality and role
 - Consider the meeting type and adjust your communication style accordingly
 - Remember and reference relevant past interactions from the project memory
 - Adapt your behavior based on how the user has been interacting
@@ -419,30 +869,21 @@ NATURAL BEHAVIORAL GUIDANCE:
 
         return instructions
     
-    def get_meeting_appropriate_response_style(self, meeting_type: str) -> Dict:
-        """Get response style guidelines for a specific meeting type"""
-        try:
-            meeting_enum = MeetingType(meeting_type)
-            rules = self.meeting_tone_rules.get(meeting_enum, {})
-            
-            return {
-                "tone": rules.get("overall_tone", "professional"),
-                "energy_level": rules.get("energy_level", "medium"),
-                "formality": rules.get("formality", "medium"),
-                "collaboration_level": rules.get("collaboration_level", "medium"),
-                "focus": rules.get("focus", "general"),
-                "behaviors": rules.get("typical_behaviors", [])
-            }
-        except ValueError:
-            # Unknown meeting type, return default
-            return {
-                "tone": "professional",
-                "energy_level": "medium",
-                "formality": "medium",
-                "collaboration_level": "medium",
-                "focus": "general",
-                "behaviors": ["be helpful and professional"]
-            }
+    def get_meeting_appropriate_response_style(self, meeting_type: str) -> Mapping[str, Any]:
+        """Get response style guidelines for a specific meeting type (read-only, cached per type)"""
+        return self._response_style_cache(meeting_type)
+    
+    def _build_response_style(self, meeting_type: str) -> Mapping[str, Any]:
+        """Assemble the read-only response style for a meeting type"""
+        rules = self.meeting_tone_rules.get(meeting_type, _DEFAULT_MEETING_RULE)
+        return MappingProxyType({
+            "tone": rules.overall_tone,
+            "energy_level": rules.energy_level,
+            "formality": rules.formality,
+            "collaboration_level": rules.collaboration_level,
+            "focus": rules.focus,
+            "behaviors": rules.typical_behaviors
+        })
     
     def get_persona_memory_context(self, agent_id: str, project_id: str, query: str = None) -> Dict:
         """Retrieve relevant memory context for a persona"""
@@ -450,8 +891,10 @@ NATURAL BEHAVIORAL GUIDANCE:
             return {"context": [], "error": "No memory available"}
         
         try:
+            persona_name = self.personas[agent_id].name
+            
             # Search for relevant memories
-            search_query = query or f"conversations and interactions with {self.personas[agent_id]['name']}"
+            search_query = query or f"conversations and interactions with {persona_name}"
             
             memories = self.rag_manager.search_memories(
                 query=search_query,
@@ -472,7 +915,7 @@ NATURAL BEHAVIORAL GUIDANCE:
             return {
                 "context": context_items,
                 "total_memories": len(memories),
-                "agent_name": self.personas[agent_id]["name"]
+                "agent_name": persona_name
             }
             
         except Exception as e:
@@ -484,6 +927,10 @@ NATURAL BEHAVIORAL GUIDANCE:
         if not self.rag_manager:
             return True  # Default to introducing if no memory
         
+        cached = self._intro_check_cache.get(project_id)
+        if cached is not None and time.time() - cached[1] < self.INTRO_CHECK_TTL_SECONDS:
+            return cached[0]
+        
         try:
             # Check if there are any introduction memories for this project
             intro_memories = self.rag_manager.search_memories(
@@ -492,19 +939,33 @@ NATURAL BEHAVIORAL GUIDANCE:
                 limit=1
             )
             
-            return len(intro_memories) == 0  # Introduce if no previous introductions
+            should_introduce = len(intro_memories) == 0  # Introduce if no previous introductions
+            self._cache_intro_check(project_id, should_introduce)
+            return should_introduce
             
         except Exception as e:
             logger.error(f"Error checking introduction history: {e}")
             return True  # Default to introducing on error
     
+    def _cache_intro_check(self, project_id: str, should_introduce: bool):
+        """Remember a should_introduce_team result, evicting the oldest entries past the size limit"""
+        self._intro_check_cache.pop(project_id, None)
+        self._intro_check_cache[project_id] = (should_introduce, time.time())
+        while len(self._intro_check_cache) > self.INTRO_CHECK_CACHE_SIZE:
+            self._intro_check_cache.popitem(last=False)
+    
     def get_comprehensive_persona_memory(self, agent_id: str, project_id: str) -> Dict:
         """Get comprehensive memory context for a persona from RAG"""
         if not self.rag_manager or agent_id not in self.personas:
             return {"summary": "No memory available", "recent_conversations": [], "persona_knowledge": {}}
         
+        cache_key = ("comprehensive", agent_id, project_id)
+        cached = self._memory_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            persona_name = self.personas[agent_id]["name"]
+            persona_name = self.personas[agent_id].name
             
             # Search for various types of memories related to this persona
             queries = [
@@ -515,27 +976,39 @@ NATURAL BEHAVIORAL GUIDANCE:
                 f"team discussions with {persona_name}"
             ]
             
+            # One batched search: the queries are embedded and probed together
             all_memories = []
-            for query in queries:
-                memories = self.rag_manager.search_memories(
-                    query=query,
+            if hasattr(self.rag_manager, "search_memories_batch"):
+                for memories in self.rag_manager.search_memories_batch(queries, project_id=project_id, limit=5):
+                    all_memories.extend(memories)
+            else:
+                all_memories = self.rag_manager.search_memories(
+                    query=" OR ".join(queries),
                     project_id=project_id,
-                    limit=5
+                    limit=5 * len(queries)
                 )
-                all_memories.extend(memories)
             
             # Remove duplicates and sort by relevance/recency
-            unique_memories = {}
+            seen_memories = set()
+            unique_memories = []
             for memory in all_memories:
-                memory_id = memory.get("id") or memory.get("content", "")[:50]
-                if memory_id not in unique_memories:
-                    unique_memories[memory_id] = memory
+                memory_key = memory.get("id") or memory.get("content", "")[:50]
+                if memory_key in seen_memories:
+                    continue
+                seen_memories.add(memory_key)
+                unique_memories.append(memory)
             
-            sorted_memories = sorted(
-                unique_memories.values(),
-                key=lambda x: (x.get("score", 0), x.get("created_at", "")),
-                reverse=True
-            )[:15]  # Keep top 15 most relevant
+            if NUMPY_AVAILABLE and unique_memories:
+                scores = np.asarray([float(m.get("score") or 0) for m in unique_memories], dtype=np.float64)
+                timestamps = np.asarray([_timestamp_epoch(m.get("created_at")) for m in unique_memories], dtype=np.float64)
+                ranked = _rank_memories(scores, timestamps)[:15]
+                sorted_memories = [unique_memories[idx] for idx in ranked]  # Keep top 15 most relevant
+            else:
+                sorted_memories = sorted(
+                    unique_memories,
+                    key=lambda x: (x.get("score", 0), x.get("created_at", "")),
+                    reverse=True
+                )[:15]  # Keep top 15 most relevant
             
             # Categorize memories
             recent_conversations = []
@@ -543,22 +1016,26 @@ NATURAL BEHAVIORAL GUIDANCE:
             
             for memory in sorted_memories:
                 content = memory.get("content", "")
-                metadata = memory.get("metadata", {})
+                if not content:
+                    continue
+                # A memory can fall into several categories, so collect every group hit
+                categories = {match.lastgroup for match in _CATEGORY_RE.finditer(content)}
                 
-                if "conversation" in content.lower() or "message" in content.lower():
+                if "conv" in categories:
+                    metadata = memory.get("metadata", {})
                     recent_conversations.append({
                         "content": content,
                         "timestamp": memory.get("created_at", ""),
                         "type": metadata.get("event_type", "conversation")
                     })
                 
-                if "task" in content.lower() or "working on" in content.lower():
+                if "task" in categories:
                     persona_knowledge["ongoing_tasks"].append(content)
                 
-                if "team" in content.lower() or "colleague" in content.lower():
+                if "rel" in categories:
                     persona_knowledge["relationships"].append(content)
                 
-                if "project" in content.lower():
+                if "proj" in categories:
                     persona_knowledge["project_context"].append(content)
             
             # Create summary
@@ -570,12 +1047,12 @@ NATURAL BEHAVIORAL GUIDANCE:
             if persona_knowledge["relationships"]:
                 memory_summary += f"- Team relationships and interactions tracked\n"
             
-            return {
+            return self._memory_cache.set(cache_key, {
                 "summary": memory_summary,
                 "recent_conversations": recent_conversations[:5],  # Most recent 5
                 "persona_knowledge": persona_knowledge,
                 "total_memories": len(sorted_memories)
-            }
+            })
             
         except Exception as e:
             logger.error(f"Error retrieving comprehensive persona memory: {e}")
@@ -618,12 +1095,14 @@ NATURAL BEHAVIORAL GUIDANCE:
             return
         
         try:
-            persona_name = self.personas[agent_id]["name"]
-            content = f"""Behavior adaptation for {persona_name}:
-- Meeting type: {behavior_profile['meeting_context']['type']}
-- User interaction pattern: {behavior_profile['user_behavior_summary'][:200]}
-- Adapted behavior: Responding according to {behavior_profile['meeting_context']['tone']} tone
-- Context: {behavior_profile['memory_context']['summary'][:100]}"""
+            persona_name = self.personas[agent_id].name
+            content = _BEHAVIOR_TMPL % {
+                "name": persona_name,
+                "meeting_type": behavior_profile['meeting_context']['type'],
+                "user_pattern": behavior_profile['user_behavior_summary'],
+                "tone": behavior_profile['meeting_context']['tone'],
+                "context": behavior_profile['memory_context']['summary']
+            }
             
             self.rag_manager.add_memory(
                 content=content,
@@ -633,7 +1112,7 @@ NATURAL BEHAVIORAL GUIDANCE:
                     "event_type": "behavior_adaptation",
                     "agent_id": agent_id,
                     "meeting_type": behavior_profile['meeting_context']['type'],
-                    "adaptation_timestamp": datetime.utcnow().isoformat()
+                    "adaptation_timestamp": _iso_now_cached()
                 }
             )
         except Exception as e:
@@ -645,16 +1124,18 @@ NATURAL BEHAVIORAL GUIDANCE:
             return
         
         try:
-            persona_name = self.personas[agent_id]["name"]
+            persona_name = self.personas[agent_id].name
             user_message = conversation_data.get("user_message", "")
             agent_response = conversation_data.get("agent_response", "")
             meeting_type = conversation_data.get("meeting_type", "general")
             
-            content = f"""Conversation with {persona_name} ({persona_name}):
-Meeting type: {meeting_type}
-User: {user_message}
-{persona_name}: {agent_response}
-Context: Individual conversation in project {project_id}"""
+            content = _CONVERSATION_TMPL % {
+                "name": persona_name,
+                "meeting_type": meeting_type,
+                "user_message": user_message,
+                "agent_response": agent_response,
+                "project_id": project_id
+            }
             
             self.rag_manager.add_memory(
                 content=content,
@@ -667,64 +1148,105 @@ Context: Individual conversation in project {project_id}"""
                     "agent_name": persona_name,
                     "meeting_type": meeting_type,
                     "message_count": 2,  # User + agent response
-                    "conversation_timestamp": datetime.utcnow().isoformat()
+                    "conversation_timestamp": _iso_now_cached()
                 }
             )
+            # New memories make cached lookups for this project stale
+            self._memory_cache.invalidate_project(project_id)
+            self.behavior_memory.setdefault(project_id, {})["_has_interactions"] = True
         except Exception as e:
             logger.error(f"Failed to store conversation memory: {e}")
     
-    def get_persona_project_summary(self, agent_id: str, project_id: str) -> Dict:
-        """Get a comprehensive summary of what this persona knows about the project"""
+    def _scan_memories(self, agent_id: str, project_id: str) -> _MemoryScan:
+        """Search and categorize a persona's project memories once for both the summary and knowledge views"""
+        cache_key = ("scan", agent_id, project_id)
+        cached = self._memory_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        persona_name = self.personas[agent_id].name
+        summary_query = f"project {project_id} {persona_name}"
+        knowledge_query = f"{persona_name} experiences skills knowledge"
+        
+        # Both views' queries go through one batched search (one encode, one index probe)
+        if hasattr(self.rag_manager, "search_memories_batch"):
+            summary_memories, knowledge_memories = self.rag_manager.search_memories_batch(
+                [summary_query, knowledge_query], project_id=project_id, limit=20
+            )
+            knowledge_memories = knowledge_memories[:10]
+        else:
+            summary_memories = self.rag_manager.search_memories(query=summary_query, project_id=project_id, limit=20)
+            knowledge_memories = self.rag_manager.search_memories(query=knowledge_query, project_id=project_id, limit=10)
+        
+        scan = _MemoryScan(
+            persona_name=persona_name,
+            summary_memories=summary_memories,
+            total_knowledge=len(knowledge_memories)
+        )
+        
+        # Categorize summary memories by type
+        for memory in summary_memories:
+            # The event type is a single dict lookup, so try it before scanning content
+            event_type = memory.get("metadata", {}).get("event_type", "")
+            category = _SUMMARY_EVENT_CATEGORIES.get(event_type)
+            if category is None:
+                hits = {
+                    _SUMMARY_KEYWORD_CATEGORIES[match.group(0).lower()]
+                    for match in _SUMMARY_KEYWORD_RE.finditer(memory.get("content", ""))
+                }
+                category = next((category for category in _SUMMARY_CATEGORY_ORDER if category in hits), None)
+            scan.memory_categories.append(category)
+            if category is not None:
+                scan.category_counts[category] += 1
+        
+        # Only the first few distinct knowledge items per kind are used, so collect
+        # into capped lists and stop scanning once every list is full
+        for memory in knowledge_memories:
+            content = self._ensure_project_isolation(project_id, memory.get("content", ""))
+            hits = {match.lastgroup for match in _KNOWLEDGE_RE.finditer(content)}
+            if "skill" in hits and len(scan.skills) < 3 and content not in scan.skills:
+                scan.skills.append(content)
+            if "trait" in hits and len(scan.traits) < 2 and content not in scan.traits:
+                scan.traits.append(content)
+            if "proj" in hits and len(scan.experiences) < 3 and content not in scan.experiences:
+                scan.experiences.append(content)
+            if len(scan.skills) == 3 and len(scan.traits) == 2 and len(scan.experiences) == 3:
+                break
+        
+        return self._memory_cache.set(cache_key, scan)
+    
+    def get_persona_project_summary(self, agent_id: str, project_id: str, detail: bool = False) -> Dict:
+        """Get a comprehensive summary of what this persona knows about the project
+        
+        By default only per-category counts are returned; pass detail=True to also
+        get the categorized memories themselves under "categories".
+        """
         if not self.rag_manager or agent_id not in self.personas:
             return {"summary": "No project knowledge available"}
         
         try:
-            persona_name = self.personas[agent_id]["name"]
-            
-            # Search for all project-related memories involving this persona
-            memories = self.rag_manager.search_memories(
-                query=f"project {project_id} {persona_name}",
-                project_id=project_id,
-                limit=20
-            )
-            
-            # Categorize memories by type
-            categories = {
-                "conversations": [],
-                "project_updates": [],
-                "team_interactions": [],
-                "tasks_and_work": [],
-                "decisions_made": []
-            }
-            
-            for memory in memories:
-                content = memory.get("content", "").lower()
-                metadata = memory.get("metadata", {})
-                event_type = metadata.get("event_type", "")
-                
-                if "conversation" in content or event_type == "persona_conversation":
-                    categories["conversations"].append(memory)
-                elif "update" in content or "progress" in content:
-                    categories["project_updates"].append(memory)
-                elif "team" in content or "meeting" in content:
-                    categories["team_interactions"].append(memory)
-                elif "task" in content or "working" in content or "assigned" in content:
-                    categories["tasks_and_work"].append(memory)
-                elif "decision" in content or "agreed" in content:
-                    categories["decisions_made"].append(memory)
+            scan = self._scan_memories(agent_id, project_id)
+            counts = scan.category_counts
             
             # Generate summary
-            summary = f"Project knowledge for {persona_name}:\n"
-            for category, items in categories.items():
-                if items:
-                    summary += f"- {category.replace('_', ' ').title()}: {len(items)} items\n"
+            summary = f"Project knowledge for {scan.persona_name}:\n"
+            for category in _SUMMARY_CATEGORY_ORDER:
+                if counts[category]:
+                    summary += f"- {category.replace('_', ' ').title()}: {counts[category]} items\n"
             
-            return {
+            result = {
                 "summary": summary,
-                "categories": categories,
-                "total_memories": len(memories),
-                "persona_name": persona_name
+                "category_counts": dict(counts),
+                "total_memories": len(scan.summary_memories),
+                "persona_name": scan.persona_name
             }
+            if detail:
+                categories = {category: [] for category in _SUMMARY_CATEGORY_ORDER}
+                for memory, category in zip(scan.summary_memories, scan.memory_categories):
+                    if category is not None:
+                        categories[category].append(memory)
+                result["categories"] = categories
+            return result
             
         except Exception as e:
             logger.error(f"Error getting persona project summary: {e}")
@@ -736,36 +1258,16 @@ Context: Individual conversation in project {project_id}"""
             return {"summary": "No previous project experience"}
         
         try:
-            persona_name = self.personas[agent_id]["name"]
-            
-            # ONLY search memories from current project - NO cross-project knowledge
-            all_memories = self.rag_manager.search_memories(
-                query=f"{persona_name} experiences skills knowledge",
-                project_id=current_project_id,  # STRICT: Only current project
-                limit=10
-            )
-            
-            # NO cross-project knowledge - only current project context
-            experience_areas = set()
-            skills_demonstrated = set()
-            personality_traits = set()
-            
-            for memory in all_memories:
-                content = self._ensure_project_isolation(current_project_id, memory.get("content", ""))
-                if "skilled in" in content.lower() or "experienced with" in content.lower():
-                    skills_demonstrated.add(content)
-                if "personality" in content.lower() or "behavior" in content.lower():
-                    personality_traits.add(content)
-                if "project" in content.lower():
-                    experience_areas.add(content)
+            # ONLY memories from current project - NO cross-project knowledge
+            scan = self._scan_memories(agent_id, current_project_id)
             
             return {
-                "summary": f"Current project knowledge for {persona_name} - no previous project references",
+                "summary": f"Current project knowledge for {scan.persona_name} - no previous project references",
                 "current_project_only": True,
-                "total_experiences": len(all_memories),
-                "skills_demonstrated": list(skills_demonstrated)[:3],
-                "experience_areas": list(experience_areas)[:3],
-                "personality_consistency": list(personality_traits)[:2]
+                "total_experiences": scan.total_knowledge,
+                "skills_demonstrated": scan.skills,
+                "experience_areas": scan.experiences,
+                "personality_consistency": scan.traits
             }
             
         except Exception as e:
@@ -778,19 +1280,21 @@ Context: Individual conversation in project {project_id}"""
             return
         
         try:
-            persona_name = self.personas[agent_id]["name"]
+            persona_name = self.personas[agent_id].name
             interaction_type = interaction_data.get("type", "general")
             learning_points = interaction_data.get("learning_points", [])
             challenges_faced = interaction_data.get("challenges", [])
             skills_used = interaction_data.get("skills_used", [])
             
+            timestamp = _iso_now_cached()
+            
             # Store learning and growth data
             content = f"""Learning and Growth for {persona_name}:
 Interaction Type: {interaction_type}
 Skills Applied: {', '.join(skills_used)}
 Learning Points: {'; '.join(learning_points)}
 Challenges Encountered: {'; '.join(challenges_faced)}
-Growth Context: Project {project_id} - {datetime.utcnow().isoformat()}"""
+Growth Context: Project {project_id} - {timestamp}"""
             
             self.rag_manager.add_memory(
                 content=content,
@@ -802,60 +1306,55 @@ Growth Context: Project {project_id} - {datetime.utcnow().isoformat()}"""
                     "interaction_type": interaction_type,
                     "skills_used": skills_used,
                     "learning_points": learning_points,
-                    "growth_timestamp": datetime.utcnow().isoformat()
+                    "growth_timestamp": timestamp
                 }
             )
+            # New memories make cached lookups for this project stale
+            self._memory_cache.invalidate_project(project_id)
         except Exception as e:
             logger.error(f"Failed to track persona growth: {e}")
     
     def get_dynamic_persona_instructions(self, agent_id: str, project_id: str, user_message: str, meeting_type: str = "casual_chat") -> str:
         """Generate completely dynamic AI instructions based on current context and memory"""
+        blocks = self.get_dynamic_persona_instruction_blocks(agent_id, project_id, user_message, meeting_type)
+        return "\n\n".join(block["text"] for block in blocks)
+    
+    def get_dynamic_persona_instruction_blocks(self, agent_id: str, project_id: str, user_message: str, meeting_type: str = "casual_chat") -> List[Dict]:
+        """Instructions as prompt blocks: a static persona prefix marked cacheable, then the per-message context"""
         if agent_id not in self.personas:
-            return "You are a helpful AI assistant."
+            return [{"type": "text", "text": "You are a helpful AI assistant."}]
         
-        persona = self.personas[agent_id]
-        
-        # Get comprehensive context
-        memory_context = self.get_comprehensive_persona_memory(agent_id, project_id)
-        cross_project_knowledge = self.get_cross_project_persona_knowledge(agent_id, project_id)
-        project_summary = self.get_persona_project_summary(agent_id, project_id)
+        # Get comprehensive context; the two lookups are independent RAG searches, so overlap them
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            memory_future = executor.submit(self.get_comprehensive_persona_memory, agent_id, project_id)
+            summary_future = executor.submit(self.get_persona_project_summary, agent_id, project_id)
+            memory_context = self._future_result(memory_future, "persona memory")
+            project_summary = self._future_result(summary_future, "project summary")
         
         # Let AI interpret everything naturally but ONLY for current project
-        instructions = f"""You are {persona['name']}, a {persona['role']}.
-
-CORE IDENTITY:
-{json.dumps(persona['base_personality'], indent=2)}
-
-CURRENT PROJECT CONTEXT (PROJECT {project_id} ONLY):
-{memory_context.get('summary', 'New project interaction')}
-
-RECENT PROJECT CONVERSATIONS:
-{self._format_recent_conversations(memory_context.get('recent_conversations', []))}
-
-YOUR ACCUMULATED KNOWLEDGE FROM THIS PROJECT ONLY:
-{project_summary.get('summary', 'Limited project knowledge')}
-
-CURRENT MEETING/CONVERSATION TYPE: {meeting_type}
-
-USER'S MESSAGE: {user_message}
-
-CRITICAL BEHAVIORAL RULES:
-- You are ONLY aware of this current project ({project_id})
-- NEVER reference other projects, previous projects, or outside work
-- NEVER say "in my experience with other projects" or similar phrases
-- If this is the first interaction, introduce yourself naturally as if meeting for the first time
-- Focus ONLY on the current project context and team dynamics
-- Respond as {persona['name']} would naturally respond based on your personality and role
-- Be authentic to your personality while being helpful and professional
-- Stay strictly within the context of this project and team
-
-WORKPLACE REALISM:
-- This is a real workplace conversation
-- Keep responses focused and professional
-- Show awareness of ongoing project work and team dynamics
-- Be natural and authentic to your role"""
-
-        return instructions
+        dynamic_context = _DYNAMIC_CONTEXT_TMPL % {
+            "project_id": project_id,
+            "memory_summary": memory_context.get('summary', 'New project interaction'),
+            "recent_conversations": self._format_recent_conversations(memory_context.get('recent_conversations', [])),
+            "project_summary": project_summary.get('summary', 'Limited project knowledge'),
+            "meeting_type": meeting_type,
+            "user_message": user_message
+        }
+        
+        return [
+            # Identical for every turn with this persona in this project, so providers with
+            # prefix caching can reuse it
+            {"type": "text", "text": _build_static_persona_prefix(agent_id, project_id), "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": dynamic_context}
+        ]
+    
+    def _future_result(self, future, label: str) -> Dict:
+        """Result of a context lookup future, or an empty context if it failed"""
+        try:
+            return future.result()
+        except Exception as e:
+            logger.error(f"Error retrieving {label} for instructions: {e}")
+            return {}
     
     def clean_up_old_memories(self, project_id: str, days_old: int = 30):
         """Clean up old memories to prevent context overload (optional optimization)"""
@@ -873,44 +1372,60 @@ WORKPLACE REALISM:
     def clear_all_memory(self):
         """ADMIN: Clear all persona behavior memory"""
         self.behavior_memory.clear()
+        self._memory_cache.clear()
+        self._intro_check_cache.clear()
         logger.info("PersonaBehaviorManager: All memory cleared")
     
     def clear_project_memory(self, project_id: str):
         """ADMIN: Clear memory for a specific project"""
         if project_id in self.behavior_memory:
             del self.behavior_memory[project_id]
+        self._memory_cache.invalidate_project(project_id)
+        self._intro_check_cache.pop(project_id, None)
         logger.info(f"PersonaBehaviorManager: Memory cleared for project {project_id}")
     
     def _ensure_project_isolation(self, project_id: str, memory_content: str) -> str:
         """Ensure memory content doesn't reference other projects - STRICT PROJECT ISOLATION"""
-        isolated_content = memory_content
-        
-        # Remove references to other project IDs completely
-        import re
-        project_patterns = [
-            r'\bproj_[a-zA-Z0-9]+\b',
-            r'\bproject_[a-zA-Z0-9]+\b', 
-            r'\bPROJ[A-Z0-9]+\b',
-            r'\b[a-zA-Z0-9]+-project\b',
-            r'\bother project\b',
-            r'\bprevious project\b',
-            r'\blast project\b'
-        ]
+        # Collect the span of every sentence that references another project, in one scan
+        current_project = project_id.lower()
+        spans = []
+        for match in _PROJECT_REF_RE.finditer(memory_content):
+            if match.group(0).lower() == current_project:
+                continue
+            # Only terminated sentences are removed, matching the old sentence pattern
+            end_match = _SENTENCE_END_RE.search(memory_content, match.end())
+            if end_match is None:
+                continue
+            start = max(memory_content.rfind(ch, 0, match.start()) for ch in ".!?") + 1
+            end = end_match.end()
+            if spans and start <= spans[-1][1]:
+                spans[-1] = (spans[-1][0], max(spans[-1][1], end))
+            else:
+                spans.append((start, end))
+        if not spans:
+            return memory_content.strip()
         
-        for pattern in project_patterns:
-            matches = re.findall(pattern, isolated_content, re.IGNORECASE)
-            for match in matches:
-                if match.lower() != project_id.lower():
-                    # Remove the entire sentence containing the reference
-                    isolated_content = re.sub(r'[^.!?]*' + re.escape(match) + r'[^.!?]*[.!?]', '', isolated_content)
+        # Splice out the removed sentences with a single join
+        kept = []
+        position = 0
+        for start, end in spans:
+            kept.append(memory_content[position:start])
+            position = end
+        kept.append(memory_content[position:])
         
-        return isolated_content.strip()
+        return "".join(kept).strip()
     
     def ensure_first_interaction_is_introduction(self, project_id: str) -> bool:
         """Check if this is the first interaction and team introduction is needed"""
         if not self.rag_manager:
             return True  # Default to introducing if no memory system
         
+        # Once a project has had a conversation it never needs introductions again;
+        # a negative result is not cached because the first conversation can land at any time
+        project_memory = self.behavior_memory.setdefault(project_id, {})
+        if project_memory.get("_has_interactions"):
+            return False
+        
         try:
             # Check for any conversation history in this project
             memories = self.rag_manager.search_memories(
@@ -920,6 +1435,8 @@ WORKPLACE REALISM:
             )
             
             # If no conversations found, team introduction is needed
+            if memories:
+                project_memory["_has_interactions"] = True
             return len(memories) == 0
             
         except Exception as e:
@@ -942,31 +1459,20 @@ WORKPLACE REALISM:
         memory_context = self.get_comprehensive_persona_memory(agent_id, project_id)
         
         # Generate emotion-aware instructions
-        emotion_instructions = f"""You are {persona['name']}, responding to a message with the following emotional context:
-
-USER MESSAGE: {message}
-USER EMOTION: {user_emotion} (confidence: {user_confidence * 100:.0f}%)
-
-EMOTIONAL RESPONSE STRATEGY:
-- Tone to adopt: {response_strategy['tone']}
-- Energy level: {response_strategy['energy']}
-- Support level: {response_strategy['support_level']}
-- Response approach: {response_strategy['approach']}
-
-YOUR PERSONALITY TRAITS: {', '.join(persona['base_personality']['traits'])}
-
-SPECIFIC GUIDANCE FOR THIS EMOTION:
-{response_strategy['specific_guidance']}
-
-MEETING CONTEXT: {meeting_type}
-
-Remember to:
-- Stay true to your personality while adapting to their emotional state
-- Be authentic and natural in your response
-- Reference relevant project context when appropriate
-- Show empathy and understanding when needed
-- Maintain professional boundaries while being supportive"""
-
+        emotion_instructions = _EMOTION_INSTRUCTIONS_TMPL % {
+            "name": persona.name,
+            "message": message,
+            "user_emotion": user_emotion,
+            "confidence": user_confidence * 100,
+            "tone": response_strategy['tone'],
+            "energy": response_strategy['energy'],
+            "support_level": response_strategy['support_level'],
+            "approach": response_strategy['approach'],
+            "traits": persona.traits_joined,
+            "guidance": response_strategy['specific_guidance'],
+            "meeting_type": meeting_type
+        }
+        
         # Determine the persona's emotional state in response
         persona_emotion = self._determine_persona_emotion_response(persona, user_emotion, user_confidence)
         
@@ -978,141 +1484,15 @@ Remember to:
             "memory_context": memory_context
         }
     
-    def _get_emotional_response_strategy(self, persona: Dict, user_emotion: str, confidence: float) -> Dict:
+    def _get_emotional_response_strategy(self, persona: Persona, user_emotion: str, confidence: float) -> Dict:
         """Determine how this persona should respond to the user's emotional state"""
-        
-        # Base strategies for different emotions
-        emotion_strategies = {
-            "excited": {
-                "tone": "enthusiastic" if "supportive" in persona["base_personality"]["traits"] else "positive",
-                "energy": "high",
-                "support_level": "encouraging",
-                "approach": "match_enthusiasm",
-                "specific_guidance": "Match their excitement while staying professional. Show genuine enthusiasm for their ideas."
-            },
-            "frustrated": {
-                "tone": "calm_supportive",
-                "energy": "steady",
-                "support_level": "high",
-                "approach": "problem_solving",
-                "specific_guidance": "Acknowledge their frustration, offer practical help, and focus on solutions."
-            },
-            "confused": {
-                "tone": "patient_helpful",
-                "energy": "calm",
-                "support_level": "educational",
-                "approach": "clarifying",
-                "specific_guidance": "Provide clear explanations, break down complex topics, and offer additional support."
-            },
-            "confident": {
-                "tone": "collaborative",
-                "energy": "medium_high",
-                "support_level": "peer_level",
-                "approach": "engaging",
-                "specific_guidance": "Engage as equals, build on their confidence, and explore ideas together."
-            },
-            "nervous": {
-                "tone": "reassuring",
-                "energy": "calm",
-                "support_level": "very_high",
-                "approach": "encouraging",
-                "specific_guidance": "Be extra supportive, provide reassurance, and help build their confidence."
-            },
-            "calm": {
-                "tone": "professional",
-                "energy": "medium",
-                "support_level": "standard",
-                "approach": "balanced",
-                "specific_guidance": "Maintain a balanced, professional approach while being approachable."
-            },
-            "angry": {
-                "tone": "calm_diplomatic",
-                "energy": "low",
-                "support_level": "de_escalating",
-                "approach": "defusing",
-                "specific_guidance": "Stay calm, acknowledge their concerns, and work toward resolution."
-            }
-        }
-        
-        # Get base strategy
-        strategy = emotion_strategies.get(user_emotion, emotion_strategies["calm"])
-        
-        # Adjust based on persona traits
-        if "empathetic" in persona["base_personality"]["traits"]:
-            strategy["support_level"] = "very_high"
-        elif "direct" in persona["base_personality"]["traits"]:
-            strategy["approach"] = "direct_helpful"
-        elif "analytical" in persona["base_personality"]["traits"]:
-            strategy["approach"] = "logical_structured"
-        
-        # Adjust based on confidence level
-        if confidence < 0.5:
-            strategy["support_level"] = "high"
-            strategy["tone"] = "reassuring"
-        elif confidence > 0.8:
-            strategy["energy"] = "high"
-        
-        return strategy
+        # Copy so callers can adjust the strategy without touching the cached one
+        return dict(_emotion_strategy(persona.trait_set, user_emotion, _confidence_band(confidence)))
     
-    def _determine_persona_emotion_response(self, persona: Dict, user_emotion: str, confidence: float) -> str:
+    def _determine_persona_emotion_response(self, persona: Persona, user_emotion: str, confidence: float) -> str:
         """Determine what emotion the persona should display in response"""
-        
-        # Empathetic personas mirror emotions more
-        if "empathetic" in persona["base_personality"]["traits"]:
-            if user_emotion in ["excited", "happy"]:
-                return "excited"
-            elif user_emotion in ["frustrated", "angry"]:
-                return "concerned"
-            elif user_emotion in ["nervous", "confused"]:
-                return "supportive"
-        
-        # Supportive personas stay positive and helpful
-        elif "supportive" in persona["base_personality"]["traits"]:
-            if user_emotion in ["frustrated", "nervous", "confused"]:
-                return "supportive"
-            elif user_emotion in ["excited", "confident"]:
-                return "enthusiastic"
-            else:
-                return "encouraging"
-        
-        # Technical personas stay focused but helpful
-        elif "technical" in persona["base_personality"]["traits"]:
-            if user_emotion in ["confused", "frustrated"]:
-                return "helpful"
-            elif user_emotion in ["excited", "confident"]:
-                return "engaged"
-            else:
-                return "focused"
-        
-        # Creative personas are more expressive
-        elif "creative" in persona["base_personality"]["traits"]:
-            if user_emotion in ["excited", "happy"]:
-                return "inspired"
-            elif user_emotion in ["frustrated", "confused"]:
-                return "thoughtful"
-            else:
-                return "creative"
-        
-        # Default: stay balanced but responsive
-        return "professional"
+        return _persona_emotion(persona.trait_set, user_emotion)
     
-    def _calculate_persona_confidence(self, persona: Dict, user_emotion: str, user_confidence: float) -> float:
+    def _calculate_persona_confidence(self, persona: Persona, user_emotion: str, user_confidence: float) -> float:
         """Calculate the persona's confidence level based on user state and their own traits"""
-        
-        base_confidence = 0.8  # Most personas are confident in their roles
-        
-        # Adjust based on persona traits
-        if "confident" in persona["base_personality"]["traits"]:
-            base_confidence = 0.9
-        elif "supportive" in persona["base_personality"]["traits"]:
-            base_confidence = 0.85
-        
-        # Adjust based on user emotion and confidence
-        if user_emotion in ["frustrated", "angry"] and user_confidence < 0.5:
-            # Persona becomes more careful/measured
-            base_confidence *= 0.9
-        elif user_emotion in ["excited", "confident"] and user_confidence > 0.8:
-            # Persona feeds off positive energy
-            base_confidence = min(0.95, base_confidence * 1.1)
-        
-        return round(base_confidence, 2)
+        return _persona_confidence(persona.trait_set, user_emotion, _confidence_band(user_confidence))
@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Union
 from sqlalchemy.orm import Session
 from datetime import datetime, date, timedelta
 import uuid
@@ -6,6 +6,8 @@ import json
 import asyncio
 import random
 import logging
+import shutil
+from functools import lru_cache
 from pathlib import Path
 
 from ..models import (
@@ -23,17 +25,107 @@ def get_agent_manager():
 
 logger = logging.getLogger(__name__)
 
+# Agent display names by agent ID
+AGENT_NAMES = {
+    "manager_001": "Sarah Johnson",
+    "developer_001": "Alex Chen", 
+    "qa_001": "David Kim",
+    "client_001": "Michael Rodriguez",
+    "hr_001": "Jennifer Williams",
+    "intern_001": "Jamie Taylor",
+    "tech_lead_001": "Alex Chen",  # Map to existing developer
+    "designer_001": "David Kim",   # Map to existing QA
+    "analyst_001": "Alex Chen",    # Map to existing developer
+    "technical_lead": "Alex Chen", # Fix the missing technical_lead
+    "tech_lead": "Alex Chen"
+}
+
+# Participant names and role keys mapped to AgentManager agent IDs (matched as substrings)
+AGENT_ID_MAP = {
+    "sarah johnson": "manager_001",
+    "alex chen": "developer_001", 
+    "michael rodriguez": "client_001",
+    "jennifer williams": "hr_001",
+    "jamie taylor": "intern_001",
+    "david kim": "qa_001",
+    "maria rodriguez": "qa_001",
+    "michael brown": "developer_001",  # Map tech lead to developer
+    "lisa thompson": "developer_001",  # Map analyst to developer
+    "technical_lead": "developer_001",  # Fix the missing technical_lead
+    "tech_lead": "developer_001",
+    "tech_lead_001": "developer_001",
+    "analyst": "developer_001",
+    "analyst_001": "developer_001",
+    "designer": "developer_001",
+    "designer_001": "developer_001",
+    "qa_engineer": "qa_001",
+    "senior_developer": "developer_001"
+}
+
+# Project member names mapped to AgentManager agent IDs (exact match, defaulting to developer_001)
+MEMBER_AGENT_ID_MAP = {
+    "Sarah Johnson": "manager_001",
+    "Alex Chen": "developer_001", 
+    "Michael Rodriguez": "client_001",
+    "Jennifer Williams": "hr_001",
+    "Jamie Taylor": "intern_001",
+    "David Kim": "qa_001",
+    "Maria Rodriguez": "qa_001",
+    "Michael Brown": "developer_001",  # Map tech lead to developer
+    "Lisa Thompson": "developer_001",  # Map analyst to developer
+    "technical_lead": "developer_001",  # Fix the missing technical_lead
+    "tech_lead_001": "developer_001",
+    "designer_001": "developer_001",
+    "analyst_001": "developer_001",
+    "qa_engineer": "qa_001",
+    "senior_developer": "developer_001"
+}
+
+@lru_cache(maxsize=256)
+def _resolve_agent_id(agent_name_lower: str) -> str:
+    """Map a lowercased participant name to an AgentManager agent ID"""
+    # Find the correct agent ID
+    agent_id = None
+    for name, id in AGENT_ID_MAP.items():
+        if name in agent_name_lower:
+            agent_id = id
+            break
+    
+    # If no specific agent found, try by role keywords
+    if not agent_id:
+        if "manager" in agent_name_lower or "lead" in agent_name_lower:
+            agent_id = "manager_001"
+        elif "developer" in agent_name_lower or "dev" in agent_name_lower or "tech" in agent_name_lower:
+            agent_id = "developer_001"
+        elif "qa" in agent_name_lower or "quality" in agent_name_lower or "test" in agent_name_lower:
+            agent_id = "qa_001"
+        elif "designer" in agent_name_lower or "design" in agent_name_lower:
+            agent_id = "developer_001"  # Map to developer as we don't have a dedicated designer
+        elif "hr" in agent_name_lower or "human" in agent_name_lower:
+            agent_id = "hr_001"
+        elif "client" in agent_name_lower or "customer" in agent_name_lower:
+            agent_id = "client_001"
+        elif "intern" in agent_name_lower or "junior" in agent_name_lower:
+            agent_id = "intern_001"
+        else:
+            agent_id = "developer_001"  # Default fallback
+    
+    return agent_id
+
+# Conversation fields a new message changes; logged with each message so a replay restores them
+MESSAGE_LOG_CONVERSATION_FIELDS = ("last_message", "unread_count", "last_activity")
+
 ROLE_HIERARCHY = {
-    ProjectRole.INTERN: [ProjectRole.JUNIOR_DEVELOPER, ProjectRole.SENIOR_DEVELOPER],
-    ProjectRole.JUNIOR_DEVELOPER: [ProjectRole.SENIOR_DEVELOPER, ProjectRole.TECH_LEAD],
-    ProjectRole.SENIOR_DEVELOPER: [ProjectRole.TECH_LEAD, ProjectRole.PROJECT_MANAGER],
-    ProjectRole.QA_ENGINEER: [ProjectRole.TECH_LEAD, ProjectRole.PROJECT_MANAGER],
-    ProjectRole.DESIGNER: [ProjectRole.PROJECT_MANAGER, ProjectRole.PRODUCT_MANAGER],
-    ProjectRole.BUSINESS_ANALYST: [ProjectRole.PROJECT_MANAGER, ProjectRole.PRODUCT_MANAGER],
-    ProjectRole.TECH_LEAD: [ProjectRole.PROJECT_MANAGER],
-    ProjectRole.SCRUM_MASTER: [ProjectRole.PROJECT_MANAGER],
-    ProjectRole.PROJECT_MANAGER: [ProjectRole.PRODUCT_MANAGER],
-    ProjectRole.PRODUCT_MANAGER: []  # Top level
+    ProjectRole.INTERN: (ProjectRole.JUNIOR_DEVELOPER, ProjectRole.SENIOR_DEVELOPER),
+    ProjectRole.JUNIOR_DEVELOPER: (ProjectRole.SENIOR_DEVELOPER, ProjectRole.TECH_LEAD),
+    ProjectRole.SENIOR_DEVELOPER: (ProjectRole.TECH_LEAD, ProjectRole.PROJECT_MANAGER),
+    ProjectRole.QA_ENGINEER: (ProjectRole.TECH_LEAD, ProjectRole.PROJECT_MANAGER),
+    ProjectRole.DESIGNER: (ProjectRole.PROJECT_MANAGER, ProjectRole.PRODUCT_MANAGER),
+    ProjectRole.BUSINESS_ANALYST: (ProjectRole.PROJECT_MANAGER, ProjectRole.PRODUCT_MANAGER),
+    ProjectRole.TECH_LEAD: (ProjectRole.PROJECT_MANAGER,),
+    ProjectRole.SCRUM_MASTER: (ProjectRole.PROJECT_MANAGER,),
+    ProjectRole.PROJECT_MANAGER: (ProjectRole.PRODUCT_MANAGER,),
+    ProjectRole.PRODUCT_MANAGER: ()  # Top level
 }
 
 ROLE_INITIATED_CONVERSATIONS = {
@@ -75,6 +167,18 @@ ROLE_INITIATED_CONVERSATIONS = {
 class ProjectManager:
     """Main project management system with agent-initiated conversations and memory management"""
     
+    # New messages go to per-conversation append-only logs instead of rewriting the whole
+    # conversation cache; buffered lines are flushed after this many messages or seconds,
+    # and the logs are compacted into a fresh cache snapshot after MESSAGE_LOG_COMPACT_SIZE
+    MESSAGE_LOG_FLUSH_SIZE = 50
+    MESSAGE_LOG_FLUSH_SECONDS = 2.0
+    MESSAGE_LOG_COMPACT_SIZE = 500
+    
+    # Message memories are written by a background worker in batches of up to
+    # MEMORY_BATCH_SIZE, collecting for at most MEMORY_BATCH_WINDOW_SECONDS
+    MEMORY_BATCH_SIZE = 32
+    MEMORY_BATCH_WINDOW_SECONDS = 0.1
+    
     def __init__(self, db: Session):
         self.db = db
         self.rag_manager = RAGManager()
@@ -82,7 +186,17 @@ class ProjectManager:
         self._conversation_schedules: Dict[str, List[Dict]] = {}  # project_id -> scheduled conversations
         self._scheduled_tasks: Dict[str, Dict] = {}  # task_id -> scheduled task info
         self._agent_initiated_conversations: Dict[str, List[Dict]] = {}  # project_id -> pending conversations
-        self._test_conversations: Dict[str, list] = {}  # project_id -> list of conversations (testing mode)
+        self._test_conversations: Dict[str, Dict[str, dict]] = {}  # project_id -> {conversation_id: conversation}, in creation order (testing mode)
+        
+        # Append-only message log state
+        self._pending_log_lines: Dict[Path, List[str]] = {}  # log path -> JSON lines not yet written
+        self._pending_log_count = 0
+        self._logged_since_snapshot = 0
+        self._log_flush_task: Optional[asyncio.Task] = None
+        
+        # Background memory writes (queue and worker are created on first use inside the event loop)
+        self._memory_queue: Optional[asyncio.Queue] = None
+        self._memory_worker_task: Optional[asyncio.Task] = None
         
         # Try to load existing conversations from a simple file cache
         self._load_conversations_from_cache()
@@ -217,16 +331,21 @@ class ProjectManager:
         
         primary_manager = managers[0]
         
+        # Index members by role once (first member of a role wins, as the old scan did)
+        role_to_member = {}
+        for m in members:
+            role_to_member.setdefault(m.role, m)
+        
         # Set up reporting relationships
         for member in members:
             if member.agent_id == primary_manager.agent_id:
                 continue
                 
             # Determine who this person reports to
-            possible_managers = ROLE_HIERARCHY.get(ProjectRole(member.role), [])
+            possible_managers = ROLE_HIERARCHY.get(ProjectRole(member.role), ())
             found_manager = False
             for manager_role in possible_managers:
-                manager = next((m for m in members if m.role == manager_role.value), None)
+                manager = role_to_member.get(manager_role.value)
                 if manager:
                     member.reporting_to = manager.agent_id
                     found_manager = True
@@ -259,13 +378,17 @@ class ProjectManager:
         
         # Add participants
         participants = request.get("participants", [])
-        for participant_id in participants:
+        participant_names = [self._get_participant_name(project, participant_id) for participant_id in participants]
+        for participant_id, participant_name in zip(participants, participant_names):
             participant = ConversationParticipant(
                 conversation_id=conversation.id,
+                project_id=project_id,
                 participant_id=participant_id,
-                participant_name=self._get_participant_name(project, participant_id)
+                participant_name=participant_name
             )
             conversation.participants.append(participant)
+        conversation.participant_ids = list(participants)
+        conversation.participant_names = participant_names
         
         # Store conversation
         self.db.add(conversation)
@@ -285,216 +408,241 @@ class ProjectManager:
                                         message_type: str = "text") -> Dict[str, Any]:
         """Add a message to an existing conversation and generate AI responses with WhatsApp-like smoothness"""
         
-        conversations = self._test_conversations.get(project_id, [])
-        for conv in conversations:
-            if conv["id"] == conversation_id:
-                if "messages" not in conv or conv["messages"] is None:
-                    conv["messages"] = []
-                
-                # Add user message with WhatsApp-like metadata
-                user_message = {
-                    "id": str(uuid.uuid4()),
-                    "sender_id": sender_id,
-                    "sender_name": "You" if sender_id == "user" else self._get_agent_name(sender_id),
-                    "content": message,
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "message_type": message_type,
-                    "status": "sent",  # WhatsApp-like status: sent, delivered, read
-                    "read_by": [],  # Track who has read the message
-                    "reactions": {},  # For future emoji reactions
-                    "reply_to": None  # For replying to specific messages
-                }
-                conv["messages"].append(user_message)
-                
-                # Update conversation metadata for WhatsApp-like experience
-                conv["last_message"] = {
-                    "content": message[:100] + ("..." if len(message) > 100 else ""),
-                    "timestamp": user_message["timestamp"],
-                    "sender": user_message["sender_name"]
-                }
-                conv["unread_count"] = conv.get("unread_count", 0)
-                conv["last_activity"] = user_message["timestamp"]
-                
-                # Save user message immediately for instant UI feedback
-                self._save_conversations_to_cache()
-                
-                # Cache conversation in optimized storage for faster access
-                optimized_storage.cache_conversation(conversation_id, conv)
-                
-                # Add to RAG memory with batch processing
-                memory_data = {
-                    "content": f"User message: {message}",
-                    "project_id": project_id,
-                    "conversation_id": conversation_id,
-                    "user_id": 1,  # Default user ID in testing mode
-                    "conversation_type": conv.get('conversation_type', 'chat'),
-                    "additional_metadata": {
-                        "sender_name": user_message["sender_name"],
-                        "message_type": message_type,
-                        "timestamp": user_message["timestamp"]
-                    }
-                }
-                
-                if hasattr(self, 'rag_manager') and self.rag_manager:
-                    # Use batch processing for better performance
-                    optimized_storage.batch_add_memory([memory_data])
-                    try:
-                        self.rag_manager.add_memory(**memory_data)
-                    except Exception as e:
-                        print(f"[DEBUG] Failed to save user message to memory: {e}")
-                else:
-                    # If no RAG manager, still batch the memory for later processing
-                    optimized_storage.batch_add_memory([memory_data])
-                
-                # Generate immediate AI responses (no delays)
-                participants = conv.get("participants", [])
-                ai_responses = []
-                
-                for i, participant in enumerate(participants):
-                    if participant != "user" and participant.lower() != "you":
-                        # Generate contextual response immediately
-                        ai_response = self._generate_contextual_response(participant, message, conv.get('conversation_type', 'chat'))
-                        
-                        # Use current timestamp (immediate response)
-                        current_time = datetime.utcnow()
-                        
-                        ai_message = {
-                            "id": str(uuid.uuid4()),
-                            "sender_id": participant,
-                            "sender_name": self._get_agent_name(participant),  # Always include sender name
-                            "content": ai_response,
-                            "timestamp": current_time.isoformat(),
-                            "message_type": "text",
-                            "status": "sent",
-                            "read_by": [],
-                            "reactions": {},
-                            "reply_to": user_message["id"] if random.random() < 0.3 else None,  # 30% chance of replying
-                            "is_ai_response": True
-                        }
-                        
-                        ai_responses.append(ai_message)
-                        conv["messages"].append(ai_message)
-                        
-                        # Save AI message to memory
-                        if hasattr(self, 'rag_manager') and self.rag_manager:
-                            try:
-                                self.rag_manager.add_memory(
-                                    content=f"AI response from {self._get_agent_name(participant)}: {ai_response}",
-                                    project_id=project_id,
-                                    conversation_id=conversation_id,
-                                    agent_id=participant,
-                                    conversation_type=conv.get('conversation_type', 'chat'),
-                                    additional_metadata={
-                                        "sender_name": self._get_agent_name(participant),
-                                        "message_type": "text",
-                                        "timestamp": ai_message["timestamp"],
-                                        "in_response_to": message[:100],
-                                        "immediate_response": True
-                                    }
-                                )
-                            except Exception as e:
-                                print(f"[DEBUG] Failed to save AI message to memory: {e}")
-                
-                # Update last message to the most recent AI response
-                if ai_responses:
-                    last_ai_message = max(ai_responses, key=lambda x: x["timestamp"])
-                    conv["last_message"] = {
-                        "content": last_ai_message["content"][:100] + ("..." if len(last_ai_message["content"]) > 100 else ""),
-                        "timestamp": last_ai_message["timestamp"],
-                        "sender": last_ai_message["sender_name"]
-                    }
-                
-                # Final save with all AI responses
-                self._save_conversations_to_cache()
-                
-                return {
-                    "message": "Message added successfully",
-                    "conversation": conv,
-                    "user_message": user_message,
-                    "ai_responses": ai_responses,
-                    "typing_indicators": [
-                        {
-                            "agent_id": resp["sender_id"],
-                            "agent_name": resp["sender_name"],
-                            "typing_duration": resp["typing_duration"]
-                        } for resp in ai_responses
-                    ]
+        conversations = self._test_conversations.get(project_id, {})
+        conv = conversations.get(conversation_id)
+        if conv is None:
+            print(f"[DEBUG] add_message_to_conversation: project_id={project_id}, conversation_id={conversation_id}")
+            print(f"[DEBUG] Available conversations for project: {list(conversations)}")
+            raise ValueError(f"Conversation {conversation_id} not found")
+        
+        if "messages" not in conv or conv["messages"] is None:
+            conv["messages"] = []
+        conversation_type = conv.get('conversation_type', 'chat')
+        
+        # Add user message with WhatsApp-like metadata
+        user_message = {
+            "id": str(uuid.uuid4()),
+            "sender_id": sender_id,
+            "sender_name": "You" if sender_id == "user" else self._get_agent_name(sender_id),
+            "content": message,
+            "timestamp": datetime.utcnow().isoformat(),
+            "message_type": message_type,
+            "status": "sent",  # WhatsApp-like status: sent, delivered, read
+            "read_by": [],  # Track who has read the message
+            "reactions": {},  # For future emoji reactions
+            "reply_to": None  # For replying to specific messages
+        }
+        conv["messages"].append(user_message)
+        
+        # Update conversation metadata for WhatsApp-like experience
+        conv["last_message"] = {
+            "content": message[:100] + ("..." if len(message) > 100 else ""),
+            "timestamp": user_message["timestamp"],
+            "sender": user_message["sender_name"]
+        }
+        conv["unread_count"] = conv.get("unread_count", 0)
+        conv["last_activity"] = user_message["timestamp"]
+        
+        # Persist the user message by appending it to the conversation's log
+        self._log_message(project_id, conversation_id, conv, user_message)
+        
+        # Cache conversation in optimized storage for faster access
+        optimized_storage.cache_conversation(conversation_id, conv)
+        
+        # Add to RAG memory with batch processing
+        memory_data = {
+            "content": f"User message: {message}",
+            "project_id": project_id,
+            "conversation_id": conversation_id,
+            "user_id": 1,  # Default user ID in testing mode
+            "conversation_type": conversation_type,
+            "additional_metadata": {
+                "sender_name": user_message["sender_name"],
+                "message_type": message_type,
+                "timestamp": user_message["timestamp"]
+            }
+        }
+        
+        # Written by the background memory worker, off the send-message path
+        self._queue_memories([memory_data])
+        
+        # Generate immediate AI responses (no delays), one batched dispatch for all participants
+        participants = [
+            participant for participant in conv.get("participants", [])
+            if participant != "user" and participant.lower() != "you"
+        ]
+        # The LLM calls block, so run the batch off the event loop
+        ai_contents = await asyncio.to_thread(
+            self._generate_contextual_responses, participants, message, conversation_type
+        )
+        ai_responses = []
+        ai_memories = []
+        
+        for participant, ai_response in zip(participants, ai_contents):
+            # Use current timestamp (immediate response)
+            current_time = datetime.utcnow()
+            agent_name = self._get_agent_name(participant)
+            
+            ai_message = {
+                "id": str(uuid.uuid4()),
+                "sender_id": participant,
+                "sender_name": agent_name,  # Always include sender name
+                "content": ai_response,
+                "timestamp": current_time.isoformat(),
+                "message_type": "text",
+                "status": "sent",
+                "read_by": [],
+                "reactions": {},
+                "reply_to": user_message["id"] if random.random() < 0.3 else None,  # 30% chance of replying
+                "is_ai_response": True
+            }
+            
+            ai_responses.append(ai_message)
+            conv["messages"].append(ai_message)
+            
+            ai_memories.append({
+                "content": f"AI response from {agent_name}: {ai_response}",
+                "project_id": project_id,
+                "conversation_id": conversation_id,
+                "user_id": 1,  # Default user ID in testing mode
+                "agent_id": participant,
+                "conversation_type": conversation_type,
+                "additional_metadata": {
+                    "sender_name": agent_name,
+                    "message_type": "text",
+                    "timestamp": ai_message["timestamp"],
+                    "in_response_to": message[:100],
+                    "immediate_response": True
                 }
+            })
+        
+        # Save all AI messages to memory in the background as well
+        self._queue_memories(ai_memories)
+        
+        # Update last message to the most recent AI response (appended in timestamp order, so the last one)
+        if ai_responses:
+            last_ai_message = ai_responses[-1]
+            conv["last_message"] = {
+                "content": last_ai_message["content"][:100] + ("..." if len(last_ai_message["content"]) > 100 else ""),
+                "timestamp": last_ai_message["timestamp"],
+                "sender": last_ai_message["sender_name"]
+            }
+        
+        # Append the AI responses to the log as well
+        for ai_message in ai_responses:
+            self._log_message(project_id, conversation_id, conv, ai_message)
+        
+        return {
+            "message": "Message added successfully",
+            "conversation": conv,
+            "user_message": user_message,
+            "ai_responses": ai_responses,
+            "typing_indicators": [
+                {
+                    "agent_id": resp["sender_id"],
+                    "agent_name": resp["sender_name"],
+                    "typing_duration": resp["typing_duration"]
+                } for resp in ai_responses
+            ]
+        }
+    
+    def _queue_memories(self, records: List[Dict[str, Any]]):
+        """Hand message memories to the background worker so RAG writes stay off the request path"""
+        if not records:
+            return
         
-        print(f"[DEBUG] add_message_to_conversation: project_id={project_id}, conversation_id={conversation_id}")
-        print(f"[DEBUG] Available conversations for project: {[c['id'] for c in conversations]}")
-        raise ValueError(f"Conversation {conversation_id} not found")
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop to run a worker on, so write now
+            self._write_memories(records)
+            return
+        
+        if self._memory_worker_task is None or self._memory_worker_task.done():
+            self._memory_queue = asyncio.Queue()
+            self._memory_worker_task = loop.create_task(self._memory_worker())
+        for record in records:
+            self._memory_queue.put_nowait(record)
+    
+    async def _memory_worker(self):
+        """Drain queued memories in small batches, running the blocking RAG write in a thread"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._memory_queue.get()]
+            
+            # Collect whatever else arrives within the batch window
+            deadline = loop.time() + self.MEMORY_BATCH_WINDOW_SECONDS
+            while len(batch) < self.MEMORY_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._memory_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            await asyncio.to_thread(self._write_memories, batch)
+    
+    def _write_memories(self, records: List[Dict[str, Any]]):
+        """Write message memories to optimized storage and, when available, the RAG store"""
+        optimized_storage.batch_add_memory(records)
+        if hasattr(self, 'rag_manager') and self.rag_manager:
+            try:
+                self.rag_manager.add_memories_batch(records)
+            except Exception as e:
+                print(f"[DEBUG] Failed to save messages to memory: {e}")
     
     def _generate_contextual_response(self, agent_name: str, user_message: str, conversation_type: str) -> str:
         """Generate contextual AI responses using actual AI APIs instead of hardcoded responses"""
+        return self._generate_contextual_responses([agent_name], user_message, conversation_type)[0]
+    
+    def _generate_contextual_responses(self, agent_names: List[str], user_message: str, conversation_type: str) -> List[str]:
+        """Generate one contextual AI response per agent, dispatching all LLM calls as a single batch"""
         
         if not self.agent_manager:
             # Fallback to basic response if agent manager not available
-            return f"Thanks for your message. Let me think about that and get back to you."
-        
-        # Map agent names to agent IDs for the AgentManager
-        agent_id_map = {
-            "sarah johnson": "manager_001",
-            "alex chen": "developer_001", 
-            "michael rodriguez": "client_001",
-            "jennifer williams": "hr_001",
-            "jamie taylor": "intern_001",
-            "david kim": "qa_001",
-            "maria rodriguez": "qa_001",
-            "michael brown": "developer_001",  # Map tech lead to developer
-            "lisa thompson": "developer_001",  # Map analyst to developer
-            "technical_lead": "developer_001",  # Fix the missing technical_lead
-            "tech_lead": "developer_001",
-            "tech_lead_001": "developer_001",
-            "analyst": "developer_001",
-            "analyst_001": "developer_001",
-            "designer": "developer_001",
-            "designer_001": "developer_001",
-            "qa_engineer": "qa_001",
-            "senior_developer": "developer_001"
-        }
+            return [f"Thanks for your message. Let me think about that and get back to you." for _ in agent_names]
         
-        # Find the correct agent ID
-        agent_id = None
-        agent_name_lower = agent_name.lower()
-        for name, id in agent_id_map.items():
-            if name in agent_name_lower:
-                agent_id = id
-                break
-        
-        # If no specific agent found, try by role keywords
-        if not agent_id:
-            if "manager" in agent_name_lower or "lead" in agent_name_lower:
-                agent_id = "manager_001"
-            elif "developer" in agent_name_lower or "dev" in agent_name_lower or "tech" in agent_name_lower:
-                agent_id = "developer_001"
-            elif "qa" in agent_name_lower or "quality" in agent_name_lower or "test" in agent_name_lower:
-                agent_id = "qa_001"
-            elif "designer" in agent_name_lower or "design" in agent_name_lower:
-                agent_id = "developer_001"  # Map to developer as we don't have a dedicated designer
-            elif "hr" in agent_name_lower or "human" in agent_name_lower:
-                agent_id = "hr_001"
-            elif "client" in agent_name_lower or "customer" in agent_name_lower:
-                agent_id = "client_001"
-            elif "intern" in agent_name_lower or "junior" in agent_name_lower:
-                agent_id = "intern_001"
-            else:
-                agent_id = "developer_001"  # Default fallback
+        if not agent_names:
+            return []
         
-        try:
-            # Use the agent manager to generate a proper AI response
-            response = self.agent_manager.chat_with_agent(agent_id, user_message)
-            return response
-            
-        except Exception as e:
-            print(f"Error generating AI response for {agent_name}: {e}")
-            # More specific fallback message based on error type
-            if "Agent" in str(e) and "not found" in str(e):
-                return f"I'm currently unavailable. Please try speaking with a different team member."
-            elif "API" in str(e) or "connectivity" in str(e):
-                return f"I'm having trouble connecting right now. Please try again in a moment."
-            else:
-                return f"Let me get back to you on that. I'm reviewing your message now."
+        # Use the agent manager to generate proper AI responses
+        results = self.agent_manager.chat_with_agents_batch(
+            [(self._resolve_agent_id(agent_name), user_message) for agent_name in agent_names]
+        )
+        return [
+            self._fallback_response(agent_name, result) if isinstance(result, Exception) else result
+            for agent_name, result in zip(agent_names, results)
+        ]
+    
+    def _resolve_agent_id(self, agent_name: str) -> str:
+        """Map a conversation participant name to an AgentManager agent ID"""
+        return _resolve_agent_id(agent_name.lower())
+    
+    def _fallback_response(self, agent_name: str, error: Exception) -> str:
+        """In-character reply used when an agent's AI response could not be generated"""
+        print(f"Error generating AI response for {agent_name}: {error}")
+        # More specific fallback message based on error type
+        if "Agent" in str(error) and "not found" in str(error):
+            return f"I'm currently unavailable. Please try speaking with a different team member."
+        elif "API" in str(error) or "connectivity" in str(error):
+            return f"I'm having trouble connecting right now. Please try again in a moment."
+        else:
+            return f"Let me get back to you on that. I'm reviewing your message now."
+    
+    def _get_participant_lists(self, conversation: Conversation) -> Tuple[List[str], List[str]]:
+        """Participant ids and names, from the inline lists or the participant rows for older conversations"""
+        if conversation.participant_ids:
+            return list(conversation.participant_ids), list(conversation.participant_names or [])
+        
+        # Rows written before the inline lists existed; participants is raise_on_sql, so query explicitly
+        rows = (
+            self.db.query(ConversationParticipant.participant_id, ConversationParticipant.participant_name)
+            .filter(ConversationParticipant.conversation_id == conversation.id)
+            .order_by(ConversationParticipant.id)
+            .all()
+        )
+        return [row.participant_id for row in rows], [row.participant_name for row in rows]
     
     async def _add_conversation_to_memory(self, conversation: Conversation, context: str):
         """Add conversation to RAG memory"""
@@ -508,7 +656,7 @@ class ProjectManager:
             conversation_type=conversation.conversation_type,
             additional_metadata={
                 "conversation_title": conversation.title,
-                "participant_count": len(conversation.participants)
+                "participant_count": len(self._get_participant_lists(conversation)[0])
             }
         )
     
@@ -536,71 +684,111 @@ class ProjectManager:
         
         responses = []
         project = conversation.project
+        staged_messages: List[Message] = []
         
         # Get context for each AI participant
-        for participant in conversation.participants:
-            if participant.participant_id == "user" or participant.participant_id == user_message.sender_id:
-                continue
-            
-            # Get agent context
-            context = self.rag_manager.get_enhanced_context_for_agent(
-                participant.participant_id,
-                project.id,
-                user_message.content,
-                conversation.id
-            )
-            
-            # Generate response
+        participant_ids, _ = self._get_participant_lists(conversation)
+        members_by_agent_id: Dict[str, ProjectMember] = {}
+        for member in project.members:
+            members_by_agent_id.setdefault(member.agent_id, member)
+        participant_ids = [
+            participant_id for participant_id in participant_ids
+            if participant_id != "user" and participant_id != user_message.sender_id
+            and participant_id in members_by_agent_id
+        ]
+        if not participant_ids:
+            return responses
+        
+        # Context lookups and LLM calls both block, so they run off the event loop
+        contexts = await asyncio.to_thread(
+            self._get_agent_contexts, participant_ids, project.id, user_message.content, conversation.id
+        )
+        participant_ids = [participant_id for participant_id in participant_ids if participant_id in contexts]
+        
+        # One batch for the turn; replies for the same agent run in order so its history is not interleaved
+        replies = await asyncio.to_thread(
+            self.agent_manager.chat_with_agents_batch,
+            [
+                (MEMBER_AGENT_ID_MAP.get(members_by_agent_id[participant_id].name, "developer_001"), user_message.content)
+                for participant_id in participant_ids
+            ]
+        )
+        
+        for participant_id, reply in zip(participant_ids, replies):
             try:
                 response = await self._generate_agent_response(
-                    project, conversation, participant.participant_id, user_message.content, context
+                    project, conversation, participant_id, user_message.content, contexts[participant_id],
+                    staged_messages=staged_messages, agent_reply=reply
                 )
                 if response:
                     responses.append(response)
             except Exception as e:
-                print(f"Error generating response for {participant.participant_id}: {e}")
+                print(f"Error generating response for {participant_id}: {e}")
+        
+        if not staged_messages:
+            return responses
+        
+        # One commit for the whole turn instead of one per agent reply
+        try:
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            print(f"Error saving responses for conversation {conversation.id}: {e}")
+            return []
+        
+        # Add to memory
+        for response_message in staged_messages:
+            try:
+                await self._add_message_to_memory(conversation, response_message)
+            except Exception as e:
+                print(f"Error adding response from {response_message.sender_id} to memory: {e}")
         
         return responses
     
+    def _get_agent_contexts(self, participant_ids: List[str], project_id: str, query: str, conversation_id: str) -> Dict[str, str]:
+        """RAG context per participant; participants whose lookup fails are left out"""
+        contexts = {}
+        for participant_id in participant_ids:
+            try:
+                contexts[participant_id] = self.rag_manager.get_enhanced_context_for_agent(
+                    participant_id, project_id, query, conversation_id
+                )
+            except Exception as e:
+                print(f"Error generating response for {participant_id}: {e}")
+        return contexts
+    
     async def _generate_agent_response(self, 
                                      project: Project,
                                      conversation: Conversation,
                                      agent_id: str,
                                      user_message: str,
-                                     context: str) -> Optional[Dict]:
-        """Generate a response from a specific agent using actual AI APIs"""
+                                     context: str,
+                                     staged_messages: Optional[List[Message]] = None,
+                                     agent_reply: Union[str, Exception, None] = None) -> Optional[Dict]:
+        """Generate a response from a specific agent using actual AI APIs
+        
+        With staged_messages, the new message is only added to the session and
+        appended to that list; the caller commits and stores memories for the batch.
+        agent_reply is the agent manager's result when the caller already fetched it.
+        """
         
         # Find the agent in project members
         agent_member = next((m for m in project.members if m.agent_id == agent_id), None)
         if not agent_member:
             return None
         
-        # Map project agent IDs to actual agent manager IDs
-        agent_id_map = {
-            "Sarah Johnson": "manager_001",
-            "Alex Chen": "developer_001", 
-            "Michael Rodriguez": "client_001",
-            "Jennifer Williams": "hr_001",
-            "Jamie Taylor": "intern_001",
-            "David Kim": "qa_001",
-            "Maria Rodriguez": "qa_001",
-            "Michael Brown": "developer_001",  # Map tech lead to developer
-            "Lisa Thompson": "developer_001",  # Map analyst to developer
-            "technical_lead": "developer_001",  # Fix the missing technical_lead
-            "tech_lead_001": "developer_001",
-            "designer_001": "developer_001",
-            "analyst_001": "developer_001",
-            "qa_engineer": "qa_001",
-            "senior_developer": "developer_001"
-        }
-        
         # Get the actual agent manager ID
-        actual_agent_id = agent_id_map.get(agent_member.name, "developer_001")
+        actual_agent_id = MEMBER_AGENT_ID_MAP.get(agent_member.name, "developer_001")
         
         try:
-            if self.agent_manager:
+            if agent_reply is not None:
+                # Already fetched by the caller's batch; a failed call arrives as its exception
+                if isinstance(agent_reply, Exception):
+                    raise agent_reply
+                response_content = agent_reply
+            elif self.agent_manager:
                 # Use the agent manager to generate a proper AI response
-                response_content = self.agent_manager.chat_with_agent(actual_agent_id, user_message)
+                response_content = await asyncio.to_thread(self.agent_manager.chat_with_agent, actual_agent_id, user_message)
             else:
                 # Fallback if agent manager not available
                 response_content = f"Thanks for your message. I'll review this and get back to you."
@@ -618,6 +806,7 @@ class ProjectManager:
         response_message = Message(
             id=str(uuid.uuid4()),
             conversation_id=conversation.id,
+            project_id=conversation.project_id,
             sender_id=agent_id,
             sender_name=agent_member.name,
             content=response_content,
@@ -626,11 +815,14 @@ class ProjectManager:
         )
         
         conversation.messages.append(response_message)
-        self.db.commit()
-        self.db.refresh(response_message)
-        
-        # Add to memory
-        await self._add_message_to_memory(conversation, response_message)
+        if staged_messages is not None:
+            staged_messages.append(response_message)
+        else:
+            self.db.commit()
+            self.db.refresh(response_message)
+            
+            # Add to memory
+            await self._add_message_to_memory(conversation, response_message)
         
         return {
             "agent_id": agent_id,
@@ -703,7 +895,7 @@ class ProjectManager:
             return "Empty conversation"
         
         # Simple summary based on message count and participants
-        participant_names = [p.participant_name for p in conversation.participants]
+        _, participant_names = self._get_participant_lists(conversation)
         message_count = len(messages)
         
         summary = f"Conversation between {', '.join(participant_names)} with {message_count} messages"
@@ -841,20 +1033,7 @@ class ProjectManager:
     
     def _get_agent_name(self, agent_id: str) -> str:
         """Get agent name by ID"""
-        agent_names = {
-            "manager_001": "Sarah Johnson",
-            "developer_001": "Alex Chen", 
-            "qa_001": "David Kim",
-            "client_001": "Michael Rodriguez",
-            "hr_001": "Jennifer Williams",
-            "intern_001": "Jamie Taylor",
-            "tech_lead_001": "Alex Chen",  # Map to existing developer
-            "designer_001": "David Kim",   # Map to existing QA
-            "analyst_001": "Alex Chen",    # Map to existing developer
-            "technical_lead": "Alex Chen", # Fix the missing technical_lead
-            "tech_lead": "Alex Chen"
-        }
-        return agent_names.get(agent_id, f"Agent {agent_id}")
+        return AGENT_NAMES.get(agent_id, f"Agent {agent_id}")
     
     def _get_experience_level_for_role(self, role: ProjectRole) -> str:
         """Get experience level for a role"""
@@ -932,15 +1111,16 @@ class ProjectManager:
 
     def get_project_conversations(self, project_id: str):
         # In testing mode, return conversations from memory
-        print(f"[DEBUG] get_project_conversations for project {project_id}: {self._test_conversations.get(project_id, [])}")
-        return self._test_conversations.get(project_id, [])
+        conversations = list(self._test_conversations.get(project_id, {}).values())
+        print(f"[DEBUG] get_project_conversations for project {project_id}: {conversations}")
+        return conversations
 
     def get_conversation(self, conversation_id: str) -> Optional[Dict[str, Any]]:
         """Get a conversation by ID from all projects"""
-        for project_id, conversations in self._test_conversations.items():
-            for conv in conversations:
-                if conv["id"] == conversation_id:
-                    return conv
+        for conversations in self._test_conversations.values():
+            conv = conversations.get(conversation_id)
+            if conv is not None:
+                return conv
         return None
     
     def update_conversation(self, conversation_id: str, updated_conversation: Dict[str, Any]) -> bool:
@@ -950,13 +1130,12 @@ class ProjectManager:
         
         for project_id, conversations in self._test_conversations.items():
             print(f"[DEBUG] Checking project {project_id} with {len(conversations)} conversations")
-            for i, conv in enumerate(conversations):
-                if conv["id"] == conversation_id:
-                    print(f"[DEBUG] Found conversation at index {i}, updating...")
-                    self._test_conversations[project_id][i] = updated_conversation
-                    self._save_conversations_to_cache()  # Save after updating
-                    print(f"[DEBUG] Successfully updated conversation {conversation_id}")
-                    return True
+            if conversation_id in conversations:
+                print(f"[DEBUG] Found conversation in project {project_id}, updating...")
+                conversations[conversation_id] = updated_conversation
+                self._save_conversations_to_cache()  # Save after updating
+                print(f"[DEBUG] Successfully updated conversation {conversation_id}")
+                return True
         
         print(f"[DEBUG] Conversation {conversation_id} not found for update")
         return False
@@ -964,18 +1143,15 @@ class ProjectManager:
     def create_conversation(self, conversation: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new conversation"""
         project_id = conversation.get("project_id")
-        if project_id not in self._test_conversations:
-            self._test_conversations[project_id] = []
-        
-        self._test_conversations[project_id].append(conversation)
+        self._test_conversations.setdefault(project_id, {})[conversation["id"]] = conversation
         self._save_conversations_to_cache()  # Save after creating
         print(f"[DEBUG] Conversation created for project {project_id}: {conversation}")
-        print(f"[DEBUG] All conversations for project {project_id}: {self._test_conversations[project_id]}")
+        print(f"[DEBUG] All conversations for project {project_id}: {list(self._test_conversations[project_id].values())}")
         return conversation
     
     def get_daily_conversations(self, project_id: str, day: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get conversations for a project, optionally filtered by day"""
-        conversations = self._test_conversations.get(project_id, [])
+        conversations = list(self._test_conversations.get(project_id, {}).values())
         
         # If no day specified, return all conversations
         if not day:
@@ -1000,8 +1176,16 @@ class ProjectManager:
             cache_file = Path("conversation_cache.json")
             if cache_file.exists():
                 with open(cache_file, 'r') as f:
-                    self._test_conversations = json.load(f)
+                    cached = json.load(f)
+                # The file keeps each project's conversations as a list; index them by id in memory
+                self._test_conversations = {
+                    project_id: {conv["id"]: conv for conv in conversations}
+                    for project_id, conversations in cached.items()
+                }
                 print(f"[DEBUG] Loaded {sum(len(convs) for convs in self._test_conversations.values())} conversations from cache")
+            
+            # Messages added since that snapshot live in the append-only logs
+            self._replay_message_logs()
         except Exception as e:
             print(f"[DEBUG] Failed to load conversation cache: {e}")
             
@@ -1015,44 +1199,133 @@ class ProjectManager:
             
             cache_file = Path("conversation_cache.json")
             with open(cache_file, 'w') as f:
-                json.dump(self._test_conversations, f, indent=2)
+                json.dump(
+                    {project_id: list(conversations.values()) for project_id, conversations in self._test_conversations.items()},
+                    f, indent=2
+                )
             print(f"[DEBUG] Saved {total_conversations} conversations to cache")
+            
+            # The snapshot holds every logged (and still buffered) message, so the logs can go
+            self._pending_log_lines = {}
+            self._pending_log_count = 0
+            self._logged_since_snapshot = 0
+            shutil.rmtree(self._msg_log_dir(), ignore_errors=True)
         except Exception as e:
             print(f"[DEBUG] Failed to save conversation cache: {e}")
     
+    def _msg_log_dir(self) -> Path:
+        """Directory holding the append-only per-conversation message logs"""
+        return Path("conversation_logs")
+    
+    def _msg_log_path(self, project_id: str, conversation_id: str) -> Path:
+        """Append-only JSONL message log for one conversation"""
+        return self._msg_log_dir() / project_id / f"{conversation_id}.jsonl"
+    
+    def _log_message(self, project_id: str, conversation_id: str, conv: Dict[str, Any], message: Dict[str, Any]):
+        """Buffer a new message, with the conversation fields it changed, for the conversation's log"""
+        record = json.dumps({
+            "message": message,
+            "conversation": {field: conv.get(field) for field in MESSAGE_LOG_CONVERSATION_FIELDS}
+        })
+        self._pending_log_lines.setdefault(self._msg_log_path(project_id, conversation_id), []).append(record)
+        self._pending_log_count += 1
+        self._logged_since_snapshot += 1
+        
+        if self._logged_since_snapshot >= self.MESSAGE_LOG_COMPACT_SIZE:
+            # Compact: one full snapshot replaces the logs
+            self._save_conversations_to_cache()
+        elif self._pending_log_count >= self.MESSAGE_LOG_FLUSH_SIZE:
+            self._flush_message_log()
+        elif self._log_flush_task is None:
+            try:
+                self._log_flush_task = asyncio.get_running_loop().create_task(self._flush_message_log_later())
+            except RuntimeError:
+                # No event loop to defer the write to
+                self._flush_message_log()
+    
+    async def _flush_message_log_later(self):
+        """Flush buffered log lines once MESSAGE_LOG_FLUSH_SECONDS have passed"""
+        await asyncio.sleep(self.MESSAGE_LOG_FLUSH_SECONDS)
+        self._log_flush_task = None
+        self._flush_message_log()
+    
+    def _flush_message_log(self):
+        """Append all buffered lines to their conversation logs"""
+        pending, self._pending_log_lines = self._pending_log_lines, {}
+        self._pending_log_count = 0
+        try:
+            for log_path, lines in pending.items():
+                log_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(log_path, 'a') as f:
+                    f.write("\n".join(lines) + "\n")
+        except Exception as e:
+            print(f"[DEBUG] Failed to append to message log: {e}")
+    
+    def _replay_message_logs(self):
+        """Apply messages logged after the last snapshot to the loaded conversations"""
+        log_dir = self._msg_log_dir()
+        if not log_dir.exists():
+            return
+        
+        replayed = 0
+        for log_path in log_dir.glob("*/*.jsonl"):
+            conv = self._test_conversations.get(log_path.parent.name, {}).get(log_path.stem)
+            if conv is None:
+                continue
+            if conv.get("messages") is None:
+                conv["messages"] = []
+            # A crash between snapshot and log cleanup can leave messages in both
+            seen_ids = {message.get("id") for message in conv["messages"]}
+            
+            with open(log_path, 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Torn final line from an interrupted write
+                    message = record["message"]
+                    if message.get("id") not in seen_ids:
+                        conv["messages"].append(message)
+                        seen_ids.add(message.get("id"))
+                    conv.update(record.get("conversation", {}))
+                    replayed += 1
+        
+        self._logged_since_snapshot = replayed
+        print(f"[DEBUG] Replayed {replayed} logged messages")
+    
     def _cleanup_old_conversations(self):
         """Remove old conversations to prevent memory bloat"""
         try:
             for project_id, conversations in self._test_conversations.items():
                 if len(conversations) > 50:  # Keep only last 50 conversations per project
                     # Sort by timestamp and keep the most recent
-                    sorted_convs = sorted(conversations, 
+                    sorted_convs = sorted(conversations.values(), 
                                         key=lambda x: x.get('start_time', ''), 
                                         reverse=True)
-                    self._test_conversations[project_id] = sorted_convs[:50]
+                    self._test_conversations[project_id] = {conv["id"]: conv for conv in sorted_convs[:50]}
                     print(f"[DEBUG] Cleaned up conversations for project {project_id}")
         except Exception as e:
             print(f"[DEBUG] Failed to cleanup conversations: {e}")
     
     def mark_messages_as_read(self, project_id: str, conversation_id: str, reader_id: str) -> bool:
         """Mark messages as read by a participant (WhatsApp-like read receipts)"""
-        conversations = self._test_conversations.get(project_id, [])
-        for conv in conversations:
-            if conv["id"] == conversation_id:
-                messages = conv.get("messages", [])
-                for message in messages:
-                    if message["sender_id"] != reader_id:  # Don't mark own messages as read
-                        if reader_id not in message.get("read_by", []):
-                            message.setdefault("read_by", []).append({
-                                "user_id": reader_id,
-                                "timestamp": datetime.utcnow().isoformat()
-                            })
-                
-                # Reset unread count for this user
-                conv["unread_count"] = 0
-                self._save_conversations_to_cache()
-                return True
-        return False
+        conv = self._test_conversations.get(project_id, {}).get(conversation_id)
+        if conv is None:
+            return False
+        
+        messages = conv.get("messages", [])
+        for message in messages:
+            if message["sender_id"] != reader_id:  # Don't mark own messages as read
+                if reader_id not in message.get("read_by", []):
+                    message.setdefault("read_by", []).append({
+                        "user_id": reader_id,
+                        "timestamp": datetime.utcnow().isoformat()
+                    })
+        
+        # Reset unread count for this user
+        conv["unread_count"] = 0
+        self._save_conversations_to_cache()
+        return True
     
     def add_typing_indicator(self, project_id: str, conversation_id: str, agent_id: str, duration: int = 3) -> Dict[str, Any]:
         """Add typing indicator for smooth WhatsApp-like experience"""
@@ -1146,13 +1419,13 @@ class ProjectManager:
     
     def update_conversation_activity(self, project_id: str, conversation_id: str) -> bool:
         """Update last activity timestamp for conversation sorting"""
-        conversations = self._test_conversations.get(project_id, [])
-        for conv in conversations:
-            if conv["id"] == conversation_id:
-                conv["last_activity"] = datetime.utcnow().isoformat()
-                self._save_conversations_to_cache()
-                return True
-        return False
+        conv = self._test_conversations.get(project_id, {}).get(conversation_id)
+        if conv is None:
+            return False
+        
+        conv["last_activity"] = datetime.utcnow().isoformat()
+        self._save_conversations_to_cache()
+        return True
     
     async def generate_dashboard_content(self, project_id: str) -> Dict[str, Any]:
         """Generate AI-powered dashboard content with tasks, feedback, and suggestions"""
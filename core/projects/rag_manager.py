@@ -1,6 +1,8 @@
 from typing import List, Dict, Any, Optional
 import json
+import threading
 import uuid
+from collections import OrderedDict
 from datetime import datetime
 from dataclasses import dataclass
 
@@ -26,6 +28,8 @@ class MemoryChunk:
 class RAGManager:
     """Retrieval-Augmented Generation manager for persistent memory"""
     
+    QUERY_EMBEDDING_CACHE_SIZE = 4096
+    
     def __init__(self, embedding_model: str = "all-MiniLM-L6-v2"):
         """Initialize RAG manager with lazy loading"""
         self.embedding_model_name = embedding_model
@@ -41,6 +45,15 @@ class RAGManager:
         self.project_memories: Dict[str, List[str]] = {}  # project_id -> list of memory_chunk_ids
         self.agent_memories: Dict[str, List[str]] = {}   # agent_id -> list of memory_chunk_ids
         
+        # Guards chunk storage so FAISS row order keeps matching memory_chunks order
+        # when several threads add memories at once
+        self._write_lock = threading.Lock()
+        
+        # Query embeddings keyed on normalized query text; persona lookups repeat
+        # the same handful of queries, so most searches skip the model entirely
+        self._query_embedding_cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        
     def _ensure_model_loaded(self):
         """Ensure embedding model is loaded (lazy loading)"""
         if not self._model_initialized:
@@ -89,12 +102,57 @@ class RAGManager:
                    conversation_type: str = "general",
                    additional_metadata: Optional[Dict[str, Any]] = None) -> str:
         """Add a new memory chunk"""
+        return self.add_memories_batch([{
+            "content": content,
+            "project_id": project_id,
+            "conversation_id": conversation_id,
+            "user_id": user_id,
+            "agent_id": agent_id,
+            "conversation_type": conversation_type,
+            "additional_metadata": additional_metadata
+        }])[0]
+    
+    def add_memories_batch(self, records: List[Dict[str, Any]]) -> List[str]:
+        """Add several memory chunks (each record holds add_memory's arguments) with one embedding call and one index write"""
+        if not records:
+            return []
         
         # Ensure model is loaded
         self._ensure_model_loaded()
         
-        # Create memory chunk
-        chunk_id = str(uuid.uuid4())
+        memory_chunks = [self._build_memory_chunk(**record) for record in records]
+        
+        # Generate embeddings in one batch (only if model is available)
+        embeddings = None
+        if self._model_initialized and self.embedding_model is not None:
+            embeddings = self.embedding_model.encode([chunk.content for chunk in memory_chunks])
+            for chunk, embedding in zip(memory_chunks, embeddings):
+                chunk.embedding = embedding
+        
+        with self._write_lock:
+            # Store memory chunks
+            for chunk in memory_chunks:
+                self.memory_chunks[chunk.id] = chunk
+            
+            # Add to FAISS index
+            if embeddings is not None:
+                self.index.add(embeddings.reshape(len(memory_chunks), -1))
+            
+            # Update indexes
+            for chunk, record in zip(memory_chunks, records):
+                self._index_memory_chunk(chunk, record.get("agent_id"))
+        
+        return [chunk.id for chunk in memory_chunks]
+    
+    def _build_memory_chunk(self, 
+                            content: str, 
+                            project_id: str,
+                            conversation_id: str,
+                            user_id: str,
+                            agent_id: Optional[str] = None,
+                            conversation_type: str = "general",
+                            additional_metadata: Optional[Dict[str, Any]] = None) -> MemoryChunk:
+        """Create a memory chunk (without embedding) from add_memory's arguments"""
         metadata = {
             "project_id": project_id,
             "conversation_id": conversation_id,
@@ -109,27 +167,20 @@ class RAGManager:
         if additional_metadata:
             metadata.update(additional_metadata)
         
-        # Generate embedding (only if model is available)
-        embedding = None
-        if self._model_initialized and self.embedding_model is not None:
-            embedding = self.embedding_model.encode([content])[0]
-        
-        # Create memory chunk
-        memory_chunk = MemoryChunk(
-            id=chunk_id,
+        return MemoryChunk(
+            id=str(uuid.uuid4()),
             content=content,
             metadata=metadata,
-            timestamp=datetime.utcnow(),
-            embedding=embedding
+            timestamp=datetime.utcnow()
         )
+    
+    def _index_memory_chunk(self, memory_chunk: MemoryChunk, agent_id: Optional[str] = None):
+        """Record a stored chunk in the project/conversation/user/agent indexes"""
+        chunk_id = memory_chunk.id
+        project_id = memory_chunk.metadata["project_id"]
+        conversation_id = memory_chunk.metadata["conversation_id"]
+        user_id = memory_chunk.metadata["user_id"]
         
-        # Store memory chunk
-        self.memory_chunks[chunk_id] = memory_chunk
-        
-        # Add to FAISS index
-        self.index.add(embedding.reshape(1, -1))
-        
-        # Update indexes
         if project_id not in self.project_memories:
             self.project_memories[project_id] = []
         self.project_memories[project_id].append(chunk_id)
@@ -152,12 +203,10 @@ class RAGManager:
             self._test_memory[project_id] = []
         self._test_memory[project_id].append({
             "id": chunk_id,
-            "content": content,
-            "metadata": metadata,
+            "content": memory_chunk.content,
+            "metadata": memory_chunk.metadata,
             "timestamp": memory_chunk.timestamp.isoformat()
         })
-        
-        return chunk_id
     
     def search_memories(self, 
                        query: str, 
@@ -168,49 +217,90 @@ class RAGManager:
                        limit: int = 10,
                        similarity_threshold: float = 0.3) -> List[MemoryChunk]:
         """Search for relevant memories using semantic similarity"""
-        
-        if not self.memory_chunks:
-            return []
-        
-        # Generate query embedding
-        query_embedding = self.embedding_model.encode([query])[0]
+        return self.search_memories_batch(
+            [query], project_id, user_id, agent_id, conversation_type, limit, similarity_threshold
+        )[0]
+    
+    def search_memories_batch(self, 
+                             queries: List[str], 
+                             project_id: Optional[str] = None,
+                             user_id: Optional[str] = None,
+                             agent_id: Optional[str] = None,
+                             conversation_type: Optional[str] = None,
+                             limit: int = 10,
+                             similarity_threshold: float = 0.3) -> List[List[MemoryChunk]]:
+        """Search for several queries at once: one encode call and one FAISS search for all of them"""
+        
+        if not self.memory_chunks or not queries:
+            return [[] for _ in queries]
+        
+        # Generate query embeddings (cached per normalized query text)
+        query_embeddings = self._encode_queries(queries)
         
         # Search in FAISS index
         similarities, indices = self.index.search(
-            query_embedding.reshape(1, -1), 
+            query_embeddings.reshape(len(queries), -1), 
             min(limit * 3, len(self.memory_chunks))  # Get more results for filtering
         )
         
         # Get memory chunks and filter by metadata
-        results = []
         chunk_ids = list(self.memory_chunks.keys())
+        all_results = []
         
-        for i, (similarity, idx) in enumerate(zip(similarities[0], indices[0])):
-            if similarity < similarity_threshold:
-                continue
-            
-            if idx >= len(chunk_ids):
-                continue
+        for query_similarities, query_indices in zip(similarities, indices):
+            results = []
+            for similarity, idx in zip(query_similarities, query_indices):
+                if similarity < similarity_threshold:
+                    continue
                 
-            chunk_id = chunk_ids[idx]
-            chunk = self.memory_chunks[chunk_id]
-            
-            # Apply filters
-            if project_id and chunk.metadata.get("project_id") != project_id:
-                continue
-            if user_id and chunk.metadata.get("user_id") != user_id:
-                continue
-            if agent_id and chunk.metadata.get("agent_id") != agent_id:
-                continue
-            if conversation_type and chunk.metadata.get("conversation_type") != conversation_type:
-                continue
+                if idx >= len(chunk_ids):
+                    continue
+                    
+                chunk_id = chunk_ids[idx]
+                chunk = self.memory_chunks[chunk_id]
+                
+                # Apply filters
+                if project_id and chunk.metadata.get("project_id") != project_id:
+                    continue
+                if user_id and chunk.metadata.get("user_id") != user_id:
+                    continue
+                if agent_id and chunk.metadata.get("agent_id") != agent_id:
+                    continue
+                if conversation_type and chunk.metadata.get("conversation_type") != conversation_type:
+                    continue
+                
+                results.append(chunk)
+                
+                if len(results) >= limit:
+                    break
             
-            results.append(chunk)
+            all_results.append(results)
+        
+        return all_results
+    
+    def _encode_queries(self, queries: List[str]) -> Any:
+        """Embed queries, encoding only those not already in the query embedding cache"""
+        # The default model is uncased, so lowercasing doesn't change the embedding
+        keys = [query.strip().lower() for query in queries]
+        
+        with self._query_cache_lock:
+            cached = {key: self._query_embedding_cache.get(key) for key in keys}
+            for key, embedding in cached.items():
+                if embedding is not None:
+                    self._query_embedding_cache.move_to_end(key)
+        
+        missing = [key for key, embedding in cached.items() if embedding is None]
+        if missing:
+            for key, embedding in zip(missing, self.embedding_model.encode(missing)):
+                cached[key] = embedding
             
-            if len(results) >= limit:
-                break
+            with self._query_cache_lock:
+                for key in missing:
+                    self._query_embedding_cache[key] = cached[key]
+                while len(self._query_embedding_cache) > self.QUERY_EMBEDDING_CACHE_SIZE:
+                    self._query_embedding_cache.popitem(last=False)
         
-        return results
+        return np.stack([cached[key] for key in keys])
     
     def get_project_context(self, project_id: str, limit: int = 20) -> List[Any]:
         """Get recent context for a project"""